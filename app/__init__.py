@@ -2,11 +2,29 @@ from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
+from sqlalchemy.exc import IntegrityError
 import os
 
-db = SQLAlchemy()
+from app.db_routing import RoutingSession
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 jwt = JWTManager()
 
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+
+def init_migrate(app):
+    """Registra Flask-Migrate en `app` (lo usan `flask db`, `flask init-db` y
+    los upgrade() programáticos de benchmarks/). Las migraciones se buscan
+    junto al paquete, no en el directorio actual.
+
+    No se hace en create_app: flask_migrate importa alembic (~200 ms) y los
+    workers de gunicorn no lo necesitan.
+    """
+    if 'migrate' not in app.extensions:
+        from flask_migrate import Migrate
+        Migrate(app, db, directory=MIGRATIONS_DIR, render_as_batch=True)
+
 
 def _bootstrap_admin_user(app):
     """Crea un usuario admin si no existe (desde variables de entorno).
@@ -15,6 +33,9 @@ def _bootstrap_admin_user(app):
       - ADMIN_USERNAME (se guarda en User.email)
       - ADMIN_PASSWORD
       - ADMIN_COMPANY_NAME (opcional)
+
+    Devuelve True si lo creó. Lo corre `flask init-db` una vez por deploy;
+    si dos procesos compiten, el unique de users.email deja pasar a uno solo.
     """
     from app.models.user import User
 
@@ -23,17 +44,36 @@ def _bootstrap_admin_user(app):
     admin_company = os.environ.get('ADMIN_COMPANY_NAME', 'Admin')
 
     if not admin_username or not admin_password:
-        return
+        return False
 
-    with app.app_context():
+    from app.sqlite_profile import write_transaction
+
+    with app.app_context(), write_transaction():
         existing = User.query.filter_by(email=admin_username).first()
         if existing:
-            return
+            return False
 
         user = User(email=admin_username, company_name=admin_company)
         user.set_password(admin_password)
         db.session.add(user)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            return False
+        return True
+
+
+def _check_database_backend(url):
+    """Falla al arrancar si la base no soporta el upsert de RSVP (Guest.upsert_rsvp)."""
+    from sqlalchemy.engine import make_url
+    from app.models.guest import UPSERT_DIALECTS
+
+    backend = make_url(url).get_backend_name()
+    if backend not in UPSERT_DIALECTS:
+        raise RuntimeError(
+            f'Base de datos no soportada: {backend} (soportadas: {", ".join(sorted(UPSERT_DIALECTS))})'
+        )
 
 
 def create_app(config_name='development'):
@@ -43,11 +83,29 @@ def create_app(config_name='development'):
     # Cargar configuración
     from config import config
     app.config.from_object(config[config_name])
+    _check_database_backend(app.config['SQLALCHEMY_DATABASE_URI'])
     
     # Inicializar extensiones
+    from app import db_pool, db_routing, sqlite_profile
+    db_pool.configure(app)
     db.init_app(app)
+    db_pool.init_app(app)
+    db_routing.init_app(app)
+    sqlite_profile.init_app(app)
     jwt.init_app(app)
     CORS(app)
+
+    from app import (cache, code_filter, identity, json_provider, metrics, microcache, ratelimit, rsvp_queue,
+                     snapshots)
+    cache.init_app(app)
+    code_filter.init_app(app)
+    identity.init_app(app)
+    json_provider.init_app(app)
+    metrics.init_app(app)
+    microcache.init_app(app)
+    ratelimit.init_app(app)
+    rsvp_queue.init_app(app)
+    snapshots.init_app(app)
     
     # Registrar blueprints
     from app.routes.auth import auth_bp
@@ -59,11 +117,20 @@ def create_app(config_name='development'):
     app.register_blueprint(invitations_bp, url_prefix='/api/invitations')
     app.register_blueprint(admin_bp, url_prefix='/api/admin')
     app.register_blueprint(public_bp, url_prefix='/api/public')
+
+    # Comandos CLI de mantenimiento
+    from app.commands import register_commands
+    register_commands(app)
     
-    # Crear tablas + bootstrap admin
-    with app.app_context():
-        db.create_all()
+    # Esquema y admin: en producción los prepara `flask init-db` una sola vez
+    # antes de levantar los workers. create_all() queda para bases efímeras
+    # (tests) vía AUTO_CREATE_TABLES y el bootstrap en cada arranque, para
+    # desarrollo (BOOTSTRAP_ADMIN_ON_BOOT).
+    if app.config.get('AUTO_CREATE_TABLES'):
+        with app.app_context():
+            db.create_all()
 
-    _bootstrap_admin_user(app)
+    if app.config.get('BOOTSTRAP_ADMIN_ON_BOOT'):
+        _bootstrap_admin_user(app)
 
     return app
@@ -0,0 +1,219 @@
+"""Modo ASGI para los GET públicos (`asgi:app`, p.ej. con uvicorn).
+
+Atiende sin bloquear un worker por conexión:
+
+- GET /api/public/invitations/<code>
+- GET /api/public/invitations/<code>/guests
+
+con un engine async de SQLAlchemy (aiosqlite / asyncpg, ver
+requirements-async.txt) y las mismas respuestas, cache pública, rate limiting y
+filtro de códigos que el blueprint `public`. Todo lo demás (RSVPs, API
+autenticada) lo sirve la app Flask de siempre a través de un adaptador WSGI, así
+que se puede desplegar en lugar de gunicorn o al lado (nginx mandando solo esos
+GET al proceso ASGI, ver DEPLOYMENT.md).
+"""
+import asyncio
+import re
+
+from sqlalchemy import select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app import create_app
+from app.cache import public_invitation_cache
+from app.code_filter import invitation_codes
+from app.microcache import REFRESH_HEADER, cache_headers, is_refresh_token
+from app.models.guest import Guest
+from app.models.invitation import Invitation
+from app.ratelimit import REJECTION_MESSAGES, public_limiter, retry_after_header, serves_from_cache
+from app.sqlite_profile import is_file_sqlite, sqlite_profile
+
+PUBLIC_ROUTE = re.compile(r'^/api/public/invitations/(?P<code>[^/]+)(?P<guests>/guests)?/?$')
+
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+    'postgres': 'postgresql+asyncpg',
+}
+
+
+def async_database_url(url):
+    """URL de SQLAlchemy con el driver async equivalente (sqlite → aiosqlite, etc.)."""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f'Sin driver async configurado para {backend}')
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+class PublicASGIApp:
+    """App ASGI: GET públicos en async, el resto delegado a Flask (WSGI)."""
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.engine = None
+        self.sessions = None
+        self._wsgi = None
+        if flask_app.config.get('ASGI_WSGI_FALLBACK', True):
+            from a2wsgi import WSGIMiddleware
+            self._wsgi = WSGIMiddleware(flask_app, workers=flask_app.config.get('ASGI_WSGI_THREADS', 10))
+
+    # -- ciclo de vida ------------------------------------------------------
+
+    def startup(self):
+        config = self.flask_app.config
+        url = config.get('ASYNC_DATABASE_URL') or async_database_url(config['SQLALCHEMY_DATABASE_URI'])
+        self.engine = create_async_engine(url, **config.get('ASYNC_ENGINE_OPTIONS', {}))
+        if sqlite_profile.pragmas and is_file_sqlite(self.engine.url):
+            sqlite_profile.configure_engine(self.engine.sync_engine, transactions=False)
+        self.sessions = async_sessionmaker(self.engine, expire_on_commit=False)
+
+    async def shutdown(self):
+        if self.engine is not None:
+            await self.engine.dispose()
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                self.startup()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    # -- ASGI ---------------------------------------------------------------
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self._lifespan(receive, send)
+
+        match = None
+        if scope['type'] == 'http' and scope['method'] == 'GET':
+            match = PUBLIC_ROUTE.match(scope['path'])
+        if match is None:
+            if self._wsgi is None:
+                return await self._send_json(send, 404, {'message': 'No encontrado'})
+            return await self._wsgi(scope, receive, send)
+
+        if self.engine is None:  # servidores sin lifespan
+            self.startup()
+        code = match.group('code')
+        await self._serve_public(scope, send, code, guests=bool(match.group('guests')))
+
+    async def _serve_public(self, scope, send, code, guests):
+        admitted = False
+        header = REFRESH_HEADER.lower().encode()
+        refresh = any(name == header and is_refresh_token(value.decode('latin-1'))
+                      for name, value in scope.get('headers', ()))
+        if public_limiter.enabled and not refresh:  # refrescos de nginx: sin límite
+            charged_code = None if not guests and serves_from_cache(code) else code
+            try:
+                rejected = public_limiter.admit(self._client_ip(scope), charged_code)
+                admitted = rejected is None
+            except (OSError, RuntimeError):
+                # Igual que el blueprint: sin estado compartido no se bloquea el tráfico
+                self.flask_app.logger.exception('Rate limiter no disponible')
+                rejected = None
+            if rejected is not None:
+                status, retry_after, _ = rejected
+                return await self._send_json(
+                    send, status, {'message': REJECTION_MESSAGES[status]},
+                    headers=[(b'retry-after', retry_after_header(retry_after).encode())],
+                )
+        try:
+            if guests:
+                status, body = await self._invitation_guests(code)
+            else:
+                status, body = await self._public_invitation(code, refresh)
+            await self._send_body(send, status, body, headers=[
+                (name.lower().encode(), value.encode()) for name, value in cache_headers(status)])
+        finally:
+            if admitted:
+                public_limiter.release()
+
+    def _client_ip(self, scope):
+        client = scope.get('client')
+        remote_addr = client[0] if client else None
+        forwarded = [
+            value.decode('latin-1') for name, value in scope.get('headers', ())
+            if name == b'x-forwarded-for'
+        ]
+        access_route = [ip.strip() for ip in ','.join(forwarded).split(',') if ip.strip()] if forwarded else None
+        return public_limiter.client_ip(remote_addr, access_route or [remote_addr])
+
+    # -- handlers (mismas respuestas que app.routes.public) -----------------
+
+    async def _find_published_invitation(self, session, code):
+        if invitation_codes.enabled and not await self._might_exist(code):
+            return None
+        result = await session.execute(select(Invitation).where(Invitation.unique_code == code).limit(1))
+        invitation = result.scalars().first()
+        if not invitation or not invitation.is_published:
+            if invitation_codes.enabled:
+                invitation_codes.record_miss(code, exists=invitation is not None)
+            return None
+        return invitation
+
+    async def _might_exist(self, code):
+        # Puede refrescar el filtro con la sesión (sync) de Flask: en un thread
+        def check():
+            with self.flask_app.app_context():
+                return invitation_codes.might_exist(code)
+        return await asyncio.get_running_loop().run_in_executor(None, check)
+
+    async def _public_invitation(self, code, refresh=False):
+        body = None if refresh else public_invitation_cache.get(code)
+        if body is not None:
+            return 200, body
+        async with self.sessions() as session:
+            invitation = await self._find_published_invitation(session, code)
+        if not invitation:
+            return 404, self._dumps({'message': 'Invitación no encontrada'})
+        body = self._dumps({
+            'invitation': invitation.to_dict(),
+            'rsvp_stats': invitation.rsvp_stats(),
+        })
+        public_invitation_cache.set(code, body)
+        return 200, body
+
+    async def _invitation_guests(self, code):
+        async with self.sessions() as session:
+            invitation = await self._find_published_invitation(session, code)
+            if not invitation:
+                return 404, self._dumps({'message': 'Invitación no encontrada'})
+            result = await session.execute(
+                select(Guest).where(Guest.invitation_id == invitation.id, Guest.rsvp_status == 'accepted')
+            )
+            confirmed_guests = result.scalars().all()
+        return 200, self._dumps({
+            'guests': [g.to_dict() for g in confirmed_guests],
+            'total_confirmed': len(confirmed_guests),
+        })
+
+    # -- respuesta ----------------------------------------------------------
+
+    def _dumps(self, obj):
+        return self.flask_app.json.dumps(obj) + '\n'
+
+    async def _send_json(self, send, status, obj, headers=()):
+        await self._send_body(send, status, self._dumps(obj), headers)
+
+    async def _send_body(self, send, status, body, headers=()):
+        payload = body.encode() if isinstance(body, str) else body
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [
+                (b'content-type', self.flask_app.json.mimetype.encode()),
+                (b'content-length', str(len(payload)).encode()),
+                (b'access-control-allow-origin', b'*'),  # como CORS(app)
+                *headers,
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': payload})
+
+
+def create_asgi_app(config_name='production'):
+    return PublicASGIApp(create_app(config_name))
@@ -0,0 +1,77 @@
+"""Trabajo en segundo plano por clave, juntando cambios repetidos."""
+import os
+import threading
+import time
+
+
+class CoalescingWorker:
+    """Junta claves con schedule() y las procesa en lote en un thread propio.
+
+    Las claves que llegan dentro de una ventana de `delay` segundos se procesan
+    juntas, una vez cada una (p.ej. una ráfaga de RSVPs a la misma invitación).
+    El thread se crea al primer schedule() de cada proceso, así sobrevive al
+    fork de gunicorn. Las subclases implementan process(keys), que corre dentro
+    de un app context; flush() lo corre ya, en el thread actual.
+    """
+
+    thread_name = 'coalescing-worker'
+
+    def __init__(self):
+        self.enabled = False
+        self.delay = 1.0
+        self._app = None
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._process_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._thread_pid = None
+
+    def schedule(self, *keys):
+        """Anota claves para procesar en segundo plano (llamar después del commit)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._pending.update(key for key in keys if key)
+        self._ensure_thread()
+        self._wakeup.set()
+
+    def flush(self):
+        """Procesa ya lo pendiente. Devuelve la cantidad de claves procesadas."""
+        with self._process_lock:
+            with self._lock:
+                keys, self._pending = self._pending, set()
+            if not keys:
+                return 0
+            with self._app.app_context():
+                self.process(sorted(keys))
+            return len(keys)
+
+    def process(self, keys):
+        raise NotImplementedError
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._pending)
+
+    def _ensure_thread(self):
+        pid = os.getpid()
+        if self._thread is not None and self._thread_pid == pid and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread_pid == pid and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+            self._thread_pid = pid
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            # Junta los cambios que lleguen en la ventana
+            time.sleep(self.delay)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                self._app.logger.exception('Error en %s', self.thread_name)
@@ -0,0 +1,116 @@
+"""Caches en memoria del proceso (una por worker de gunicorn)."""
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Cache LRU acotada con expiración por TTL y contadores de uso.
+
+    Es thread-safe. Cada worker tiene la suya, así que la invalidación
+    explícita solo alcanza al worker que hizo la escritura: en los demás el
+    dato puede quedar viejo como máximo `ttl` segundos.
+    """
+
+    def __init__(self, maxsize=1024, ttl=15.0):
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.configure(maxsize, ttl)
+        self.reset_stats()
+
+    def configure(self, maxsize, ttl):
+        with self._lock:
+            self.maxsize = int(maxsize)
+            self.ttl = float(ttl)
+            self._data.clear()
+
+    @property
+    def enabled(self):
+        return self.maxsize > 0 and self.ttl > 0
+
+    def get(self, key):
+        """Devuelve el valor cacheado o None (y cuenta hit/miss)."""
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def contains(self, key):
+        """True si hay una entrada vigente para `key` (sin contar hit/miss)."""
+        if not self.enabled:
+            return False
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and entry[0] > time.monotonic()
+
+    def set(self, key, value):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            if self._data.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+            }
+
+
+# Payload JSON ya serializado de GET /api/public/invitations/<code>, por unique_code
+public_invitation_cache = TTLCache()
+
+# Identidad del usuario autenticado (User.to_dict()) por id, ver app.identity
+user_identity_cache = TTLCache()
+
+
+def init_app(app):
+    public_invitation_cache.configure(
+        app.config.get('PUBLIC_CACHE_MAX_ENTRIES', 1024),
+        app.config.get('PUBLIC_CACHE_TTL', 15),
+    )
+    user_identity_cache.configure(
+        app.config.get('USER_CACHE_MAX_ENTRIES', 4096),
+        app.config.get('USER_CACHE_TTL', 30),
+    )
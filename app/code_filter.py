@@ -0,0 +1,330 @@
+"""Filtro negativo de códigos de invitación para los endpoints públicos.
+
+Evita la consulta por `unique_code` para códigos que no existen (bots que
+adivinan links) o que no están publicados/ya se borraron (links viejos):
+
+- Bloom filter con todos los códigos existentes: si un código no está, no
+  existe y se responde 404 sin ir a la base. Se construye la primera vez que se
+  usa (una sola vez entre todos los workers) y se mantiene con `add()` al crear
+  invitaciones. Como también puede haber altas desde otro host o por fuera de
+  la app, ante un "no está" se relee cada `NEGATIVE_CACHE_REFRESH_INTERVAL`
+  segundos lo insertado desde el último id visto.
+- Set negativo con TTL para códigos que pasan el Bloom pero la base no
+  devuelve publicados (borrados, despublicados o falsos positivos). Publicar
+  saca el código del set.
+
+Ambos viven en un archivo compartido entre los workers (ver app.shm). Los
+códigos se leen siempre del primario, aun dentro de una ruta @replica_reads: un
+Bloom armado desde una réplica atrasada daría por inexistente un código recién
+creado.
+"""
+import hashlib
+import math
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+
+from app.shm import DATA_OFFSET, SharedMemoryFile, default_path
+
+NOT_BUILT, BUILDING, BUILT = 0, 1, 2
+STATE = struct.Struct('<QQdd')       # estado, último id visto, build reclamado en, último refresh
+COUNTERS = (
+    'bloom_rejected', 'bloom_passed', 'bloom_false_positives',
+    'negative_hits', 'negative_stored', 'codes_added', 'refreshes',
+)
+COUNTER = struct.Struct('<Q')
+NEGATIVE = struct.Struct('<Qd')      # hash del código, expira en
+PROBES = 8
+BUILD_TIMEOUT = 120                  # si el worker que construía murió, otro reintenta
+REFRESH_OVERLAP_IDS = 1000           # ids que se releen por commits fuera de orden
+
+STATE_OFFSET = DATA_OFFSET
+COUNTERS_OFFSET = STATE_OFFSET + STATE.size
+NEGATIVE_OFFSET = COUNTERS_OFFSET + COUNTER.size * len(COUNTERS)
+
+
+def _hashes(code):
+    digest = hashlib.blake2b(code.encode(), digest_size=16).digest()
+    return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+
+
+class InvitationCodeFilter:
+    """Bloom filter de códigos existentes + set negativo con TTL, compartidos."""
+
+    def __init__(self):
+        self.enabled = False
+        self._shared = SharedMemoryFile(b'CODEFLT1')
+        self._map = None
+        self._app = None
+        self._refreshed_pid = None
+        self._build_thread = None
+
+    def init_app(self, app):
+        self._app = app
+        self.enabled = app.config.get('NEGATIVE_CACHE_ENABLED', False)
+        capacity = app.config.get('NEGATIVE_CACHE_BLOOM_CAPACITY', 1_000_000)
+        error_rate = app.config.get('NEGATIVE_CACHE_BLOOM_ERROR_RATE', 0.001)
+        self.negative_slots = app.config.get('NEGATIVE_CACHE_SLOTS', 16384)
+        self.negative_ttl = app.config.get('NEGATIVE_CACHE_TTL', 60)
+        self.refresh_interval = app.config.get('NEGATIVE_CACHE_REFRESH_INTERVAL', 2)
+
+        # Tamaño óptimo: m = -n ln p / (ln 2)^2 bits, k = m/n ln 2 hashes
+        bits = int(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        self.bloom_bytes = (bits + 7) // 8
+        self.bloom_bits = self.bloom_bytes * 8
+        self.hash_count = max(1, round(self.bloom_bits / capacity * math.log(2)))
+        self.bloom_offset = NEGATIVE_OFFSET + NEGATIVE.size * self.negative_slots
+
+        self._shared.configure(
+            app.config.get('NEGATIVE_CACHE_STATE_PATH')
+            or default_path(app, 'codes', app.config.get('SQLALCHEMY_DATABASE_URI'), capacity, error_rate),
+            self.bloom_offset - DATA_OFFSET + self.bloom_bytes,
+        )
+
+    # -- estructura compartida (siempre con el lock tomado) -----------------
+
+    @contextmanager
+    def _locked(self):
+        with self._shared.locked() as shared_map:
+            self._map = shared_map
+            yield
+
+    def _state(self):
+        return STATE.unpack_from(self._map, STATE_OFFSET)
+
+    def _set_state(self, state, max_id, claimed_at, refreshed_at):
+        STATE.pack_into(self._map, STATE_OFFSET, state, max_id, claimed_at, refreshed_at)
+
+    def _bump(self, name, amount=1):
+        offset = COUNTERS_OFFSET + COUNTER.size * COUNTERS.index(name)
+        (value,) = COUNTER.unpack_from(self._map, offset)
+        COUNTER.pack_into(self._map, offset, value + amount)
+
+    def _bit_positions(self, code):
+        h1, h2 = _hashes(code)
+        return [(h1 + i * h2) % self.bloom_bits for i in range(self.hash_count)]
+
+    def _bloom_add(self, code):
+        for bit in self._bit_positions(code):
+            offset = self.bloom_offset + (bit >> 3)
+            self._map[offset] |= 1 << (bit & 7)
+
+    def _bloom_contains(self, code):
+        for bit in self._bit_positions(code):
+            if not self._map[self.bloom_offset + (bit >> 3)] & (1 << (bit & 7)):
+                return False
+        return True
+
+    def _negative_find(self, key_hash, now):
+        """Devuelve (offset del código o None, offset libre/vencido para insertar)."""
+        start = key_hash % self.negative_slots
+        free = oldest = None
+        oldest_expires = None
+        for probe in range(PROBES):
+            offset = NEGATIVE_OFFSET + NEGATIVE.size * ((start + probe) % self.negative_slots)
+            stored_hash, expires = NEGATIVE.unpack_from(self._map, offset)
+            if stored_hash == key_hash and expires > now:
+                return offset, offset
+            if free is None and (stored_hash == 0 or expires <= now):
+                free = offset
+            if oldest_expires is None or expires < oldest_expires:
+                oldest, oldest_expires = offset, expires
+        return None, free if free is not None else oldest
+
+    # -- construcción / refresco desde la base ------------------------------
+
+    def _load_codes(self, since_id):
+        from app import db
+        from app.models.invitation import Invitation
+
+        query = (
+            db.select(Invitation.id, Invitation.unique_code)
+            .where(Invitation.id > since_id)
+            .order_by(Invitation.id)
+            .execution_options(yield_per=5000)
+        )
+        batch, max_id = [], since_id
+        for row in db.session.execute(query):
+            batch.append(row.unique_code)
+            max_id = row.id
+            if len(batch) >= 5000:
+                yield batch, max_id
+                batch = []
+        if batch:
+            yield batch, max_id
+
+    def _merge(self, since_id):
+        """Agrega los códigos con id > since_id. Devuelve el último id visto."""
+        from app.db_routing import primary_reads
+
+        max_id = since_id
+        with primary_reads():
+            for codes, max_id in self._load_codes(since_id):
+                with self._locked():
+                    for code in codes:
+                        self._bloom_add(code)
+        with self._locked():
+            self._bump('refreshes')
+        return max_id
+
+    def _build(self):
+        """Construye el Bloom filter si nadie lo hizo todavía (uno solo entre workers)."""
+        now = time.time()
+        with self._locked():
+            state, _, claimed_at, _ = self._state()
+            if state == BUILT or (state == BUILDING and now - claimed_at < BUILD_TIMEOUT):
+                return
+            self._set_state(BUILDING, 0, now, now)
+        try:
+            max_id = self._merge(0)
+        except Exception:
+            with self._locked():
+                self._set_state(NOT_BUILT, 0, 0.0, 0.0)
+            raise
+        with self._locked():
+            self._set_state(BUILT, max_id, now, now)
+        self._refreshed_pid = os.getpid()
+
+    def _start_build(self):
+        # En un thread aparte: la primera request no paga el scan completo
+        if self._build_thread is not None and self._build_thread.is_alive():
+            return
+        self._build_thread = threading.Thread(target=self._build_in_app_context, name='code-filter-build', daemon=True)
+        self._build_thread.start()
+
+    def _build_in_app_context(self):
+        with self._app.app_context():
+            try:
+                self._build()
+            except Exception:
+                self._app.logger.exception('No se pudo construir el filtro de códigos')
+
+    def _refresh(self):
+        """Agrega lo insertado desde el último refresco (otros hosts, scripts)."""
+        from app import db
+        from app.db_routing import primary_reads
+        from app.models.invitation import Invitation
+
+        with self._locked():
+            _, seen_id, _, _ = self._state()
+        with primary_reads():
+            latest_id = db.session.execute(db.select(db.func.max(Invitation.id))).scalar() or 0
+        if latest_id < seen_id:
+            # La base se recreó (ids reiniciados): se reconstruye desde cero
+            with self._locked():
+                self._map[self.bloom_offset:self.bloom_offset + self.bloom_bytes] = bytes(self.bloom_bytes)
+                self._set_state(NOT_BUILT, 0, 0.0, 0.0)
+            self._build()
+            return
+        max_id = self._merge(max(seen_id - REFRESH_OVERLAP_IDS, 0))
+        with self._locked():
+            state, seen_id, claimed_at, refreshed_at = self._state()
+            self._set_state(state, max(seen_id, max_id), claimed_at, refreshed_at)
+
+    # -- API ----------------------------------------------------------------
+
+    def might_exist(self, code):
+        """False si el código seguro no existe o se sabe no publicado (sin ir a la base)."""
+        now = time.time()
+        key_hash = _hashes(code)[0]
+        with self._locked():
+            found, _ = self._negative_find(key_hash, now)
+            if found is not None:
+                self._bump('negative_hits')
+                return False
+            state, _, _, refreshed_at = self._state()
+
+        if state != BUILT:
+            self._start_build()
+            return True  # mientras se construye se consulta la base
+
+        with self._locked():
+            if self._bloom_contains(code):
+                self._bump('bloom_passed')
+                return True
+            state, seen_id, claimed_at, refreshed_at = self._state()
+            first_use = self._refreshed_pid != os.getpid()
+            if not first_use and now - refreshed_at < self.refresh_interval:
+                self._bump('bloom_rejected')
+                return False
+            self._set_state(state, seen_id, claimed_at, now)  # reclama el refresco
+        self._refreshed_pid = os.getpid()
+
+        self._refresh()
+        with self._locked():
+            if self._bloom_contains(code):
+                self._bump('bloom_passed')
+                return True
+            self._bump('bloom_rejected')
+            return False
+
+    def record_miss(self, code, exists):
+        """La base no devolvió una invitación publicada para `code`: se recuerda por TTL."""
+        with self._locked():
+            if not exists and self._state()[0] == BUILT:
+                self._bump('bloom_false_positives')  # el Bloom dijo "puede existir"
+            self._store_negative(code)
+
+    def mark_missing(self, code):
+        """El código dejó de existir (invitación borrada)."""
+        with self._locked():
+            self._store_negative(code)
+
+    def _store_negative(self, code):
+        now = time.time()
+        key_hash = _hashes(code)[0]
+        found, slot = self._negative_find(key_hash, now)
+        NEGATIVE.pack_into(self._map, found if found is not None else slot, key_hash, now + self.negative_ttl)
+        self._bump('negative_stored')
+
+    def add(self, *codes):
+        """Códigos de invitaciones recién creadas."""
+        with self._locked():
+            for code in codes:
+                self._bloom_add(code)
+                self._forget(code)
+            self._bump('codes_added', len(codes))
+
+    def forget(self, code):
+        """El código pasó a estar publicado: sale del set negativo."""
+        with self._locked():
+            self._forget(code)
+
+    def _forget(self, code):
+        found, _ = self._negative_find(_hashes(code)[0], time.time())
+        if found is not None:
+            NEGATIVE.pack_into(self._map, found, 0, 0.0)
+
+    def stats(self):
+        with self._locked():
+            counters = {
+                name: COUNTER.unpack_from(self._map, COUNTERS_OFFSET + COUNTER.size * i)[0]
+                for i, name in enumerate(COUNTERS)
+            }
+            state, seen_id, _, refreshed_at = self._state()
+            bloom = self._map[self.bloom_offset:self.bloom_offset + self.bloom_bytes]
+        fill_ratio = int.from_bytes(bloom, 'little').bit_count() / self.bloom_bits
+        lookups = counters['bloom_rejected'] + counters['bloom_passed'] + counters['negative_hits']
+        return dict(
+            counters,
+            enabled=self.enabled,
+            built=state == BUILT,
+            max_id_seen=seen_id,
+            last_refresh_age_s=round(time.time() - refreshed_at, 3) if refreshed_at else None,
+            bloom_bits=self.bloom_bits,
+            bloom_hashes=self.hash_count,
+            bloom_fill_ratio=round(fill_ratio, 6),
+            bloom_estimated_fp_rate=round(fill_ratio ** self.hash_count, 8),
+            # Fracción de lookups respondidos sin consultar la base
+            db_avoided_ratio=round((counters['bloom_rejected'] + counters['negative_hits']) / lookups, 4)
+            if lookups else 0.0,
+        )
+
+
+invitation_codes = InvitationCodeFilter()
+
+
+def init_app(app):
+    invitation_codes.init_app(app)
@@ -0,0 +1,106 @@
+"""Comandos de mantenimiento (`flask <comando>`)."""
+import click
+from flask.cli import with_appcontext
+
+from app.sqlite_profile import write_transaction
+
+
+@click.command('recompute-rsvp-stats')
+@click.option('--invitation-id', 'invitation_ids', type=int, multiple=True,
+              help='Limitar a estas invitaciones (se puede repetir)')
+@with_appcontext
+@write_transaction()
+def recompute_rsvp_stats_command(invitation_ids):
+    """Recalcula los contadores de RSVP de las invitaciones desde guests."""
+    from app.models.invitation import Invitation
+
+    repaired = Invitation.recompute_rsvp_counters(list(invitation_ids) or None)
+    click.echo(f'Contadores de RSVP reparados en {repaired} invitación(es)')
+
+
+@click.command('rebuild-user-stats')
+@click.option('--user-id', 'user_ids', type=int, multiple=True,
+              help='Limitar a estos usuarios (default: todos)')
+@with_appcontext
+@write_transaction()
+def rebuild_user_stats_command(user_ids):
+    """Recalcula el rollup user_stats desde el agregado."""
+    from app.models.user_stats import UserStats
+
+    rebuilt = UserStats.rebuild(list(user_ids) or None)
+    click.echo(f'Rollup de estadísticas recalculado para {rebuilt} usuario(s)')
+
+
+@click.command('flush-rsvps')
+@with_appcontext
+def flush_rsvps_command():
+    """Aplica ya todos los RSVPs pendientes de la cola write-behind."""
+    from app.rsvp_queue import rsvp_queue
+
+    flushed = rsvp_queue.flush_all()
+    click.echo(f'{flushed} RSVP(s) aplicados; pendientes: {rsvp_queue.pending_count()}')
+
+
+@click.command('render-snapshots')
+@click.option('--prune', is_flag=True, help='Borrar también los snapshots de invitaciones no publicadas')
+@with_appcontext
+def render_snapshots_command(prune):
+    """Regenera los snapshots estáticos de todas las invitaciones publicadas."""
+    from app.snapshots import public_snapshots
+
+    if not public_snapshots.enabled:
+        raise click.ClickException('STATIC_SNAPSHOTS_DIR no está configurado')
+    rendered, pruned = public_snapshots.render_all(prune=prune)
+    click.echo(f'{rendered} snapshot(s) generados en {public_snapshots.directory}; {pruned} borrados')
+
+
+@click.command('init-db')
+@click.option('--skip-upgrade', is_flag=True, help='No aplicar migraciones, solo el bootstrap del admin')
+@with_appcontext
+@write_transaction()
+def init_db_command(skip_upgrade):
+    """Prepara la base antes de levantar los workers: migraciones + admin."""
+    from flask import current_app
+
+    from app import _bootstrap_admin_user, init_migrate
+
+    app = current_app._get_current_object()
+    if not skip_upgrade:
+        from flask_migrate import upgrade
+
+        init_migrate(app)
+        upgrade()
+        click.echo('Esquema migrado a la última versión')
+    if _bootstrap_admin_user(app):
+        click.echo('Usuario admin creado')
+
+
+class LazyMigrateGroup(click.Group):
+    """`flask db ...` de Flask-Migrate, importado recién al usarse.
+
+    Así los procesos que cargan la app sin el CLI (workers) no importan alembic.
+    """
+
+    def _db_group(self, ctx):
+        from flask.cli import ScriptInfo
+        from flask_migrate.cli import db as db_group
+
+        from app import init_migrate
+
+        init_migrate(ctx.ensure_object(ScriptInfo).load_app())
+        return db_group
+
+    def list_commands(self, ctx):
+        return self._db_group(ctx).list_commands(ctx)
+
+    def get_command(self, ctx, name):
+        return self._db_group(ctx).get_command(ctx, name)
+
+
+def register_commands(app):
+    app.cli.add_command(LazyMigrateGroup('db', help='Migraciones de la base (Flask-Migrate).'))
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(recompute_rsvp_stats_command)
+    app.cli.add_command(rebuild_user_stats_command)
+    app.cli.add_command(flush_rsvps_command)
+    app.cli.add_command(render_snapshots_command)
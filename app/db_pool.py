@@ -0,0 +1,210 @@
+"""Tamaño y telemetría del pool de conexiones de SQLAlchemy.
+
+El pool se dimensiona a partir de la cantidad de workers/threads de gunicorn
+(WEB_CONCURRENCY / WEB_THREADS) y, si se define, del tope total de conexiones
+que la app puede abrir contra la base (DB_MAX_CONNECTIONS). Con pre-ping y
+recycle para no usar conexiones que la base o un proxy ya cerraron.
+
+Solo aplica a bases con servidor (Postgres): SQLite queda con los
+defaults de Flask-SQLAlchemy.
+"""
+import os
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolTelemetry:
+    """Contadores de un pool (por worker): checkouts, esperas, timeouts, conexiones."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pool = None
+        self.reset_stats()
+
+    def watch(self, pool, listen=True):
+        self.pool = pool
+        if listen:
+            event.listen(pool, 'invalidate', self.on_invalidate)
+
+    def reset_stats(self):
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.timeouts = 0
+        self.connects = 0
+        self.connect_seconds = 0.0
+        self.invalidations = 0
+
+    def record_checkout(self, waited, seconds, timed_out=False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            if waited:
+                self.waits += 1
+                self.wait_seconds += seconds
+                self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+    def record_connect(self, seconds):
+        with self._lock:
+            self.connects += 1
+            self.connect_seconds += seconds
+
+    def on_invalidate(self, dbapi_connection, connection_record, exception):
+        # pre-ping fallido, desconexión detectada o invalidación explícita
+        with self._lock:
+            self.invalidations += 1
+
+    def stats(self):
+        pool = self.pool
+        with self._lock:
+            stats = {
+                'checkouts': self.checkouts,
+                'waits': self.waits,
+                'wait_ms_avg': round(self.wait_seconds / self.waits * 1000, 2) if self.waits else 0.0,
+                'wait_ms_max': round(self.max_wait_seconds * 1000, 2),
+                'timeouts': self.timeouts,
+                'connects': self.connects,
+                'connect_ms_avg': round(self.connect_seconds / self.connects * 1000, 2) if self.connects else 0.0,
+                'invalidations': self.invalidations,
+            }
+        if pool is not None:
+            stats.update({
+                'pool_size': pool.size(),
+                'max_overflow': pool._max_overflow,
+                'timeout': pool.timeout(),
+                'checked_out': pool.checkedout(),
+                'checked_in': pool.checkedin(),
+                'overflow': max(0, pool.overflow()),
+            })
+        return stats
+
+
+pool_telemetry = PoolTelemetry()
+async_pool_telemetry = PoolTelemetry()
+replica_pool_telemetry = PoolTelemetry()
+
+
+class _TimedCheckout:
+    """Mide cuánto espera un checkout cuando el pool está agotado.
+
+    Solo cuenta como espera el caso en que ya no quedan conexiones ni overflow
+    disponible (el checkout bloquea hasta `pool_timeout`); abrir una conexión
+    nueva se mide aparte como `connects`.
+    """
+
+    telemetry = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # recreate() (engine.dispose) ya copia los listeners del pool anterior
+        self.telemetry.watch(self, listen='_dispatch' not in kwargs)
+
+    def _do_get(self):
+        exhausted = self._max_overflow > -1 and self._overflow >= self._max_overflow and self._pool.empty()
+        start = time.perf_counter()
+        try:
+            entry = super()._do_get()
+        except exc.TimeoutError:
+            self.telemetry.record_checkout(True, time.perf_counter() - start, timed_out=True)
+            raise
+        self.telemetry.record_checkout(exhausted, time.perf_counter() - start)
+        return entry
+
+    def _create_connection(self):
+        start = time.perf_counter()
+        record = super()._create_connection()
+        self.telemetry.record_connect(time.perf_counter() - start)
+        return record
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    telemetry = pool_telemetry
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    telemetry = async_pool_telemetry
+
+
+class TimedReplicaQueuePool(_TimedCheckout, QueuePool):
+    telemetry = replica_pool_telemetry
+
+
+def pool_options(config, database_url, async_engine=False, replica=False):
+    """Opciones de create_engine para el pool según workers/threads y el tope de conexiones.
+
+    La réplica (bind 'replica') tiene su propio pool del mismo tamaño: el tope
+    DB_MAX_CONNECTIONS se aplica por servidor.
+    """
+    if make_url(database_url).get_backend_name() == 'sqlite':
+        return {}
+
+    workers = max(1, config['WEB_CONCURRENCY'])
+    threads = max(1, config['WEB_THREADS'])
+    # Un thread de request por conexión + una para los threads de fondo
+    # (flusher de RSVPs, refresco del filtro de códigos).
+    pool_size = threads + 1
+    max_overflow = threads
+    if config.get('DB_MAX_CONNECTIONS'):
+        per_worker = max(1, config['DB_MAX_CONNECTIONS'] // workers)
+        pool_size = min(pool_size, per_worker)
+        max_overflow = per_worker - pool_size
+    if config.get('DB_POOL_SIZE') is not None:
+        pool_size = config['DB_POOL_SIZE']
+    if config.get('DB_MAX_OVERFLOW') is not None:
+        max_overflow = config['DB_MAX_OVERFLOW']
+
+    return {
+        'poolclass': TimedAsyncQueuePool if async_engine else TimedReplicaQueuePool if replica else TimedQueuePool,
+        'pool_size': pool_size,
+        'max_overflow': max_overflow,
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+    }
+
+
+def configure(app):
+    """Completa SQLALCHEMY_ENGINE_OPTIONS / ASYNC_ENGINE_OPTIONS (antes de db.init_app).
+
+    Lo que ya venga en esas claves tiene prioridad sobre lo calculado.
+    """
+    config = app.config
+    url = config['SQLALCHEMY_DATABASE_URI']
+    config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        **pool_options(config, url),
+        **config.get('SQLALCHEMY_ENGINE_OPTIONS', {}),
+    }
+    binds = config.get('SQLALCHEMY_BINDS') or {}
+    if binds.get('replica'):
+        replica = binds['replica'] if isinstance(binds['replica'], dict) else {'url': binds['replica']}
+        config['SQLALCHEMY_BINDS'] = {
+            **binds,
+            'replica': {**pool_options(config, replica['url'], replica=True), **replica},
+        }
+    async_url = config.get('ASYNC_DATABASE_URL') or url
+    config['ASYNC_ENGINE_OPTIONS'] = {
+        **pool_options(config, async_url, async_engine=True),
+        **config.get('ASYNC_ENGINE_OPTIONS', {}),
+    }
+
+
+def init_app(app):
+    """Si el engine se creó antes de un fork (gunicorn --preload), cada hijo arma su pool."""
+    from app import db
+
+    with app.app_context():
+        engines = [e for e in db.engines.values() if isinstance(e.pool, _TimedCheckout)]
+    if engines and hasattr(os, 'register_at_fork'):
+        def reset_pools():
+            pool_telemetry.reset_stats()
+            replica_pool_telemetry.reset_stats()
+            for engine in engines:
+                engine.dispose(close=False)
+        os.register_at_fork(after_in_child=reset_pools)
@@ -0,0 +1,330 @@
+"""Lecturas a una réplica (bind 'replica' de SQLALCHEMY_BINDS), escrituras al primario.
+
+Solo se mandan a la réplica los SELECT de las rutas marcadas con
+@replica_reads (o de un bloque `with read_replica():`). Todo lo demás va al
+primario: flush, INSERT/UPDATE/DELETE, SQL textual y cualquier ruta sin marcar.
+Dentro de un request la decisión se toma una vez, así todas sus lecturas ven
+la misma base; si el request escribe, lo que lee después sale del primario.
+
+Read-your-writes: durante REPLICA_READ_YOUR_WRITES_SECONDS después de escribir,
+las lecturas de ese cliente van al primario aunque la ruta admita réplica. Con
+JWT la marca es por usuario, en una tabla compartida entre workers (mmap, ver
+app.shm): los clientes de la API no suelen guardar cookies. Sin JWT (RSVP
+público) el request que escribió deja la cookie `db_last_write`.
+Los refrescos de la micro-cache de nginx (app.microcache) también leen del primario.
+
+Staleness: cada REPLICA_LAG_CHECK_INTERVAL segundos (por worker, en el
+request que lo note) se mide el atraso de la réplica. Si pasa de
+REPLICA_MAX_LAG_SECONDS, o la réplica da error, se lee del primario hasta la
+próxima medición. El atraso sale de pg_last_xact_replay_timestamp() en
+Postgres y, con dos archivos SQLite (desarrollo/tests), de la diferencia de
+mtime entre el primario y la copia. En otras bases se asume al día.
+
+Sin bind 'replica' no hace nada.
+"""
+import functools
+import logging
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import g, has_request_context, request
+from flask_jwt_extended import get_jwt_identity
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+from app.shm import DATA_OFFSET, SharedMemoryFile, default_path
+
+logger = logging.getLogger(__name__)
+
+REPLICA_BIND = 'replica'
+LAST_WRITE_COOKIE = 'db_last_write'
+
+POSTGRES_LAG_SQL = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+LAST_WRITE = struct.Struct('<qd')  # user id, time.time() de la última escritura
+PROBES = 8
+
+_replica_allowed = ContextVar('replica_allowed', default=False)
+
+
+def replica_reads(view):
+    """Marca una vista de solo lectura: sus SELECT pueden ir a la réplica."""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        token = _replica_allowed.set(True)
+        try:
+            return view(*args, **kwargs)
+        finally:
+            _replica_allowed.reset(token)
+    return wrapper
+
+
+@contextmanager
+def read_replica():
+    """Permite réplica para las consultas del bloque (por consulta, fuera de las rutas marcadas)."""
+    token = _replica_allowed.set(True)
+    try:
+        yield
+    finally:
+        _replica_allowed.reset(token)
+
+
+@contextmanager
+def primary_reads():
+    """Fuerza el primario para las consultas del bloque, aun dentro de una ruta
+    @replica_reads (lecturas que después se guardan: negativos, rollups)."""
+    token = _replica_allowed.set(False)
+    try:
+        yield
+    finally:
+        _replica_allowed.reset(token)
+
+
+def _sqlite_mtime(database):
+    """Último cambio de un SQLite en archivo (el WAL incluido)."""
+    wal = f'{database}-wal'
+    return max(os.path.getmtime(database), os.path.getmtime(wal) if os.path.exists(wal) else 0.0)
+
+
+def _request_user():
+    """Id del usuario del JWT si la request ya lo verificó (None en las públicas)."""
+    try:
+        identity = get_jwt_identity()
+    except RuntimeError:
+        return None
+    return int(identity) if identity is not None else None
+
+
+class LastWrites:
+    """Última escritura por usuario, compartida entre workers.
+
+    Tabla hash con sondeo lineal de REPLICA_LAST_WRITE_SLOTS entradas; una
+    entrada más vieja que la ventana de read-your-writes se puede pisar.
+    """
+
+    def __init__(self):
+        self._shared = SharedMemoryFile(b'LASTWR01')
+        self.slots = 0
+
+    def configure(self, path, slots):
+        self.slots = slots
+        self._shared.configure(path, LAST_WRITE.size * slots)
+
+    def _probe(self, shared_map, user_id):
+        start = user_id % self.slots
+        for i in range(PROBES):
+            offset = DATA_OFFSET + LAST_WRITE.size * ((start + i) % self.slots)
+            yield offset, LAST_WRITE.unpack_from(shared_map, offset)
+
+    def record(self, user_id, now, window):
+        with self._shared.locked() as shared_map:
+            target = oldest = None
+            for offset, (slot_user, written_at) in self._probe(shared_map, user_id):
+                if slot_user == user_id:
+                    target = offset
+                    break
+                if target is None and (slot_user == 0 or now - written_at >= window):
+                    target = offset
+                if oldest is None or written_at < oldest[1]:
+                    oldest = (offset, written_at)
+            LAST_WRITE.pack_into(shared_map, target if target is not None else oldest[0], user_id, now)
+
+    def last_write(self, user_id):
+        with self._shared.locked() as shared_map:
+            for _, (slot_user, written_at) in self._probe(shared_map, user_id):
+                if slot_user == user_id:
+                    return written_at
+        return None
+
+
+class ReplicaRouter:
+    """Decide, por request, si las lecturas pueden salir de la réplica."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.enabled = False
+        self.engine = None
+        self.primary = None
+        self.last_writes = LastWrites()
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self._lock:
+            self.lag_seconds = None
+            self.healthy = True
+            self._checked_at = None
+            self.replica_reads = 0
+            self.primary_reads = 0
+            self.fallbacks = {'read_your_writes': 0, 'cache_refresh': 0, 'lag': 0, 'error': 0}
+
+    def init_app(self, app):
+        from app import db
+
+        self.enabled = False
+        if not (app.config.get('SQLALCHEMY_BINDS') or {}).get(REPLICA_BIND):
+            return
+        self.max_lag = app.config.get('REPLICA_MAX_LAG_SECONDS', 5)
+        self.check_interval = app.config.get('REPLICA_LAG_CHECK_INTERVAL', 2)
+        self.read_your_writes = app.config.get('REPLICA_READ_YOUR_WRITES_SECONDS', 5)
+        self.last_writes.configure(
+            app.config.get('REPLICA_LAST_WRITE_STATE_PATH') or default_path(app, 'last-writes'),
+            app.config.get('REPLICA_LAST_WRITE_SLOTS', 4096),
+        )
+        with app.app_context():
+            self.engine = db.engines[REPLICA_BIND]
+            self.primary = db.engine
+        self.reset_stats()
+        self.enabled = True
+        event.listen(self.engine, 'handle_error', self._on_replica_error)
+        app.after_request(self._mark_last_write)
+
+    # -- decisión -------------------------------------------------------------
+
+    def use_replica(self):
+        """True si el SELECT en curso puede ir a la réplica."""
+        if not _replica_allowed.get():
+            return False
+        if not has_request_context():
+            return self._replica_fresh()
+        if g.get('db_wrote'):
+            return False
+        decision = g.get('db_replica_reads')
+        if decision is None:
+            decision = g.db_replica_reads = self._decide_for_request()
+        return decision
+
+    def _decide_for_request(self):
+        from app.microcache import is_refresh_request
+
+        if is_refresh_request():
+            # Lo que se lleva nginx tiene que ser lo último (ver app.microcache)
+            return self._count(False, 'cache_refresh')
+        if self.read_your_writes and self._wrote_recently():
+            return self._count(False, 'read_your_writes')
+        return self._replica_fresh()
+
+    def _wrote_recently(self):
+        user_id = _request_user()
+        if user_id is not None:
+            try:
+                last_write = self.last_writes.last_write(user_id)
+            except OSError:
+                logger.warning('Sin tabla de últimas escrituras; se lee del primario', exc_info=True)
+                return True
+        else:
+            last_write = request.cookies.get(LAST_WRITE_COOKIE)
+        if not last_write:
+            return False
+        try:
+            return time.time() - float(last_write) < self.read_your_writes
+        except ValueError:
+            return False
+
+    def _replica_fresh(self):
+        now = time.monotonic()
+        if self._checked_at is None or now - self._checked_at >= self.check_interval:
+            with self._lock:
+                if self._checked_at is None or now - self._checked_at >= self.check_interval:
+                    self._checked_at = now
+                    self._measure_lag()
+        if not self.healthy:
+            return self._count(False, 'error')
+        if self.lag_seconds is not None and self.lag_seconds > self.max_lag:
+            return self._count(False, 'lag')
+        return self._count(True)
+
+    def _count(self, replica, reason=None):
+        with self._lock:
+            if replica:
+                self.replica_reads += 1
+            else:
+                self.primary_reads += 1
+                self.fallbacks[reason] += 1
+        return replica
+
+    # -- atraso y errores -----------------------------------------------------
+
+    def _measure_lag(self):
+        try:
+            self.lag_seconds = self.measure_lag()
+            self.healthy = True
+        except Exception:
+            logger.warning('No se pudo medir el atraso de la réplica; se lee del primario', exc_info=True)
+            self.healthy = False
+
+    def measure_lag(self):
+        """Segundos de atraso de la réplica (None si la base no permite medirlo)."""
+        dialect = self.engine.dialect.name
+        if dialect == 'postgresql':
+            with self.engine.connect() as conn:
+                return float(conn.exec_driver_sql(POSTGRES_LAG_SQL).scalar())
+        if dialect == 'sqlite' and self.primary.dialect.name == 'sqlite':
+            return max(0.0, _sqlite_mtime(self.primary.url.database) - _sqlite_mtime(self.engine.url.database))
+        return None
+
+    def _on_replica_error(self, context):
+        # Un error de la réplica manda las lecturas al primario hasta la próxima medición
+        if context.is_disconnect or context.connection is None:
+            self.healthy = False
+            self._checked_at = time.monotonic()
+
+    # -- read-your-writes -----------------------------------------------------
+
+    def record_write(self):
+        if has_request_context():
+            g.db_wrote = True
+
+    def _mark_last_write(self, response):
+        if not (g.get('db_wrote') and self.read_your_writes):
+            return response
+        now = time.time()
+        user_id = _request_user()
+        if user_id is not None:
+            try:
+                self.last_writes.record(user_id, now, self.read_your_writes)
+            except OSError:
+                logger.warning('No se pudo anotar la escritura del usuario %s', user_id, exc_info=True)
+        response.set_cookie(LAST_WRITE_COOKIE, f'{now:.3f}', max_age=int(self.read_your_writes) + 1,
+                            httponly=True, samesite='Lax')
+        return response
+
+    def stats(self):
+        with self._lock:
+            return {
+                'enabled': True,
+                'healthy': self.healthy,
+                'lag_seconds': self.lag_seconds,
+                'max_lag_seconds': self.max_lag,
+                'replica_reads': self.replica_reads,
+                'primary_reads': self.primary_reads,
+                'fallbacks': dict(self.fallbacks),
+            }
+
+
+replica_router = ReplicaRouter()
+
+
+class RoutingSession(Session):
+    """Session de Flask-SQLAlchemy que manda los SELECT permitidos a la réplica."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and replica_router.enabled:
+            if self._flushing or (clause is not None and clause.is_dml):
+                replica_router.record_write()
+            elif clause is not None and clause.is_select and replica_router.use_replica():
+                return replica_router.engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def init_app(app):
+    replica_router.init_app(app)
@@ -0,0 +1,72 @@
+"""Identidad del usuario autenticado sin un SELECT de users por request.
+
+`current_user_identity()` devuelve el `User.to_dict()` del dueño del JWT
+(id, email, company_name, nombre, is_active, created_at): primero del contexto
+de la request (g), después de `user_identity_cache` (por worker, con TTL) y
+recién si no está, de la base. Las rutas que modifican al usuario trabajan con
+la fila real y después llaman a `invalidate_user()`; además cualquier UPDATE o
+DELETE de un User invalida su entrada al commitear.
+
+Igual que la cache pública, la invalidación alcanza al worker que hizo el
+cambio: en los demás el dato puede tener hasta USER_CACHE_TTL segundos.
+"""
+from flask import g
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+
+from app import db
+from app.cache import user_identity_cache
+
+
+def current_user_identity():
+    """Dict con los datos del usuario del JWT, o None si ya no existe."""
+    user_id = int(get_jwt_identity())
+    identity = g.get('user_identity')
+    if identity is not None and identity['id'] == user_id:
+        return identity
+
+    identity = user_identity_cache.get(user_id)
+    if identity is None:
+        from app.models.user import User
+
+        user = db.session.get(User, user_id)
+        if user is None:
+            return None
+        identity = user.to_dict()
+        user_identity_cache.set(user_id, identity)
+    g.user_identity = identity
+    return identity
+
+
+def invalidate_user(user_id):
+    user_id = int(user_id)
+    user_identity_cache.invalidate(user_id)
+    identity = g.get('user_identity')
+    if identity is not None and identity['id'] == user_id:
+        g.pop('user_identity')
+
+
+def _track_user_change(mapper, connection, target):
+    # Se invalida recién al commitear: antes otro thread podría volver a
+    # cachear la versión vieja
+    object_session(target).info.setdefault('changed_user_ids', set()).add(target.id)
+
+
+def _invalidate_changed_users(session):
+    for user_id in session.info.pop('changed_user_ids', ()):
+        user_identity_cache.invalidate(user_id)
+
+
+def _discard_changed_users(session, previous_transaction):
+    session.info.pop('changed_user_ids', None)
+
+
+def init_app(app):
+    from app.models.user import User
+
+    if not event.contains(User, 'after_update', _track_user_change):
+        event.listen(User, 'after_update', _track_user_change)
+        event.listen(User, 'after_delete', _track_user_change)
+        event.listen(db.session, 'after_commit', _invalidate_changed_users)
+        event.listen(db.session, 'after_soft_rollback', _discard_changed_users)
@@ -0,0 +1,50 @@
+"""Proveedor JSON de la app respaldado por orjson (dependencia opcional)."""
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # sin orjson queda el proveedor stdlib de Flask
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Serializa con orjson: datetime/date/UUID nativos (ISO 8601) y salida UTF-8.
+
+    Mantiene `sort_keys` y el `default` de Flask para los tipos que orjson no
+    conoce (Decimal, `__html__`). Si se piden argumentos propios de json.dumps
+    (p.ej. `cls`) delega en el proveedor stdlib.
+    """
+
+    def _options(self, indent=None):
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        indent = kwargs.pop('indent', None)
+        kwargs.pop('separators', None)
+        if kwargs:
+            return super().dumps(obj, indent=indent, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._options(indent)).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = orjson.dumps(
+            obj, default=self.default, option=self._options(indent) | orjson.OPT_APPEND_NEWLINE
+        )
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def init_app(app):
+    """Registra OrjsonProvider si JSON_PROVIDER='orjson' y orjson está instalado."""
+    if app.config.get('JSON_PROVIDER', 'orjson') == 'orjson' and orjson is not None:
+        app.json = OrjsonProvider(app)
@@ -0,0 +1,217 @@
+"""Métricas por endpoint en formato Prometheus, agregadas entre workers.
+
+Con METRICS_ENABLED, cada request registra (por endpoint de Flask):
+
+- latencia (histograma) y cantidad por clase de status (2xx, 4xx, ...),
+- tamaño de la respuesta (histograma; las respuestas en streaming no tienen
+  tamaño conocido y no se cuentan ahí, y su latencia llega hasta el primer byte),
+- cantidad de sentencias SQL (histograma) y su tiempo total, vía eventos del
+  engine de SQLAlchemy.
+
+Los acumulados viven en un archivo mapeado en memoria compartido por todos los
+workers (ver app.shm), así que `GET /metrics` devuelve el total de la app sin
+importar qué worker atienda el scrape. Deshabilitado no se registra ningún
+hook ni evento.
+"""
+import hashlib
+import hmac
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import Response, current_app, request
+from sqlalchemy import event
+
+from app.shm import DATA_OFFSET, SharedMemoryFile, default_path
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000)
+SQL_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+STATUS_CLASSES = ('1xx', '2xx', '3xx', '4xx', '5xx')
+UNMATCHED = 'unmatched'  # 404 y métodos sin ruta
+
+# Slot por endpoint: un array de doubles (los contadores caben exactos en 2**53)
+LATENCY_AT = 0
+LATENCY_SUM_AT = LATENCY_AT + len(LATENCY_BUCKETS) + 1
+SIZE_AT = LATENCY_SUM_AT + 1
+SIZE_SUM_AT = SIZE_AT + len(SIZE_BUCKETS) + 1
+SQL_AT = SIZE_SUM_AT + 1
+SQL_SUM_AT = SQL_AT + len(SQL_BUCKETS) + 1
+SQL_SECONDS_AT = SQL_SUM_AT + 1
+STATUS_AT = SQL_SECONDS_AT + 1
+SLOT_SIZE = STATUS_AT + len(STATUS_CLASSES)
+
+
+def _bucket(buckets, value):
+    for i, bound in enumerate(buckets):
+        if value <= bound:
+            return i
+    return len(buckets)
+
+
+class RequestMetrics:
+    """Histogramas por endpoint en memoria compartida + contador de SQL por request."""
+
+    def __init__(self):
+        self.enabled = False
+        self._shared = SharedMemoryFile(b'METRIC01')
+        self._map = None
+        self._view = None
+        self._local = threading.local()
+        self.endpoints = ()
+        self._slots = {}
+
+    def init_app(self, app):
+        self.enabled = app.config.get('METRICS_ENABLED', False)
+        if not self.enabled:
+            return
+        self.token = app.config.get('METRICS_TOKEN')
+        self.state_path = app.config.get('METRICS_STATE_PATH')
+
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.add_url_rule('/metrics', 'metrics', self.metrics_view)
+
+        with app.app_context():
+            from app import db
+            for engine in db.engines.values():
+                event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+                event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+
+    def _ensure_layout(self, app):
+        # Con el url_map completo: los blueprints se registran después de init_app
+        endpoints = tuple(sorted({rule.endpoint for rule in app.url_map.iter_rules()} | {UNMATCHED}))
+        # El path depende de la lista de endpoints: en un deploy con rutas
+        # nuevas los workers viejos y nuevos no comparten un layout distinto
+        layout = hashlib.blake2b('\0'.join(endpoints).encode(), digest_size=6).hexdigest()
+        self._shared.configure(
+            self.state_path or default_path(app, 'metrics', layout),
+            8 * SLOT_SIZE * len(endpoints),
+        )
+        self.endpoints = endpoints
+        self._slots = {name: i * SLOT_SIZE for i, name in enumerate(endpoints)}
+
+    # -- almacenamiento compartido ----------------------------------------
+
+    @contextmanager
+    def _locked(self):
+        with self._shared.locked() as shared_map:
+            if self._map is not shared_map:
+                self._map = shared_map
+                self._view = memoryview(shared_map)[DATA_OFFSET:].cast('d')
+            yield self._view
+
+    # -- hooks de request ---------------------------------------------------
+
+    def _start_request(self):
+        if not self._slots:
+            self._ensure_layout(current_app)
+        local = self._local
+        local.start = time.perf_counter()
+        local.sql_count = 0
+        local.sql_seconds = 0.0
+        local.active = True
+
+    def _finish_request(self, response):
+        local = self._local
+        if not getattr(local, 'active', False):
+            return response
+        local.active = False
+        elapsed = time.perf_counter() - local.start
+        endpoint = request.endpoint if request.endpoint in self._slots else UNMATCHED
+        self.record(endpoint, elapsed, response.status_code,
+                    None if response.is_streamed else response.content_length,
+                    local.sql_count, local.sql_seconds)
+        return response
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        local = self._local
+        if getattr(local, 'active', False):
+            local.sql_started = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        local = self._local
+        if getattr(local, 'active', False):
+            local.sql_count += 1
+            local.sql_seconds += time.perf_counter() - local.sql_started
+
+    def record(self, endpoint, seconds, status, size, sql_count, sql_seconds):
+        base = self._slots[endpoint]
+        status_class = min(max(status // 100, 1), 5) - 1
+        with self._locked() as view:
+            view[base + LATENCY_AT + _bucket(LATENCY_BUCKETS, seconds)] += 1
+            view[base + LATENCY_SUM_AT] += seconds
+            if size is not None:
+                view[base + SIZE_AT + _bucket(SIZE_BUCKETS, size)] += 1
+                view[base + SIZE_SUM_AT] += size
+            view[base + SQL_AT + _bucket(SQL_BUCKETS, sql_count)] += 1
+            view[base + SQL_SUM_AT] += sql_count
+            view[base + SQL_SECONDS_AT] += sql_seconds
+            view[base + STATUS_AT + status_class] += 1
+
+    # -- exposición ---------------------------------------------------------
+
+    def snapshot(self):
+        """{endpoint: lista de SLOT_SIZE valores} con los acumulados de todos los workers."""
+        with self._locked() as view:
+            values = view.tolist()
+        return {
+            name: values[base:base + SLOT_SIZE]
+            for name, base in self._slots.items()
+            if any(values[base + LATENCY_AT:base + LATENCY_SUM_AT])
+        }
+
+    def render(self):
+        """Texto en el formato de exposición de Prometheus (0.0.4)."""
+        snapshot = self.snapshot()
+        lines = []
+
+        def histogram(name, help_text, buckets, at, sum_at):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} histogram')
+            for endpoint, slot in snapshot.items():
+                label = f'endpoint="{endpoint}"'
+                cumulative = 0
+                for i, bound in enumerate(buckets):
+                    cumulative += slot[at + i]
+                    lines.append(f'{name}_bucket{{{label},le="{bound}"}} {cumulative:.0f}')
+                cumulative += slot[at + len(buckets)]
+                lines.append(f'{name}_bucket{{{label},le="+Inf"}} {cumulative:.0f}')
+                lines.append(f'{name}_sum{{{label}}} {slot[sum_at]!r}')
+                lines.append(f'{name}_count{{{label}}} {cumulative:.0f}')
+
+        histogram('http_request_duration_seconds', 'Latencia de los requests por endpoint.',
+                  LATENCY_BUCKETS, LATENCY_AT, LATENCY_SUM_AT)
+        histogram('http_response_size_bytes', 'Tamaño de las respuestas por endpoint (sin streaming).',
+                  SIZE_BUCKETS, SIZE_AT, SIZE_SUM_AT)
+        histogram('http_request_sql_statements', 'Sentencias SQL por request.',
+                  SQL_BUCKETS, SQL_AT, SQL_SUM_AT)
+
+        lines.append('# HELP http_request_sql_seconds_total Tiempo total en sentencias SQL por endpoint.')
+        lines.append('# TYPE http_request_sql_seconds_total counter')
+        for endpoint, slot in snapshot.items():
+            lines.append(f'http_request_sql_seconds_total{{endpoint="{endpoint}"}} {slot[SQL_SECONDS_AT]!r}')
+
+        lines.append('# HELP http_requests_total Requests por endpoint y clase de status.')
+        lines.append('# TYPE http_requests_total counter')
+        for endpoint, slot in snapshot.items():
+            for i, status_class in enumerate(STATUS_CLASSES):
+                if slot[STATUS_AT + i]:
+                    lines.append(f'http_requests_total{{endpoint="{endpoint}",status="{status_class}"}} '
+                                 f'{slot[STATUS_AT + i]:.0f}')
+        return '\n'.join(lines) + '\n'
+
+    def metrics_view(self):
+        if self.token:
+            # En bytes: compare_digest rechaza str que no sean ASCII (sería un 500)
+            expected = f'Bearer {self.token}'.encode()
+            if not hmac.compare_digest(request.headers.get('Authorization', '').encode(), expected):
+                return Response('forbidden\n', status=403, mimetype='text/plain')
+        return Response(self.render(), mimetype='text/plain; version=0.0.4')
+
+
+request_metrics = RequestMetrics()
+
+
+def init_app(app):
+    request_metrics.init_app(app)
@@ -0,0 +1,162 @@
+"""Micro-cache de nginx para los GET públicos (MICROCACHE_TTL) y su refresco.
+
+Headers: las respuestas 200 y 404 de los GET públicos (@micro_cached y el
+modo ASGI) salen con
+  Cache-Control: public, max-age=<MICROCACHE_BROWSER_TTL>, s-maxage=<MICROCACHE_TTL>
+  X-Accel-Expires: <MICROCACHE_TTL>
+nginx (proxy_cache, ver nginx.conf) las guarda MICROCACHE_TTL segundos y el
+navegador MICROCACHE_BROWSER_TTL (0 por defecto: siempre vuelve a nginx). El
+resto (errores) sale con no-store; los 429/503 del rate limit no traen headers
+de cache y nginx tampoco los guarda.
+
+Refresco: nginx open source no tiene PURGE. Cuando una invitación cambia
+(edición, publicación, borrado, RSVP) se anota su código después del commit y
+un thread por worker pide a nginx (MICROCACHE_PURGE_URL) sus URLs públicas con
+`X-Cache-Refresh: <MICROCACHE_PURGE_TOKEN>`. Para esa request nginx saltea la
+cache (proxy_cache_bypass) y guarda la respuesta nueva en la misma clave. nginx
+le pasa el header a la app solo si el token es válido, y la app lo vuelve a
+comparar con MICROCACHE_PURGE_TOKEN: con el token el worker no usa su cache en
+memoria ni la réplica, así lo que queda en nginx es lo último del primario. Sin
+token configurado no hay refresco.
+
+Atraso acotado: sin refresco (o si falla), MICROCACHE_TTL; con refresco, lo que
+tarde en llegar (MICROCACHE_PURGE_DELAY + un request). Quien acaba de escribir
+(cookie db_last_write) no lee de la cache de nginx.
+"""
+import functools
+import hmac
+import time
+import urllib.error
+import urllib.request
+
+from flask import has_request_context, make_response, request
+
+from app.background import CoalescingWorker
+
+REFRESH_HEADER = 'X-Cache-Refresh'
+CACHEABLE_STATUSES = frozenset([200, 404])
+
+# URLs públicas de una invitación que pueden quedar en la cache de nginx
+PUBLIC_PATHS = (
+    '/api/public/invitations/{code}',
+    '/api/public/invitations/{code}/guests',
+    '/api/public/invitations/{code}/page',
+)
+
+
+def is_refresh_token(value):
+    """True si `value` (el header X-Cache-Refresh) es MICROCACHE_PURGE_TOKEN."""
+    token = microcache.purge_token
+    if not token or not value:
+        return False
+    return hmac.compare_digest(value.encode(), token.encode())
+
+
+def is_refresh_request():
+    """True si la request es un refresco de la cache de nginx (ver MicroCache)."""
+    return has_request_context() and is_refresh_token(request.headers.get(REFRESH_HEADER))
+
+
+def cache_headers(status):
+    """Headers de cache para una respuesta pública con ese status (pares nombre, valor)."""
+    if microcache.ttl <= 0:
+        return []
+    if status not in CACHEABLE_STATUSES:
+        return [('Cache-Control', 'no-store')]
+    return [
+        ('Cache-Control', f'public, max-age={microcache.browser_ttl}, s-maxage={microcache.ttl}'),
+        ('X-Accel-Expires', str(microcache.ttl)),
+    ]
+
+
+def micro_cached(view):
+    """Marca un GET público: su respuesta lleva los headers de la micro-cache."""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        response = make_response(view(*args, **kwargs))
+        for name, value in cache_headers(response.status_code):
+            response.headers[name] = value
+        return response
+    return wrapper
+
+
+class MicroCache(CoalescingWorker):
+    """TTLs de la micro-cache + refresco en nginx de los códigos que cambian."""
+
+    thread_name = 'microcache-refresh'
+
+    def __init__(self):
+        super().__init__()
+        self.ttl = 0
+        self.browser_ttl = 0
+        self.purge_url = None
+        self.purge_token = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self._lock:
+            self.refreshed = 0
+            self.failed = 0
+            self.batches = 0
+            self.last_refresh_ms = None
+
+    def init_app(self, app):
+        self._app = app
+        self.ttl = int(app.config.get('MICROCACHE_TTL', 0))
+        self.browser_ttl = int(app.config.get('MICROCACHE_BROWSER_TTL', 0))
+        self.purge_url = (app.config.get('MICROCACHE_PURGE_URL') or '').rstrip('/') or None
+        self.purge_token = app.config.get('MICROCACHE_PURGE_TOKEN') or None
+        self.timeout = app.config.get('MICROCACHE_PURGE_TIMEOUT', 2.0)
+        self.delay = app.config.get('MICROCACHE_PURGE_DELAY', 0.5)
+        # Sin URL de nginx o sin token no hay refresco: el atraso queda acotado por el TTL
+        self.enabled = self.ttl > 0 and self.purge_url is not None and self.purge_token is not None
+
+    def process(self, codes):
+        start = time.perf_counter()
+        refreshed = failed = 0
+        for code in codes:
+            for path in PUBLIC_PATHS:
+                if self._refresh(path.format(code=code)):
+                    refreshed += 1
+                else:
+                    failed += 1
+        with self._lock:
+            self.refreshed += refreshed
+            self.failed += failed
+            self.batches += 1
+            self.last_refresh_ms = round((time.perf_counter() - start) * 1000, 2)
+
+    def _refresh(self, path):
+        req = urllib.request.Request(self.purge_url + path, headers={REFRESH_HEADER: self.purge_token})
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as response:
+                response.read()
+        except urllib.error.HTTPError as e:
+            # 404 (borrada/no publicada) también reemplaza la entrada
+            if e.code not in CACHEABLE_STATUSES:
+                self._app.logger.warning('Refresco de %s en nginx: HTTP %s', path, e.code)
+                return False
+        except OSError as e:
+            self._app.logger.warning('Refresco de %s en nginx falló: %s', path, e)
+            return False
+        return True
+
+    def stats(self):
+        with self._lock:
+            return {
+                'ttl': self.ttl,
+                'browser_ttl': self.browser_ttl,
+                'refresh_enabled': self.enabled,
+                'pending': len(self._pending),
+                'refreshed': self.refreshed,
+                'failed': self.failed,
+                'batches': self.batches,
+                'last_refresh_ms': self.last_refresh_ms,
+            }
+
+
+microcache = MicroCache()
+
+
+def init_app(app):
+    microcache.init_app(app)
@@ -2,5 +2,7 @@ from app.models.user import User
 from app.models.invitation import Invitation
 from app.models.template import Template
 from app.models.guest import Guest
+from app.models.user_stats import UserStats
+from app.models.applied_rsvp import AppliedRsvp
 
-__all__ = ['User', 'Invitation', 'Template', 'Guest']
+__all__ = ['User', 'Invitation', 'Template', 'Guest', 'UserStats', 'AppliedRsvp']
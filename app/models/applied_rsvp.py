@@ -0,0 +1,15 @@
+from app import db
+from datetime import datetime
+
+
+class AppliedRsvp(db.Model):
+    """Entrada de la cola write-behind ya aplicada (ver app.rsvp_queue).
+
+    Se escribe en la misma transacción que el RSVP: si el flusher cae entre el
+    commit y el ack, el reintento del lote la saltea en vez de aplicarla dos
+    veces. Se purga pasado RSVP_APPLIED_RETENTION.
+    """
+    __tablename__ = 'rsvp_queue_applied'
+
+    entry_key = db.Column(db.String(32), primary_key=True)
+    applied_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
@@ -1,9 +1,27 @@
 from app import db
+from app.models.serialization import compile_serializer
+from contextlib import nullcontext
 from datetime import datetime
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+
+_DIALECT_INSERTS = {'postgresql': postgresql_insert, 'sqlite': sqlite_insert}
+UPSERT_DIALECTS = frozenset(_DIALECT_INSERTS)
+
+
+class _ConcurrentInsert(Exception):
+    """Otro envío insertó al invitado entre el SELECT ... FOR UPDATE y el upsert."""
 
 class Guest(db.Model):
     """Modelo de invitado"""
     __tablename__ = 'guests'
+    __table_args__ = (
+        # Targets del upsert de RSVP (ON CONFLICT); el prefijo también cubre
+        # los filtros por invitation_id solo. NULL no choca con NULL.
+        db.Index('uq_guests_invitation_email', 'invitation_id', 'email', unique=True),
+        db.Index('uq_guests_invitation_phone', 'invitation_id', 'phone', unique=True),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     invitation_id = db.Column(db.Integer, db.ForeignKey('invitations.id'), nullable=False)
@@ -20,22 +38,123 @@ class Guest(db.Model):
     
     # Notas
     notes = db.Column(db.Text)
-    
+
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    @classmethod
+    def upsert_rsvp(cls, invitation, fields):
+        """Registra el RSVP de un invitado en la transacción actual (sin commit).
+
+        Un solo INSERT ... ON CONFLICT DO UPDATE ... RETURNING contra los índices
+        únicos (invitation_id, email) / (invitation_id, phone): dos envíos
+        simultáneos del mismo invitado no pueden duplicarlo. Los valores
+        previos (para los deltas de los contadores) salen de un
+        SELECT ... FOR UPDATE en la misma transacción, antes del upsert. Con email y
+        teléfono manda el registro del email; un dato de contacto que ya es de
+        otro invitado no se guarda. Los datos de contacto existentes nunca se
+        pisan (ni con NULL). Actualiza también los contadores de la invitación.
+        Devuelve (guest, created); IntegrityError si el conflicto persiste.
+        """
+        contacts = [column for column in ('email', 'phone') if fields.get(column)]
+        if not contacts:
+            # Sin datos de contacto no hay con qué deduplicar
+            guest = cls(invitation_id=invitation.id, **fields)
+            db.session.add(guest)
+            db.session.flush()
+            invitation.apply_rsvp_change(None, None, guest.rsvp_status, guest.number_of_guests)
+            return guest, True
+
+        for attempt in range(2):
+            try:
+                with cls._statement_savepoint():
+                    target, values, previous = cls._resolve_target(invitation.id, fields, contacts)
+                    stmt = cls._upsert_statement(invitation.id, values, target)
+                    guest, inserted = db.session.execute(
+                        stmt, execution_options={'populate_existing': True}
+                    ).one()
+                    if inserted is not None and inserted != (previous is None):
+                        raise _ConcurrentInsert()
+                break
+            except (IntegrityError, _ConcurrentInsert):
+                # Otro envío registró al invitado (o el otro dato de contacto)
+                # en el medio: se vuelve a resolver una vez, ya con la fila
+                # visible y bloqueada; si sigue chocando, lo ve el caller
+                if attempt:
+                    raise
+
+        created = previous is None
+        if created:
+            old_status, old_guests = None, None
+        else:
+            old_status, old_guests = previous.rsvp_status or 'pending', previous.number_of_guests
+
+        # Contadores denormalizados en la misma transacción que el upsert
+        invitation.apply_rsvp_change(old_status, old_guests, guest.rsvp_status, guest.number_of_guests)
+        return guest, created
+
+    @classmethod
+    def _resolve_target(cls, invitation_id, fields, contacts):
+        """Índice del ON CONFLICT, valores a insertar y fila actual del invitado.
+
+        Con un solo dato de contacto no hay ambigüedad. Con los dos se busca
+        quién los tiene: si son de invitados distintos, gana el del email y el
+        teléfono (de otro) se descarta. Las filas leídas quedan bloqueadas
+        (FOR UPDATE; en SQLite ya serializa el lock de escritura) hasta el
+        commit, así que su estado es el que pisa el upsert.
+        """
+        rows = db.session.execute(
+            db.select(cls.id, cls.email, cls.phone, cls.rsvp_status, cls.number_of_guests).where(
+                cls.invitation_id == invitation_id,
+                db.or_(*(getattr(cls, column) == fields[column] for column in contacts)),
+            ).with_for_update()
+        ).all()
+        by_email = next((row for row in rows if 'email' in contacts and row.email == fields['email']), None)
+        by_phone = next((row for row in rows if 'phone' in contacts and row.phone == fields['phone']), None)
+        if len(contacts) == 1:
+            return contacts[0], fields, by_email or by_phone
+        if by_email is not None and by_phone is not None and by_email.id != by_phone.id:
+            return 'email', dict(fields, phone=None), by_email
+        if by_email is None and by_phone is not None:
+            return 'phone', fields, by_phone
+        return 'email', fields, by_email
+
+    @classmethod
+    def _upsert_statement(cls, invitation_id, fields, target):
+        dialect = db.session.get_bind().dialect.name
+        stmt = _DIALECT_INSERTS[dialect](cls).values(invitation_id=invitation_id, **fields)
+        table = cls.__table__.c
+        updates = {key: stmt.excluded[key] for key in fields if key not in ('email', 'phone')}
+        updates['updated_at'] = datetime.utcnow()
+        # Los datos de contacto solo completan lo que falta: un reenvío con
+        # solo el teléfono no borra el email guardado, ni al revés
+        for column in ('email', 'phone'):
+            if column != target:
+                updates[column] = db.func.coalesce(table[column], stmt.excluded[column])
+        # Postgres dice si la fila es nueva (xmax = 0): si el SELECT no la vio
+        # pero ya existía, otro envío la insertó en el medio. En SQLite el lock
+        # de escritura ya lo impide
+        inserted = db.literal_column('xmax = 0') if dialect == 'postgresql' else db.null()
+        return stmt.on_conflict_do_update(
+            index_elements=['invitation_id', target],
+            set_=updates,
+        ).returning(cls, inserted)
+
+    @staticmethod
+    def _statement_savepoint():
+        # En Postgres un error aborta la transacción entera; en SQLite solo la
+        # sentencia (y pysqlite no emite BEGIN antes de un SAVEPOINT, así que el
+        # RELEASE commitearía lo anterior)
+        if db.session.get_bind().dialect.name == 'postgresql':
+            return db.session.begin_nested()
+        return nullcontext()
+
     def to_dict(self):
         """Convertir a diccionario"""
-        return {
-            'id': self.id,
-            'invitation_id': self.invitation_id,
-            'name': self.name,
-            'email': self.email,
-            'phone': self.phone,
-            'rsvp_status': self.rsvp_status,
-            'rsvp_date': self.rsvp_date.isoformat() if self.rsvp_date else None,
-            'number_of_guests': self.number_of_guests,
-            'dietary_restrictions': self.dietary_restrictions,
-            'notes': self.notes,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-        }
+        return _serialize_guest(self)
+
+
+_serialize_guest = compile_serializer(Guest, [
+    'id', 'invitation_id', 'name', 'email', 'phone', 'rsvp_status', 'rsvp_date',
+    'number_of_guests', 'dietary_restrictions', 'notes', 'created_at',
+])
@@ -1,19 +1,37 @@
 from app import db
+from app.models.serialization import compile_serializer
 from datetime import datetime
+from sqlalchemy import func, update
 import secrets
 
 
+# rsvp_status -> columna de contador denormalizado en invitations
+RSVP_COUNTER_COLUMNS = {
+    'accepted': 'rsvp_accepted',
+    'declined': 'rsvp_declined',
+    'tentative': 'rsvp_tentative',
+    'pending': 'rsvp_pending',
+}
+RSVP_COUNTER_FIELDS = tuple(RSVP_COUNTER_COLUMNS.values()) + ('rsvp_headcount',)
+
+
 class Invitation(db.Model):
     """Modelo de invitación de cumpleaños.
 
-    Nota: este proyecto usa db.create_all() (sin migraciones). Si agregás columnas,
-    en dev puede que tengas que borrar el .db de SQLite y reiniciar.
+    Nota: el esquema se versiona con Flask-Migrate (carpeta migrations/). Si
+    agregás columnas, generá la revisión con `flask db migrate -m "..."`,
+    revisala y aplicala con `flask db upgrade`.
     """
 
     __tablename__ = 'invitations'
+    __table_args__ = (
+        # Listados por dueño + paginación keyset por (created_at, id)
+        db.Index('ix_invitations_user_created', 'user_id', 'created_at', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    template_id = db.Column(db.Integer, db.ForeignKey('templates.id', name='fk_invitations_template_id_templates'))
 
     # Información del cumpleañero
     birthday_name = db.Column(db.String(255), nullable=False)
@@ -52,6 +70,14 @@ class Invitation(db.Model):
     is_active = db.Column(db.Boolean, default=True)
     is_published = db.Column(db.Boolean, default=False)
 
+    # Contadores de RSVP denormalizados (los mantiene submit_rsvp en la misma
+    # transacción; `flask recompute-rsvp-stats` los repara)
+    rsvp_accepted = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rsvp_declined = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rsvp_tentative = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rsvp_pending = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rsvp_headcount = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -59,46 +85,119 @@ class Invitation(db.Model):
     guests = db.relationship('Guest', backref='invitation', lazy=True, cascade='all, delete-orphan')
 
     def rsvp_stats(self):
-        accepted = sum(1 for g in self.guests if g.rsvp_status == 'accepted')
-        declined = sum(1 for g in self.guests if g.rsvp_status == 'declined')
-        tentative = sum(1 for g in self.guests if g.rsvp_status == 'tentative')
-        pending = sum(1 for g in self.guests if g.rsvp_status == 'pending')
+        """Stats de RSVP desde los contadores denormalizados (O(1), no lee guests)."""
+        accepted = self.rsvp_accepted or 0
+        declined = self.rsvp_declined or 0
+        tentative = self.rsvp_tentative or 0
+        pending = self.rsvp_pending or 0
         return {
             'accepted': accepted,
             'declined': declined,
             'tentative': tentative,
             'pending': pending,
-            'total_rsvps': len(self.guests),
+            'total_rsvps': accepted + declined + tentative + pending,
+            'total_headcount': self.rsvp_headcount or 0,
         }
 
+    @staticmethod
+    def rsvp_counter_deltas(old_status, old_guests, new_status, new_guests):
+        """Calcula los deltas de contadores para un cambio de RSVP.
+
+        `old_status` es None cuando el invitado es nuevo. El headcount solo
+        cuenta personas de RSVPs aceptados.
+        """
+        deltas = {}
+
+        def bump(column, amount):
+            deltas[column] = deltas.get(column, 0) + amount
+
+        if old_status is not None:
+            bump(RSVP_COUNTER_COLUMNS.get(old_status), -1)
+            if old_status == 'accepted':
+                bump('rsvp_headcount', -(old_guests or 1))
+        bump(RSVP_COUNTER_COLUMNS.get(new_status), 1)
+        if new_status == 'accepted':
+            bump('rsvp_headcount', new_guests or 1)
+
+        return {column: amount for column, amount in deltas.items() if column and amount}
+
+    def apply_rsvp_change(self, old_status, old_guests, new_status, new_guests):
+        """Actualiza los contadores en la transacción actual (sin commit).
+
+        Usa `col = col + delta` en SQL para que dos RSVPs concurrentes no se
+        pisen los contadores.
+        """
+        deltas = self.rsvp_counter_deltas(old_status, old_guests, new_status, new_guests)
+        if not deltas:
+            return
+        values = {
+            getattr(Invitation, column): func.coalesce(getattr(Invitation, column), 0) + amount
+            for column, amount in deltas.items()
+        }
+        db.session.execute(
+            update(Invitation)
+            .where(Invitation.id == self.id)
+            .values(values)
+            .execution_options(synchronize_session=False)
+        )
+        # Forzar recarga de los contadores desde la DB en el próximo acceso
+        db.session.expire(self, list(deltas))
+
+        from app.models.user_stats import UserStats
+        deltas.pop('rsvp_headcount', None)
+        UserStats.bump(self.user_id, total_guests=1 if old_status is None else 0, **deltas)
+
+    @classmethod
+    def recompute_rsvp_counters(cls, invitation_ids=None):
+        """Recalcula los contadores desde la tabla guests (reparación).
+
+        Devuelve la cantidad de invitaciones cuyos contadores estaban mal.
+        """
+        from app.models.guest import Guest
+
+        status = func.coalesce(Guest.rsvp_status, 'pending')
+        query = db.session.query(
+            Guest.invitation_id,
+            status,
+            func.count(Guest.id),
+            func.sum(func.coalesce(Guest.number_of_guests, 1)),
+        ).group_by(Guest.invitation_id, status)
+        invitations = cls.query
+        if invitation_ids is not None:
+            query = query.filter(Guest.invitation_id.in_(invitation_ids))
+            invitations = invitations.filter(cls.id.in_(invitation_ids))
+
+        counts = {}
+        for invitation_id, rsvp_status, total, people in query:
+            row = counts.setdefault(invitation_id, dict.fromkeys(RSVP_COUNTER_FIELDS, 0))
+            column = RSVP_COUNTER_COLUMNS.get(rsvp_status)
+            if column:
+                row[column] += total
+            if rsvp_status == 'accepted':
+                row['rsvp_headcount'] += people or 0
+
+        repaired = 0
+        for invitation in invitations:
+            expected = counts.get(invitation.id, dict.fromkeys(RSVP_COUNTER_FIELDS, 0))
+            if any(getattr(invitation, f) != v for f, v in expected.items()):
+                for field, value in expected.items():
+                    setattr(invitation, field, value)
+                repaired += 1
+
+        db.session.commit()
+        return repaired
+
     def to_dict(self):
         """Convertir a diccionario"""
-        return {
-            'id': self.id,
-            'user_id': self.user_id,
-            'birthday_name': self.birthday_name,
-            'birthday_date': self.birthday_date.isoformat() if self.birthday_date else None,
-            'birthday_age': self.birthday_age,
-            'event_title': self.event_title,
-            'event_date': self.event_date.isoformat() if self.event_date else None,
-            'event_time': self.event_time,
-            'event_location': self.event_location,
-            'event_address': self.event_address,
-            'organizer_name': self.organizer_name,
-            'organizer_phone': self.organizer_phone,
-            'organizer_email': self.organizer_email,
-            'dress_code': self.dress_code,
-            'rsvp_deadline': self.rsvp_deadline.isoformat() if self.rsvp_deadline else None,
-            'special_notes': self.special_notes,
-            'template_key': self.template_key,
-            'hero_image_url': self.hero_image_url,
-            'image_1_url': self.image_1_url,
-            'image_2_url': self.image_2_url,
-            'video_url': self.video_url,
-            'unique_code': self.unique_code,
-            'share_url': self.share_url,
-            'is_active': self.is_active,
-            'is_published': self.is_published,
-            'rsvp_stats': self.rsvp_stats(),
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-        }
+        data = _serialize_invitation(self)
+        data['rsvp_stats'] = self.rsvp_stats()
+        return data
+
+
+_serialize_invitation = compile_serializer(Invitation, [
+    'id', 'user_id', 'birthday_name', 'birthday_date', 'birthday_age', 'event_title',
+    'event_date', 'event_time', 'event_location', 'event_address', 'organizer_name',
+    'organizer_phone', 'organizer_email', 'dress_code', 'rsvp_deadline', 'special_notes',
+    'template_key', 'hero_image_url', 'image_1_url', 'image_2_url', 'video_url',
+    'unique_code', 'share_url', 'is_active', 'is_published', 'created_at',
+])
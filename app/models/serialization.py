@@ -0,0 +1,36 @@
+"""Serializadores de modelos compilados una sola vez a partir de sus columnas."""
+from app import db
+
+
+def compile_serializer(model, fields):
+    """Genera la función `obj -> dict` para las columnas `fields` de `model`.
+
+    El cuerpo se arma como código Python una sola vez (al importar el modelo):
+    un literal de dict con `.isoformat()` solo en las columnas DateTime, sin
+    loops ni chequeos de tipo por fila. Lee los valores ya cargados directo
+    del `__dict__` de la instancia (sin pasar por el descriptor del ORM); si
+    alguno no está cargado (expirado/diferido) usa el acceso normal, que lo
+    trae de la base.
+    """
+    columns = model.__table__.columns
+    lines = ['def serialize(obj):', '    try:', '        d = obj.__dict__']
+    fast, slow = [], []
+    for index, name in enumerate(fields):
+        if not name.isidentifier() or name not in columns:
+            raise ValueError(f'{model.__name__} no tiene la columna {name!r}')
+        if isinstance(columns[name].type, db.DateTime):
+            lines.append(f'        v{index} = d[{name!r}]')
+            fast.append(f'{name!r}: v{index}.isoformat() if v{index} is not None else None')
+            slow.append(f'{name!r}: obj.{name}.isoformat() if obj.{name} is not None else None')
+        else:
+            fast.append(f'{name!r}: d[{name!r}]')
+            slow.append(f'{name!r}: obj.{name}')
+    lines.append('        return {' + ', '.join(fast) + '}')
+    lines.append('    except KeyError:')
+    lines.append('        return {' + ', '.join(slow) + '}')
+
+    namespace = {}
+    exec(compile('\n'.join(lines), f'<serializer {model.__name__}>', 'exec'), namespace)
+    serialize = namespace['serialize']
+    serialize.__doc__ = f'Serializa {model.__name__} ({", ".join(fields)})'
+    return serialize
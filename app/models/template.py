@@ -1,4 +1,5 @@
 from app import db
+from app.models.serialization import compile_serializer
 from datetime import datetime
 
 class Template(db.Model):
@@ -6,7 +7,7 @@ class Template(db.Model):
     __tablename__ = 'templates'
     
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     name = db.Column(db.String(255), nullable=False)
     description = db.Column(db.Text)
     
@@ -38,21 +39,11 @@ class Template(db.Model):
     
     def to_dict(self):
         """Convertir a diccionario"""
-        return {
-            'id': self.id,
-            'name': self.name,
-            'description': self.description,
-            'title': self.title,
-            'subtitle': self.subtitle,
-            'header_text': self.header_text,
-            'footer_text': self.footer_text,
-            'primary_color': self.primary_color,
-            'secondary_color': self.secondary_color,
-            'text_color': self.text_color,
-            'background_color': self.background_color,
-            'logo_url': self.logo_url,
-            'background_image_url': self.background_image_url,
-            'is_active': self.is_active,
-            'is_default': self.is_default,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-        }
+        return _serialize_template(self)
+
+
+_serialize_template = compile_serializer(Template, [
+    'id', 'name', 'description', 'title', 'subtitle', 'header_text', 'footer_text',
+    'primary_color', 'secondary_color', 'text_color', 'background_color', 'logo_url',
+    'background_image_url', 'is_active', 'is_default', 'created_at',
+])
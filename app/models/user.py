@@ -1,4 +1,5 @@
 from app import db
+from app.models.serialization import compile_serializer
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
 
@@ -30,12 +31,9 @@ class User(db.Model):
     
     def to_dict(self):
         """Convertir a diccionario"""
-        return {
-            'id': self.id,
-            'email': self.email,
-            'company_name': self.company_name,
-            'first_name': self.first_name,
-            'last_name': self.last_name,
-            'is_active': self.is_active,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-        }
+        return _serialize_user(self)
+
+
+_serialize_user = compile_serializer(User, [
+    'id', 'email', 'company_name', 'first_name', 'last_name', 'is_active', 'created_at',
+])
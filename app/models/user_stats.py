@@ -0,0 +1,137 @@
+from app import db
+from datetime import datetime
+from app.models.user import User
+from flask import current_app, has_app_context
+from sqlalchemy import case, event, func, select, update
+
+
+STAT_FIELDS = (
+    'total_invitations', 'published_invitations', 'total_templates', 'total_guests',
+    'rsvp_accepted', 'rsvp_declined', 'rsvp_tentative', 'rsvp_pending',
+)
+
+
+class UserStats(db.Model):
+    """Rollup opcional de estadísticas por usuario (USER_STATS_ROLLUP).
+
+    Los caminos de escritura (invitaciones, templates, RSVP) lo actualizan con
+    incrementos en su propia transacción. La fila se crea junto con el usuario
+    (la migración 0009 la completó para los anteriores); nunca desde un GET.
+    Con el rollup apagado no se mantiene: al prenderlo, o si se desfasa,
+    `flask rebuild-user-stats` la recalcula.
+    """
+    __tablename__ = 'user_stats'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    total_invitations = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    published_invitations = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    total_templates = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    total_guests = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rsvp_accepted = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rsvp_declined = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rsvp_tentative = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rsvp_pending = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @staticmethod
+    def rollup_enabled():
+        return has_app_context() and current_app.config.get('USER_STATS_ROLLUP', False)
+
+    @staticmethod
+    def aggregate(user_id):
+        """Todas las estadísticas del usuario en una sola consulta agrupada.
+
+        Usa los contadores de RSVP de cada invitación, así que no toca guests.
+        Devuelve None si el usuario no existe.
+        """
+        from app.models.invitation import Invitation
+        from app.models.template import Template
+
+        total_templates = (
+            select(func.count(Template.id))
+            .where(Template.user_id == User.id)
+            .scalar_subquery()
+        )
+
+        def total(column):
+            return func.coalesce(func.sum(column), 0)
+
+        row = db.session.execute(
+            select(
+                User.id,
+                func.count(Invitation.id).label('total_invitations'),
+                total(case((Invitation.is_published.is_(True), 1), else_=0)).label('published_invitations'),
+                total_templates.label('total_templates'),
+                total(Invitation.rsvp_accepted + Invitation.rsvp_declined
+                      + Invitation.rsvp_tentative + Invitation.rsvp_pending).label('total_guests'),
+                total(Invitation.rsvp_accepted).label('rsvp_accepted'),
+                total(Invitation.rsvp_declined).label('rsvp_declined'),
+                total(Invitation.rsvp_tentative).label('rsvp_tentative'),
+                total(Invitation.rsvp_pending).label('rsvp_pending'),
+            )
+            .select_from(User)
+            .outerjoin(Invitation, Invitation.user_id == User.id)
+            .where(User.id == user_id)
+            .group_by(User.id)
+        ).first()
+
+        if row is None:
+            return None
+        return {field: int(getattr(row, field)) for field in STAT_FIELDS}
+
+    @classmethod
+    def for_user(cls, user_id):
+        """Lee el rollup por PK; sin fila (usuario creado con el rollup apagado)
+        responde desde el agregado, sin escribir."""
+        stats = db.session.get(cls, user_id)
+        if stats is not None:
+            return stats.to_dict()
+        return cls.aggregate(user_id)
+
+    @classmethod
+    def bump(cls, user_id, **deltas):
+        """Suma deltas al rollup en la transacción actual (sin commit).
+
+        No hace nada si el rollup está desactivado o el usuario no tiene fila.
+        """
+        deltas = {field: amount for field, amount in deltas.items() if amount}
+        if not deltas or not cls.rollup_enabled():
+            return
+        db.session.execute(
+            update(cls)
+            .where(cls.user_id == user_id)
+            .values({getattr(cls, field): getattr(cls, field) + amount for field, amount in deltas.items()})
+            .execution_options(synchronize_session=False)
+        )
+
+    @classmethod
+    def rebuild(cls, user_ids=None):
+        """Recalcula (y crea si falta) el rollup de los usuarios indicados o de todos."""
+        if user_ids is None:
+            user_ids = [row.id for row in User.query.with_entities(User.id)]
+        rebuilt = 0
+        for user_id in user_ids:
+            values = cls.aggregate(user_id)
+            stats = db.session.get(cls, user_id)
+            if values is None:
+                if stats is not None:
+                    db.session.delete(stats)
+                continue
+            if stats is None:
+                stats = cls(user_id=user_id)
+                db.session.add(stats)
+            for field, value in values.items():
+                setattr(stats, field, value)
+            rebuilt += 1
+        db.session.commit()
+        return rebuilt
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in STAT_FIELDS}
+
+
+@event.listens_for(User, 'after_insert')
+def _create_user_stats(mapper, connection, target):
+    # Usuario nuevo: su fila del rollup (todo en cero) en la misma transacción
+    if UserStats.rollup_enabled():
+        connection.execute(UserStats.__table__.insert().values(user_id=target.id))
@@ -0,0 +1,254 @@
+"""Rate limiting y load shedding de los endpoints públicos, compartido entre workers.
+
+El estado vive en un archivo mapeado en memoria (mmap) que todos los workers de
+gunicorn abren en el mismo path, serializado con flock:
+
+- buckets de tokens por IP de cliente y por unique_code (tabla hash con
+  sondeo lineal; un bucket viejo se puede pisar porque ya estaría lleno),
+- requests en curso por worker (un slot por pid, para el tope global),
+- contadores de requests admitidas y descartadas.
+
+Todo se decide en `before_request`, antes de tocar la base.
+"""
+import hashlib
+import math
+import os
+import struct
+import time
+from contextlib import contextmanager
+
+from flask import current_app, g, jsonify, request
+
+from app.shm import DATA_OFFSET, SharedMemoryFile, default_path
+
+COUNTERS = ('allowed', 'shed_ip', 'shed_code', 'shed_inflight')
+COUNTER = struct.Struct('<Q')
+WORKER_SLOTS = 64
+WORKER = struct.Struct('<qq')             # pid, requests en curso
+BUCKET = struct.Struct('<Qdd')            # hash de la clave, tokens, último refill
+PROBES = 8
+
+COUNTERS_OFFSET = DATA_OFFSET
+WORKERS_OFFSET = COUNTERS_OFFSET + COUNTER.size * len(COUNTERS)
+BUCKETS_OFFSET = WORKERS_OFFSET + WORKER.size * WORKER_SLOTS
+
+
+def _key_hash(key):
+    # hash() de Python cambia entre procesos; blake2b es estable
+    value = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'little')
+    return value or 1  # 0 marca un slot vacío
+
+
+class SharedRateLimiter:
+    """Token buckets por IP y por código + tope de requests en curso."""
+
+    def __init__(self):
+        self.enabled = False
+        self._shared = SharedMemoryFile(b'RLIMIT01')
+        self._map = None
+        self._worker_slot = None
+        self._worker_pid = None
+
+    def init_app(self, app):
+        self.enabled = app.config.get('PUBLIC_RATE_LIMIT_ENABLED', False)
+        self.slots = app.config.get('RATE_LIMIT_SLOTS', 16384)
+        self._shared.configure(
+            app.config.get('RATE_LIMIT_STATE_PATH') or default_path(app, 'ratelimit'),
+            BUCKETS_OFFSET - DATA_OFFSET + BUCKET.size * self.slots,
+        )
+        self.ip_rate = app.config.get('PUBLIC_RATE_PER_IP', 5.0)
+        self.ip_burst = app.config.get('PUBLIC_BURST_PER_IP', 20)
+        self.code_rate = app.config.get('PUBLIC_RATE_PER_CODE', 20.0)
+        self.code_burst = app.config.get('PUBLIC_BURST_PER_CODE', 100)
+        self.max_inflight = app.config.get('PUBLIC_MAX_INFLIGHT', 32)
+        self.trusted_proxies = app.config.get('RATE_LIMIT_TRUSTED_PROXIES', 0)
+        # El slot del worker es del archivo anterior: se vuelve a registrar
+        self._worker_slot = self._worker_pid = None
+
+    # -- almacenamiento compartido ----------------------------------------
+
+    @contextmanager
+    def _locked(self):
+        with self._shared.locked() as shared_map:
+            self._map = shared_map
+            yield
+
+    def _bump(self, name):
+        offset = COUNTERS_OFFSET + COUNTER.size * COUNTERS.index(name)
+        (value,) = COUNTER.unpack_from(self._map, offset)
+        COUNTER.pack_into(self._map, offset, value + 1)
+
+    def _take(self, key, rate, burst, now):
+        """Consume un token del bucket de `key`. Devuelve 0 o los segundos a esperar."""
+        key_hash = _key_hash(key)
+        start = key_hash % self.slots
+        victim, victim_rank = None, None
+        for probe in range(PROBES):
+            offset = BUCKETS_OFFSET + BUCKET.size * ((start + probe) % self.slots)
+            stored_hash, tokens, updated = BUCKET.unpack_from(self._map, offset)
+            if stored_hash == key_hash:
+                tokens = min(burst, tokens + max(now - updated, 0) * rate)
+                break
+            # Se reusa un slot vacío o, si no hay, el bucket refrescado hace más tiempo
+            rank = -1.0 if stored_hash == 0 else updated
+            if victim is None or rank < victim_rank:
+                victim, victim_rank = offset, rank
+        else:
+            offset, tokens = victim, float(burst)
+
+        if tokens < 1:
+            BUCKET.pack_into(self._map, offset, key_hash, tokens, now)
+            return (1 - tokens) / rate
+        BUCKET.pack_into(self._map, offset, key_hash, tokens - 1, now)
+        return 0
+
+    def _workers(self):
+        for slot in range(WORKER_SLOTS):
+            offset = WORKERS_OFFSET + WORKER.size * slot
+            yield offset, WORKER.unpack_from(self._map, offset)
+
+    def _own_worker_slot(self):
+        pid = os.getpid()
+        if self._worker_slot is not None and self._worker_pid == pid:
+            return self._worker_slot
+        free = None
+        for offset, (slot_pid, _) in self._workers():
+            if slot_pid == pid:
+                free = offset
+                break
+            if free is None and (slot_pid == 0 or not _pid_alive(slot_pid)):
+                free = offset
+        if free is None:
+            raise RuntimeError('Sin slots libres para el worker en el rate limiter')
+        # Un worker muerto deja sus requests "en curso": se descartan al reusar el slot
+        WORKER.pack_into(self._map, free, pid, 0)
+        self._worker_slot, self._worker_pid = free, pid
+        return free
+
+    # -- API --------------------------------------------------------------
+
+    def client_ip(self, remote_addr=None, access_route=None):
+        """IP del cliente (por defecto de la request de Flask en curso)."""
+        if remote_addr is None and access_route is None:
+            remote_addr, access_route = request.remote_addr, request.access_route
+        if self.trusted_proxies and access_route:
+            if len(access_route) >= self.trusted_proxies:
+                return access_route[-self.trusted_proxies]
+        return remote_addr or 'unknown'
+
+    def admit(self, ip, code):
+        """Decide si la request entra. Devuelve None o (status, retry_after, motivo)."""
+        now = time.monotonic()
+        with self._locked():
+            # El tope de concurrencia va primero: un 503 no gasta tokens
+            own = self._own_worker_slot()
+            inflight = sum(count for _, (pid, count) in self._workers() if pid)
+            if inflight >= self.max_inflight:
+                self._bump('shed_inflight')
+                return 503, 1, 'inflight'
+
+            wait = self._take(f'ip:{ip}', self.ip_rate, self.ip_burst, now)
+            if wait:
+                self._bump('shed_ip')
+                return 429, wait, 'ip'
+            if code is not None:
+                wait = self._take(f'code:{code}', self.code_rate, self.code_burst, now)
+                if wait:
+                    self._bump('shed_code')
+                    return 429, wait, 'code'
+
+            pid, count = WORKER.unpack_from(self._map, own)
+            WORKER.pack_into(self._map, own, pid, count + 1)
+            self._bump('allowed')
+        return None
+
+    def release(self):
+        with self._locked():
+            own = self._own_worker_slot()
+            pid, count = WORKER.unpack_from(self._map, own)
+            WORKER.pack_into(self._map, own, pid, max(count - 1, 0))
+
+    def stats(self):
+        with self._locked():
+            counters = {
+                name: COUNTER.unpack_from(self._map, COUNTERS_OFFSET + COUNTER.size * i)[0]
+                for i, name in enumerate(COUNTERS)
+            }
+            inflight = sum(count for _, (pid, count) in self._workers() if pid)
+        return dict(
+            counters,
+            enabled=self.enabled,
+            inflight=inflight,
+            max_inflight=self.max_inflight,
+            per_ip={'rate': self.ip_rate, 'burst': self.ip_burst},
+            per_code={'rate': self.code_rate, 'burst': self.code_burst},
+        )
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+public_limiter = SharedRateLimiter()
+
+
+def init_app(app):
+    public_limiter.init_app(app)
+
+
+REJECTION_MESSAGES = {
+    429: 'Demasiadas solicitudes, intente de nuevo en unos segundos',
+    503: 'Servicio saturado, intente de nuevo en unos segundos',
+}
+
+
+def retry_after_header(seconds):
+    return str(max(1, math.ceil(seconds)))
+
+
+def serves_from_cache(code):
+    """True si GET /api/public/invitations/<code> se va a responder desde la cache del worker."""
+    from app.cache import public_invitation_cache
+
+    return public_invitation_cache.contains(code)
+
+
+def limit_public_request():
+    """before_request del blueprint público: 429/503 con Retry-After si no entra."""
+    from app.microcache import is_refresh_request
+
+    if not public_limiter.enabled or is_refresh_request():
+        # Los refrescos de la micro-cache llegan todos desde la IP de nginx:
+        # limitarlos dejaría páginas viejas en la cache
+        return None
+    code = (request.view_args or {}).get('code')
+    if (code is not None and request.endpoint == 'public.get_public_invitation'
+            and serves_from_cache(code)):
+        code = None  # el límite por código protege la base: un hit de cache no lo gasta
+    try:
+        rejected = public_limiter.admit(public_limiter.client_ip(), code)
+    except (OSError, RuntimeError):
+        # Sin estado compartido (o sin slot para el worker) no se bloquea el tráfico
+        current_app.logger.exception('Rate limiter no disponible')
+        return None
+    if rejected is None:
+        g.public_request_admitted = True
+        return None
+
+    status, retry_after, _ = rejected
+    response = jsonify({'message': REJECTION_MESSAGES[status]})
+    response.status_code = status
+    response.headers['Retry-After'] = retry_after_header(retry_after)
+    return response
+
+
+def release_public_request(exc=None):
+    """teardown_request del blueprint público: libera el lugar en el tope global."""
+    if g.pop('public_request_admitted', False):
+        public_limiter.release()
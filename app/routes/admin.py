@@ -1,9 +1,12 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
+from app.db_routing import replica_reads
+from app.identity import current_user_identity
 from app.models.template import Template
-from app.models.user import User
+from app.models.user_stats import UserStats
 from datetime import datetime
+import os
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -12,9 +15,8 @@ admin_bp = Blueprint('admin', __name__)
 def create_template():
     """Crear nuevo template de invitación"""
     user_id = get_jwt_identity()
-    user = User.query.get(user_id)
     
-    if not user:
+    if not current_user_identity():
         return jsonify({'message': 'Usuario no encontrado'}), 404
     
     data = request.get_json()
@@ -40,6 +42,7 @@ def create_template():
     )
     
     db.session.add(template)
+    UserStats.bump(user_id, total_templates=1)
     db.session.commit()
     
     return jsonify({
@@ -118,49 +121,75 @@ def delete_template(template_id):
         return jsonify({'message': 'No puedes eliminar un template que está en uso'}), 409
     
     db.session.delete(template)
+    UserStats.bump(user_id, total_templates=-1)
     db.session.commit()
     
     return jsonify({'message': 'Template eliminado exitosamente'}), 200
 
 @admin_bp.route('/stats', methods=['GET'])
+@replica_reads
 @jwt_required()
 def get_stats():
-    """Obtener estadísticas del usuario"""
+    """Obtener estadísticas del usuario.
+
+    Con USER_STATS_ROLLUP sale del rollup por usuario (una lectura por PK);
+    si no, de una única consulta agregada.
+    """
     user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    
-    if not user:
+
+    if UserStats.rollup_enabled():
+        stats = UserStats.for_user(user_id)
+    else:
+        stats = UserStats.aggregate(user_id)
+
+    if stats is None:
         return jsonify({'message': 'Usuario no encontrado'}), 404
     
-    from app.models.invitation import Invitation
-    from app.models.guest import Guest
-    
-    total_invitations = Invitation.query.filter_by(user_id=user_id).count()
-    total_guests = db.session.query(Guest).join(Invitation).filter(Invitation.user_id == user_id).count()
-    published_invitations = Invitation.query.filter_by(user_id=user_id, is_published=True).count()
-    
-    # RSVP stats
-    rsvp_accepted = db.session.query(Guest).join(Invitation).filter(
-        Invitation.user_id == user_id,
-        Guest.rsvp_status == 'accepted'
-    ).count()
-    
-    rsvp_declined = db.session.query(Guest).join(Invitation).filter(
-        Invitation.user_id == user_id,
-        Guest.rsvp_status == 'declined'
-    ).count()
-    
-    rsvp_pending = db.session.query(Guest).join(Invitation).filter(
-        Invitation.user_id == user_id,
-        Guest.rsvp_status == 'pending'
-    ).count()
-    
     return jsonify({
-        'total_invitations': total_invitations,
-        'published_invitations': published_invitations,
-        'total_templates': len(user.templates),
-        'total_guests': total_guests,
-        'rsvp_accepted': rsvp_accepted,
-        'rsvp_declined': rsvp_declined,
-        'rsvp_pending': rsvp_pending
+        'total_invitations': stats['total_invitations'],
+        'published_invitations': stats['published_invitations'],
+        'total_templates': stats['total_templates'],
+        'total_guests': stats['total_guests'],
+        'rsvp_accepted': stats['rsvp_accepted'],
+        'rsvp_declined': stats['rsvp_declined'],
+        'rsvp_pending': stats['rsvp_pending']
+    }), 200
+
+def _is_operator(identity):
+    """El operador de la plataforma es el admin bootstrapeado (ADMIN_USERNAME)."""
+    operator_email = os.environ.get('ADMIN_USERNAME')
+    return bool(identity and operator_email and identity['email'] == operator_email)
+
+
+@admin_bp.route('/runtime-stats', methods=['GET'])
+@jwt_required()
+def get_runtime_stats():
+    """Contadores internos del worker que atiende el request (solo operador)"""
+    if not _is_operator(current_user_identity()):
+        return jsonify({'message': 'Acceso restringido al operador'}), 403
+
+    from app.cache import public_invitation_cache, user_identity_cache
+    from app.code_filter import invitation_codes
+    from app.db_pool import async_pool_telemetry, pool_telemetry, replica_pool_telemetry
+    from app.db_routing import replica_router
+    from app.microcache import microcache
+    from app.ratelimit import public_limiter
+    from app.rsvp_queue import rsvp_queue
+    from app.snapshots import public_snapshots
+    from app.sqlite_profile import sqlite_profile
+
+    return jsonify({
+        'pid': os.getpid(),
+        'public_invitation_cache': public_invitation_cache.stats(),
+        'user_identity_cache': user_identity_cache.stats(),
+        'invitation_code_filter': invitation_codes.stats() if invitation_codes.enabled else {'enabled': False},
+        'public_rate_limit': public_limiter.stats() if public_limiter.enabled else {'enabled': False},
+        'rsvp_queue': rsvp_queue.stats() if rsvp_queue.enabled else {'enabled': False},
+        'static_snapshots': public_snapshots.stats() if public_snapshots.enabled else {'enabled': False},
+        'microcache': microcache.stats(),
+        'db_pool': pool_telemetry.stats() if pool_telemetry.pool is not None else {'enabled': False},
+        'async_db_pool': async_pool_telemetry.stats() if async_pool_telemetry.pool is not None else {'enabled': False},
+        'replica_db_pool': replica_pool_telemetry.stats() if replica_pool_telemetry.pool is not None else {'enabled': False},
+        'replica': replica_router.stats() if replica_router.enabled else {'enabled': False},
+        'sqlite': sqlite_profile.stats() if sqlite_profile.enabled else {'enabled': False},
     }), 200
@@ -1,7 +1,9 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from app import db
+from app.identity import current_user_identity, invalidate_user
 from app.models.user import User
+from app.sqlite_profile import read_only_transaction
 from datetime import datetime
 
 auth_bp = Blueprint('auth', __name__)
@@ -45,6 +47,7 @@ def register():
     }), 201
 
 @auth_bp.route('/login', methods=['POST'])
+@read_only_transaction
 def login():
     """Iniciar sesión.
 
@@ -79,13 +82,12 @@ def login():
 @jwt_required()
 def get_current_user():
     """Obtener información del usuario actual"""
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    identity = current_user_identity()
     
-    if not user:
+    if not identity:
         return jsonify({'message': 'Usuario no encontrado'}), 404
     
-    return jsonify(user.to_dict()), 200
+    return jsonify(identity), 200
 
 @auth_bp.route('/change-password', methods=['POST'])
 @jwt_required()
@@ -107,6 +109,7 @@ def change_password():
     
     user.set_password(data['new_password'])
     db.session.commit()
+    invalidate_user(user_id)
     
     return jsonify({'message': 'Contraseña actualizada exitosamente'}), 200
 
@@ -131,6 +134,7 @@ def update_profile():
     
     user.updated_at = datetime.utcnow()
     db.session.commit()
+    invalidate_user(user_id)
     
     return jsonify({
         'message': 'Perfil actualizado exitosamente',
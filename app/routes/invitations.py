@@ -1,22 +1,73 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import insert, select, tuple_
+from sqlalchemy.orm import raiseload
 from app import db
+from app.cache import public_invitation_cache
+from app.code_filter import invitation_codes
+from app.db_routing import replica_reads
+from app.identity import current_user_identity
+from app.models.guest import Guest
 from app.models.invitation import Invitation
-from app.models.user import User
+from app.microcache import microcache
+from app.models.user_stats import UserStats
+from app.snapshots import public_snapshots
 from datetime import datetime
+import base64
+import binascii
+import csv
+import io
+import json
+import secrets
 
 invitations_bp = Blueprint('invitations', __name__)
 
 
-def _build_public_share_url(invitation: Invitation) -> str:
+def _public_share_url(unique_code: str) -> str:
     """Devuelve URL pública para compartir (absoluta si hay request context)."""
     try:
         # request.host_url incluye el trailing slash
         base = request.host_url.rstrip('/')
-        return f"{base}/api/public/invitations/{invitation.unique_code}"
+        return f"{base}/api/public/invitations/{unique_code}"
     except Exception:
         # Fallback: relativa
-        return f"/api/public/invitations/{invitation.unique_code}"
+        return f"/api/public/invitations/{unique_code}"
+
+
+def _build_public_share_url(invitation: Invitation) -> str:
+    return _public_share_url(invitation.unique_code)
+
+
+REQUIRED_FIELDS = ['birthday_name', 'birthday_date', 'event_title', 'event_date']
+
+
+def _invitation_columns(data):
+    """Columnas de Invitation a partir del payload de creación.
+
+    Lanza KeyError si falta un campo requerido y ValueError si una fecha no es ISO.
+    """
+    return {
+        'birthday_name': data['birthday_name'],
+        'birthday_date': datetime.fromisoformat(data['birthday_date']),
+        'birthday_age': data.get('birthday_age'),
+        'event_title': data['event_title'],
+        'event_date': datetime.fromisoformat(data['event_date']),
+        'event_time': data.get('event_time'),
+        'event_location': data.get('event_location'),
+        'event_address': data.get('event_address'),
+        'organizer_name': data.get('organizer_name'),
+        'organizer_phone': data.get('organizer_phone'),
+        'organizer_email': data.get('organizer_email'),
+        'dress_code': data.get('dress_code'),
+        'special_notes': data.get('special_notes'),
+        'rsvp_deadline': datetime.fromisoformat(data['rsvp_deadline']) if data.get('rsvp_deadline') else None,
+        'template_key': data.get('template_key', 'classic_01'),
+        'hero_image_url': data.get('hero_image_url'),
+        'image_1_url': data.get('image_1_url'),
+        'image_2_url': data.get('image_2_url'),
+        'video_url': data.get('video_url'),
+    }
+
 
 @invitations_bp.route('', methods=['POST'])
 @jwt_required()
@@ -86,47 +137,27 @@ def create_invitation():
         description: Error al crear invitacion
     """
     user_id = get_jwt_identity()
-    user = User.query.get(user_id)
     
-    if not user:
+    if not current_user_identity():
         return jsonify({'message': 'Usuario no encontrado'}), 404
     
     data = request.get_json()
     
     # Validar datos requeridos
-    required_fields = ['birthday_name', 'birthday_date', 'event_title', 'event_date']
-    if not all(field in data for field in required_fields):
-        return jsonify({'message': f'Campos requeridos: {", ".join(required_fields)}'}), 400
+    if not all(field in data for field in REQUIRED_FIELDS):
+        return jsonify({'message': f'Campos requeridos: {", ".join(REQUIRED_FIELDS)}'}), 400
     
     try:
-        invitation = Invitation(
-            user_id=user_id,
-            birthday_name=data['birthday_name'],
-            birthday_date=datetime.fromisoformat(data['birthday_date']),
-            birthday_age=data.get('birthday_age'),
-            event_title=data['event_title'],
-            event_date=datetime.fromisoformat(data['event_date']),
-            event_time=data.get('event_time'),
-            event_location=data.get('event_location'),
-            event_address=data.get('event_address'),
-            organizer_name=data.get('organizer_name'),
-            organizer_phone=data.get('organizer_phone'),
-            organizer_email=data.get('organizer_email'),
-            dress_code=data.get('dress_code'),
-            special_notes=data.get('special_notes'),
-            rsvp_deadline=datetime.fromisoformat(data['rsvp_deadline']) if data.get('rsvp_deadline') else None,
-            template_key=data.get('template_key', 'classic_01'),
-            hero_image_url=data.get('hero_image_url'),
-            image_1_url=data.get('image_1_url'),
-            image_2_url=data.get('image_2_url'),
-            video_url=data.get('video_url'),
-        )
+        invitation = Invitation(user_id=user_id, **_invitation_columns(data))
         
         # Generar URL compartible (pública)
         invitation.share_url = _build_public_share_url(invitation)
         
         db.session.add(invitation)
+        UserStats.bump(user_id, total_invitations=1)
         db.session.commit()
+        if invitation_codes.enabled:
+            invitation_codes.add(invitation.unique_code)
         
         return jsonify({
             'message': 'Invitación creada exitosamente',
@@ -210,48 +241,28 @@ def quick_create_and_publish_invitation():
         description: Datos invalidos
     """
     user_id = get_jwt_identity()
-    user = User.query.get(user_id)
 
-    if not user:
+    if not current_user_identity():
         return jsonify({'message': 'Usuario no encontrado'}), 404
 
     data = request.get_json() or {}
 
-    required_fields = ['birthday_name', 'birthday_date', 'event_title', 'event_date']
-    if not all(field in data for field in required_fields):
-        return jsonify({'message': f'Campos requeridos: {", ".join(required_fields)}'}), 400
+    if not all(field in data for field in REQUIRED_FIELDS):
+        return jsonify({'message': f'Campos requeridos: {", ".join(REQUIRED_FIELDS)}'}), 400
 
     try:
-        invitation = Invitation(
-            user_id=user_id,
-            birthday_name=data['birthday_name'],
-            birthday_date=datetime.fromisoformat(data['birthday_date']),
-            birthday_age=data.get('birthday_age'),
-            event_title=data['event_title'],
-            event_date=datetime.fromisoformat(data['event_date']),
-            event_time=data.get('event_time'),
-            event_location=data.get('event_location'),
-            event_address=data.get('event_address'),
-            organizer_name=data.get('organizer_name'),
-            organizer_phone=data.get('organizer_phone'),
-            organizer_email=data.get('organizer_email'),
-            dress_code=data.get('dress_code'),
-            special_notes=data.get('special_notes'),
-            rsvp_deadline=datetime.fromisoformat(data['rsvp_deadline']) if data.get('rsvp_deadline') else None,
-            template_key=data.get('template_key', 'classic_01'),
-            hero_image_url=data.get('hero_image_url'),
-            image_1_url=data.get('image_1_url'),
-            image_2_url=data.get('image_2_url'),
-            video_url=data.get('video_url'),
-            is_published=True,
-        )
+        invitation = Invitation(user_id=user_id, is_published=True, **_invitation_columns(data))
 
         db.session.add(invitation)
         db.session.flush()  # para tener unique_code
 
         invitation.share_url = _build_public_share_url(invitation)
 
+        UserStats.bump(user_id, total_invitations=1, published_invitations=1)
         db.session.commit()
+        if invitation_codes.enabled:
+            invitation_codes.add(invitation.unique_code)
+        public_snapshots.schedule(invitation.unique_code)
 
         return jsonify({
             'message': 'Invitación creada y publicada',
@@ -267,7 +278,202 @@ def quick_create_and_publish_invitation():
         return jsonify({'message': f'Error al crear invitación: {str(e)}'}), 500
 
 
+TRUE_VALUES = frozenset(['1', 'true', 'yes'])
+FALSE_VALUES = frozenset(['0', 'false', 'no', ''])
+
+
+def _parse_bool(value):
+    """Booleano estricto de una fila (JSON, CSV o NDJSON): "false" no es True.
+
+    Lanza ValueError si no es un booleano, 0/1 o uno de TRUE_VALUES/FALSE_VALUES.
+    """
+    if value is None or isinstance(value, bool):
+        return bool(value)
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str):
+        normalized = value.strip().lower()
+        if normalized in TRUE_VALUES:
+            return True
+        if normalized in FALSE_VALUES:
+            return False
+    raise ValueError(f'is_published debe ser true o false, no {value!r}')
+
+
+def _read_bulk_rows(max_rows):
+    """Filas del body: array JSON, {"invitations": [...]} o NDJSON (una por línea).
+
+    Devuelve (filas, errores); una línea NDJSON ilegible es un error de esa fila.
+    El NDJSON se deja de leer al pasar `max_rows`: el llamador responde 413 sin
+    cargar el resto del body.
+    """
+    if request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+        rows, errors = [], []
+        for line in request.stream:
+            line = line.strip()
+            if not line:
+                continue
+            if len(rows) >= max_rows:
+                rows.append(None)
+                break
+            try:
+                rows.append(json.loads(line))
+            except ValueError as e:
+                rows.append(None)
+                errors.append({'row': len(rows) - 1, 'message': f'JSON inválido: {str(e)}'})
+        return rows, errors
+
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get('invitations')
+    if not isinstance(data, list):
+        return None, []
+    return data, []
+
+
+@invitations_bp.route('/bulk', methods=['POST'])
+@jwt_required()
+def bulk_create_invitations():
+    """Crear muchas invitaciones en un solo request.
+
+    Valida todas las filas antes de insertar y las inserta por chunks con
+    INSERT ... RETURNING (executemany). Con atomic=true (default) todo va en
+    una transacción y cualquier fila inválida cancela el lote; con
+    atomic=false se insertan las filas válidas y cada chunk hace su commit.
+    ---
+    tags:
+      - invitations
+    security:
+      - Bearer: []
+    parameters:
+      - in: query
+        name: atomic
+        type: boolean
+        required: false
+        default: true
+      - in: body
+        name: body
+        required: true
+        description: Array JSON de invitaciones (mismo formato que POST /api/invitations), o NDJSON con Content-Type application/x-ndjson
+    responses:
+      201:
+        description: Invitaciones creadas (con errores por fila si atomic=false)
+      400:
+        description: Body inválido o filas con errores (atomic=true)
+      404:
+        description: Usuario no encontrado
+      413:
+        description: Demasiadas filas (BULK_MAX_ROWS)
+      500:
+        description: Error al insertar
+    """
+    user_id = get_jwt_identity()
+
+    if not current_user_identity():
+        return jsonify({'message': 'Usuario no encontrado'}), 404
+
+    max_rows = current_app.config.get('BULK_MAX_ROWS', 5000)
+    rows, errors = _read_bulk_rows(max_rows)
+    if rows is None:
+        return jsonify({'message': 'Se espera un array JSON de invitaciones o NDJSON'}), 400
+    if len(rows) > max_rows:
+        return jsonify({'message': f'Máximo {max_rows} invitaciones por request'}), 413
+
+    atomic = request.args.get('atomic', 'true').lower() not in ['0', 'false', 'no']
+    now = datetime.utcnow()
+
+    # 1) Validar todo antes de tocar la base
+    valid = []
+    for index, row in enumerate(rows):
+        if row is None:
+            continue  # ya reportada por _read_bulk_rows
+        if not isinstance(row, dict):
+            errors.append({'row': index, 'message': 'Cada fila debe ser un objeto'})
+            continue
+        missing = [field for field in REQUIRED_FIELDS if not row.get(field)]
+        if missing:
+            errors.append({'row': index, 'message': f'Campos requeridos: {", ".join(missing)}'})
+            continue
+        try:
+            is_published = _parse_bool(row.get('is_published'))
+        except ValueError as e:
+            errors.append({'row': index, 'message': str(e)})
+            continue
+        try:
+            columns = _invitation_columns(row)
+        except TypeError:
+            errors.append({'row': index, 'message': 'Las fechas deben ser texto ISO 8601 (YYYY-MM-DD)'})
+            continue
+        except ValueError as e:
+            errors.append({'row': index, 'message': f'Formato de fecha inválido: {str(e)}'})
+            continue
+        unique_code = secrets.token_urlsafe(16)
+        columns.update(
+            user_id=user_id,
+            unique_code=unique_code,
+            share_url=_public_share_url(unique_code),
+            is_published=is_published,
+            created_at=now,
+            updated_at=now,
+        )
+        valid.append((index, columns))
+
+    if errors and atomic:
+        errors.sort(key=lambda e: e['row'])
+        return jsonify({'message': 'Hay filas inválidas; no se creó ninguna invitación', 'errors': errors}), 400
+
+    # 2) Insertar por chunks (executemany + RETURNING). Las filas devueltas se
+    # asocian por unique_code (generado acá): pedir el orden de los parámetros
+    # (sort_by_parameter_order) hace que SQLite inserte de a una fila.
+    chunk_size = current_app.config.get('BULK_CHUNK_SIZE', 500)
+    stmt = insert(Invitation).returning(Invitation.id, Invitation.unique_code)
+    created = []
+    try:
+        for start in range(0, len(valid), chunk_size):
+            chunk = valid[start:start + chunk_size]
+            try:
+                result = db.session.execute(stmt, [columns for _, columns in chunk])
+                ids = {row.unique_code: row.id for row in result}
+                inserted = [
+                    {'row': index, 'id': ids[columns['unique_code']], 'unique_code': columns['unique_code']}
+                    for index, columns in chunk
+                ]
+                UserStats.bump(
+                    user_id,
+                    total_invitations=len(chunk),
+                    published_invitations=sum(1 for _, columns in chunk if columns['is_published']),
+                )
+                if not atomic:
+                    db.session.commit()
+                created.extend(inserted)
+            except Exception as e:
+                if atomic:
+                    raise
+                db.session.rollback()
+                errors.extend({'row': index, 'message': f'Error al insertar: {str(e)}'} for index, _ in chunk)
+        if atomic:
+            db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': f'Error al crear invitaciones: {str(e)}'}), 500
+
+    if invitation_codes.enabled and created:
+        invitation_codes.add(*(item['unique_code'] for item in created))
+    if public_snapshots.enabled and created:
+        published = {columns['unique_code'] for _, columns in valid if columns['is_published']}
+        public_snapshots.schedule(*(item['unique_code'] for item in created if item['unique_code'] in published))
+
+    errors.sort(key=lambda e: e['row'])
+    return jsonify({
+        'created': created,
+        'errors': errors,
+        'total_created': len(created),
+        'total_errors': len(errors),
+    }), 201 if created or not errors else 400
+
+
 @invitations_bp.route('', methods=['GET'])
+@replica_reads
 @jwt_required()
 def list_invitations():
     """
@@ -288,24 +494,99 @@ def list_invitations():
         type: integer
         required: false
         default: 10
+        description: Máximo MAX_PAGE_SIZE (100)
+      - in: query
+        name: pagination
+        type: string
+        required: false
+        description: "cursor para paginar por (created_at, id) en vez de por offset"
+      - in: query
+        name: cursor
+        type: string
+        required: false
+        description: next_cursor de la página anterior (implica pagination=cursor)
+      - in: query
+        name: include_total
+        type: boolean
+        required: false
+        default: true
+        description: false evita el COUNT(*)
     responses:
       200:
         description: Lista de invitaciones
+      400:
+        description: Cursor inválido
     """
     user_id = get_jwt_identity()
     
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 10, type=int)
+    per_page = max(1, min(per_page, current_app.config.get('MAX_PAGE_SIZE', 100)))
+    include_total = request.args.get('include_total', 'true').lower() not in ['0', 'false', 'no']
+
+    # rsvp_stats() sale de los contadores de la propia fila, así que un listado
+    # nunca necesita los Guest: raiseload hace que un N+1 falle en vez de colarse.
+    query = Invitation.query.filter_by(user_id=user_id).options(raiseload(Invitation.guests))
+
+    if request.args.get('pagination') == 'cursor' or 'cursor' in request.args:
+        return _list_invitations_by_cursor(query, per_page, include_total)
     
-    invitations = Invitation.query.filter_by(user_id=user_id).paginate(page=page, per_page=per_page)
+    invitations = query.paginate(page=page, per_page=per_page, count=include_total)
     
     return jsonify({
         'invitations': [inv.to_dict() for inv in invitations.items],
         'total': invitations.total,
-        'pages': invitations.pages,
+        'pages': invitations.pages if include_total else None,
         'current_page': page
     }), 200
 
+
+def _encode_cursor(invitation):
+    raw = json.dumps([invitation.created_at.isoformat(), invitation.id]).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode()
+
+
+def _decode_cursor(cursor):
+    """Devuelve (created_at, id) o lanza ValueError si el cursor no es válido."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created_at, invitation_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(invitation_id)
+    except (TypeError, ValueError, binascii.Error) as e:
+        raise ValueError(str(e))
+
+
+def _list_invitations_by_cursor(query, per_page, include_total):
+    """Paginación keyset por (created_at, id) descendente.
+
+    Cada página es un range scan sobre ix_invitations_user_created, así que
+    la página 1000 cuesta lo mismo que la primera (sin OFFSET).
+    """
+    total = query.order_by(None).count() if include_total else None
+
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            created_at, last_id = _decode_cursor(cursor)
+        except ValueError:
+            return jsonify({'message': 'Cursor inválido'}), 400
+        query = query.filter(tuple_(Invitation.created_at, Invitation.id) < (created_at, last_id))
+
+    rows = (
+        query.order_by(Invitation.created_at.desc(), Invitation.id.desc())
+        .limit(per_page + 1)
+        .all()
+    )
+    items = rows[:per_page]
+    next_cursor = _encode_cursor(items[-1]) if len(rows) > per_page else None
+
+    return jsonify({
+        'invitations': [inv.to_dict() for inv in items],
+        'next_cursor': next_cursor,
+        'per_page': per_page,
+        'total': total,
+    }), 200
+
 @invitations_bp.route('/<int:invitation_id>', methods=['GET'])
 @jwt_required()
 def get_invitation(invitation_id):
@@ -428,6 +709,9 @@ def update_invitation(invitation_id):
         
         invitation.updated_at = datetime.utcnow()
         db.session.commit()
+        public_invitation_cache.invalidate(invitation.unique_code)
+        public_snapshots.schedule(invitation.unique_code)
+        microcache.schedule(invitation.unique_code)
         
         return jsonify({
             'message': 'Invitación actualizada exitosamente',
@@ -467,8 +751,27 @@ def delete_invitation(invitation_id):
     if not invitation or invitation.user_id != user_id:
         return jsonify({'message': 'Invitación no encontrada'}), 404
     
+    unique_code = invitation.unique_code
+    stats = invitation.rsvp_stats()
+    UserStats.bump(
+        user_id,
+        total_invitations=-1,
+        published_invitations=-1 if invitation.is_published else 0,
+        total_guests=-stats['total_rsvps'],
+        rsvp_accepted=-stats['accepted'],
+        rsvp_declined=-stats['declined'],
+        rsvp_tentative=-stats['tentative'],
+        rsvp_pending=-stats['pending'],
+    )
+    # Los RSVPs en un solo DELETE: si no, el cascade los carga y borra de a uno
+    Guest.query.filter_by(invitation_id=invitation.id).delete(synchronize_session=False)
     db.session.delete(invitation)
     db.session.commit()
+    public_invitation_cache.invalidate(unique_code)
+    public_snapshots.schedule(unique_code)  # el render ve que no existe y borra los archivos
+    microcache.schedule(unique_code)
+    if invitation_codes.enabled:
+        invitation_codes.mark_missing(unique_code)
     
     return jsonify({'message': 'Invitación eliminada exitosamente'}), 200
 
@@ -499,9 +802,16 @@ def publish_invitation(invitation_id):
     if not invitation or invitation.user_id != user_id:
         return jsonify({'message': 'Invitación no encontrada'}), 404
     
+    if not invitation.is_published:
+        UserStats.bump(user_id, published_invitations=1)
     invitation.is_published = True
     invitation.updated_at = datetime.utcnow()
     db.session.commit()
+    public_invitation_cache.invalidate(invitation.unique_code)
+    public_snapshots.schedule(invitation.unique_code)
+    microcache.schedule(invitation.unique_code)  # nginx puede tener un 404 guardado
+    if invitation_codes.enabled:
+        invitation_codes.forget(invitation.unique_code)
     
     return jsonify({
         'message': 'Invitación publicada exitosamente',
@@ -543,3 +853,96 @@ def list_invitation_guests(invitation_id):
         'rsvp_stats': invitation.rsvp_stats(),
         'guests': guests,
     }), 200
+
+
+EXPORT_FIELDS = [
+    'id', 'invitation_id', 'name', 'email', 'phone', 'rsvp_status', 'rsvp_date',
+    'number_of_guests', 'dietary_restrictions', 'notes', 'created_at',
+]
+
+
+@invitations_bp.route('/<int:invitation_id>/guests/export', methods=['GET'])
+@jwt_required()
+def export_invitation_guests(invitation_id):
+    """Exportar los RSVPs de una invitación en streaming (CSV o NDJSON).
+
+    Lee los invitados por lotes (yield_per / cursor del lado del servidor en
+    Postgres) y escribe cada lote apenas llega, así que la memoria del worker
+    no crece con la cantidad de invitados.
+    ---
+    tags:
+      - invitations
+    security:
+      - Bearer: []
+    parameters:
+      - in: path
+        name: invitation_id
+        required: true
+        type: integer
+      - in: query
+        name: format
+        type: string
+        required: false
+        default: csv
+        description: csv o ndjson
+    responses:
+      200:
+        description: Export en streaming
+      400:
+        description: Formato inválido
+      404:
+        description: Invitacion no encontrada
+    """
+    user_id = get_jwt_identity()
+    owner_id = db.session.execute(
+        select(Invitation.user_id).where(Invitation.id == invitation_id)
+    ).scalar()
+
+    if owner_id is None or owner_id != user_id:
+        return jsonify({'message': 'Invitación no encontrada'}), 404
+
+    export_format = request.args.get('format', 'csv')
+    if export_format not in ('csv', 'ndjson'):
+        return jsonify({'message': 'format debe ser csv o ndjson'}), 400
+
+    # Filas Core (no objetos ORM): no pasan por el identity map de la sesión
+    stmt = (
+        select(*[getattr(Guest, field) for field in EXPORT_FIELDS])
+        .where(Guest.invitation_id == invitation_id)
+        .order_by(Guest.id)
+        .execution_options(yield_per=current_app.config.get('EXPORT_BATCH_SIZE', 500))
+    )
+
+    def serialize(row):
+        return [value.isoformat() if isinstance(value, datetime) else value for value in row]
+
+    def generate():
+        result = db.session.execute(stmt)
+        try:
+            if export_format == 'csv':
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerow(EXPORT_FIELDS)
+                for partition in result.partitions():
+                    writer.writerows(serialize(row) for row in partition)
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+                if buffer.tell():
+                    yield buffer.getvalue()
+            else:
+                dumps = current_app.json.dumps
+                for partition in result.partitions():
+                    yield ''.join(
+                        dumps(dict(zip(EXPORT_FIELDS, serialize(row)))) + '\n' for row in partition
+                    )
+        finally:
+            result.close()
+
+    mimetype = 'text/csv' if export_format == 'csv' else 'application/x-ndjson'
+    filename = f'invitation-{invitation_id}-guests.{export_format}'
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'},
+    )
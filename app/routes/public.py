@@ -1,12 +1,49 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from app import db
+from app.cache import public_invitation_cache
+from app.code_filter import invitation_codes
+from app.db_routing import primary_reads, replica_reads, replica_router
+from app.microcache import is_refresh_request, micro_cached, microcache
+from app.ratelimit import limit_public_request, release_public_request
+from app.rsvp_queue import rsvp_queue
+from app.snapshots import public_invitation_body, public_snapshots, render_public_page
+from app.sqlite_profile import read_only_transaction_when
 from app.models.invitation import Invitation
 from app.models.guest import Guest
 from datetime import datetime
+from sqlalchemy.exc import IntegrityError
 
 public_bp = Blueprint('public', __name__)
 
+# Endpoints sin autenticación: 429/503 antes de tocar la base
+public_bp.before_request(limit_public_request)
+public_bp.teardown_request(release_public_request)
+
+
+def _find_published_invitation(code):
+    """Invitación publicada con ese código, o None.
+
+    Los códigos que seguro no existen o se sabe que no están publicados se
+    descartan sin consultar la base (ver app.code_filter).
+    """
+    if invitation_codes.enabled and not invitation_codes.might_exist(code):
+        return None
+    invitation = Invitation.query.filter_by(unique_code=code).first()
+    if (not invitation or not invitation.is_published) and invitation_codes.enabled and replica_router.enabled:
+        # El negativo se comparte entre workers y dura NEGATIVE_CACHE_TTL: una
+        # réplica atrasada no puede anotarlo para una invitación recién publicada
+        with primary_reads():
+            invitation = (Invitation.query.filter_by(unique_code=code)
+                          .execution_options(populate_existing=True).first())
+    if not invitation or not invitation.is_published:
+        if invitation_codes.enabled:
+            invitation_codes.record_miss(code, exists=invitation is not None)
+        return None
+    return invitation
+
 @public_bp.route('/invitations/<code>', methods=['GET'])
+@micro_cached
+@replica_reads
 def get_public_invitation(code):
     """
     Obtener invitacion por codigo unico (publico). Devuelve solo invitados confirmados.
@@ -24,21 +61,55 @@ def get_public_invitation(code):
       404:
         description: Invitacion no encontrada
     """
-    invitation = Invitation.query.filter_by(unique_code=code).first()
-    
-    if not invitation or not invitation.is_published:
+    # El refresco de nginx no puede llevarse una copia vieja de la cache del worker
+    body = None if is_refresh_request() else public_invitation_cache.get(code)
+    if body is None:
+        invitation = _find_published_invitation(code)
+
+        if not invitation:
+            return jsonify({'message': 'Invitación no encontrada'}), 404
+
+        # Importante: por defecto no exponemos el "registro" de invitados públicamente.
+        # El cliente (dueño) lo ve vía /api/invitations/<id>/guests con JWT.
+        body = public_invitation_body(invitation)
+        public_invitation_cache.set(code, body)
+
+    return current_app.response_class(body, mimetype=current_app.json.mimetype), 200
+
+@public_bp.route('/invitations/<code>/page', methods=['GET'])
+@micro_cached
+@replica_reads
+def get_public_invitation_page(code):
+    """
+    Landing HTML de la invitacion (la misma que el snapshot estatico que sirve nginx)
+    ---
+    tags:
+      - public
+    parameters:
+      - in: path
+        name: code
+        required: true
+        type: string
+    produces:
+      - text/html
+    responses:
+      200:
+        description: Landing publica
+      404:
+        description: Invitacion no encontrada
+    """
+    invitation = _find_published_invitation(code)
+
+    if not invitation:
         return jsonify({'message': 'Invitación no encontrada'}), 404
-    
-    invitation_data = invitation.to_dict()
 
-    # Importante: por defecto no exponemos el "registro" de invitados públicamente.
-    # El cliente (dueño) lo ve vía /api/invitations/<id>/guests con JWT.
-    return jsonify({
-        'invitation': invitation_data,
-        'rsvp_stats': invitation.rsvp_stats(),
-    }), 200
+    # Pedido que no resolvió nginx: si falta el snapshot (p.ej. recién publicada), se genera
+    public_snapshots.schedule_if_missing(code)
+    return current_app.response_class(render_public_page(invitation), mimetype='text/html'), 200
 
 @public_bp.route('/invitations/<code>/rsvp', methods=['POST'])
+# Con write-behind solo lee la invitación y encola: no espera al flusher
+@read_only_transaction_when(lambda: rsvp_queue.enabled)
 def submit_rsvp(code):
     """
     Enviar RSVP para una invitacion
@@ -79,76 +150,85 @@ def submit_rsvp(code):
             notes:
               type: string
     responses:
+      200:
+        description: RSVP actualizado (mismo email/telefono)
       201:
         description: RSVP registrado
+      202:
+        description: RSVP encolado (modo RSVP_WRITE_BEHIND)
       400:
         description: Datos invalidos
       404:
         description: Invitacion no encontrada
+      409:
+        description: Email y telefono de invitados distintos (sin resolver)
       500:
         description: Error al registrar RSVP
     """
-    invitation = Invitation.query.filter_by(unique_code=code).first()
+    invitation = _find_published_invitation(code)
     
-    if not invitation or not invitation.is_published:
+    if not invitation:
         return jsonify({'message': 'Invitación no encontrada'}), 404
     
     data = request.get_json()
     
     if not data or not data.get('guest_name') or data.get('rsvp_status') not in ['accepted', 'declined', 'tentative']:
         return jsonify({'message': 'guest_name y rsvp_status (accepted/declined/tentative) son requeridos'}), 400
+
+    number_of_guests = data.get('number_of_guests', 1)
+    if number_of_guests is None:
+        number_of_guests = 1
+    if not isinstance(number_of_guests, int) or number_of_guests < 1:
+        return jsonify({'message': 'number_of_guests debe ser un entero >= 1'}), 400
+
+    fields = {
+        'name': data['guest_name'],
+        'email': data.get('guest_email') or None,
+        'phone': data.get('guest_phone') or None,
+        'rsvp_status': data['rsvp_status'],
+        'rsvp_date': datetime.utcnow(),
+        'number_of_guests': number_of_guests,
+        'dietary_restrictions': data.get('dietary_restrictions'),
+        'notes': data.get('notes'),
+    }
+
+    if rsvp_queue.enabled:
+        # Write-behind: se confirma apenas queda en la cola durable; el flusher
+        # lo aplica a la base en lotes
+        try:
+            pending = rsvp_queue.enqueue(invitation.id, code, fields)
+        except Exception as e:
+            return jsonify({'message': f'Error al registrar RSVP: {str(e)}'}), 500
+        return jsonify({
+            'message': 'RSVP recibido, se registrará en unos segundos',
+            'queued': True,
+            'pending': pending,
+        }), 202
     
     try:
-        # Upsert simple para evitar duplicados obvios (email/phone)
-        existing = None
-        if data.get('guest_email'):
-            existing = Guest.query.filter_by(invitation_id=invitation.id, email=data['guest_email']).first()
-        if not existing and data.get('guest_phone'):
-            existing = Guest.query.filter_by(invitation_id=invitation.id, phone=data['guest_phone']).first()
-
-        number_of_guests = data.get('number_of_guests', 1)
-        if number_of_guests is None:
-            number_of_guests = 1
-        if not isinstance(number_of_guests, int) or number_of_guests < 1:
-            return jsonify({'message': 'number_of_guests debe ser un entero >= 1'}), 400
-
-        if existing:
-            existing.name = data.get('guest_name', existing.name)
-            existing.rsvp_status = data['rsvp_status']
-            existing.rsvp_date = datetime.utcnow()
-            existing.number_of_guests = number_of_guests
-            existing.dietary_restrictions = data.get('dietary_restrictions')
-            existing.notes = data.get('notes')
-            guest = existing
-            status_code = 200
-        else:
-            guest = Guest(
-                invitation_id=invitation.id,
-                name=data['guest_name'],
-                email=data.get('guest_email'),
-                phone=data.get('guest_phone'),
-                rsvp_status=data['rsvp_status'],
-                rsvp_date=datetime.utcnow(),
-                number_of_guests=number_of_guests,
-                dietary_restrictions=data.get('dietary_restrictions'),
-                notes=data.get('notes')
-            )
-            db.session.add(guest)
-            status_code = 201
-
+        guest, created = Guest.upsert_rsvp(invitation, fields)
+        guest_data = guest.to_dict()  # antes del commit: evita recargar la fila
         db.session.commit()
+        public_invitation_cache.invalidate(code)
+        public_snapshots.schedule(code)
+        microcache.schedule(code)
 
         return jsonify({
             'message': 'RSVP registrado exitosamente',
-            'guest': guest.to_dict(),
+            'guest': guest_data,
             'rsvp_stats': invitation.rsvp_stats(),
-        }), status_code
+        }), 201 if created else 200
     
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'message': 'El email o el teléfono ya corresponden a otro invitado'}), 409
     except Exception as e:
         db.session.rollback()
         return jsonify({'message': f'Error al registrar RSVP: {str(e)}'}), 500
 
 @public_bp.route('/invitations/<code>/guests', methods=['GET'])
+@micro_cached
+@replica_reads
 def get_invitation_guests(code):
     """
     Obtener lista de invitados confirmados (solo si esta publicada)
@@ -166,12 +246,12 @@ def get_invitation_guests(code):
       404:
         description: Invitacion no encontrada
     """
-    invitation = Invitation.query.filter_by(unique_code=code).first()
+    invitation = _find_published_invitation(code)
     
-    if not invitation or not invitation.is_published:
+    if not invitation:
         return jsonify({'message': 'Invitación no encontrada'}), 404
     
-    confirmed_guests = [g for g in invitation.guests if g.rsvp_status == 'accepted']
+    confirmed_guests = Guest.query.filter_by(invitation_id=invitation.id, rsvp_status='accepted').all()
     
     return jsonify({
         'guests': [g.to_dict() for g in confirmed_guests],
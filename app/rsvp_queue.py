@@ -0,0 +1,315 @@
+"""Cola durable de RSVPs para el modo write-behind (RSVP_WRITE_BEHIND).
+
+Los RSVPs validados se anotan en un SQLite local aparte (WAL, synchronous=FULL)
+y se confirman al invitado con 202. Un flusher en segundo plano por worker los
+aplica a la base principal en lotes de RSVP_FLUSH_BATCH_SIZE, como máximo cada
+RSVP_FLUSH_INTERVAL segundos, con un solo commit por lote. Así un pico de RSVPs
+se convierte en pocas transacciones en vez de una por request.
+
+Cada lote se reclama con un lease (claimed_at): si el worker muere a mitad de
+camino, otro flusher lo retoma cuando vence RSVP_CLAIM_TIMEOUT. Lo que quedó en
+la cola de antes de un reinicio lo aplica el flusher, que arranca al iniciar la
+app (y en cada worker después del fork) si hay entradas pendientes.
+
+La entrega es al menos una vez: si el worker cae entre el commit y el ack, el
+lote se vuelve a reclamar. Cada entrada lleva una clave (entry_key) que se
+anota en rsvp_queue_applied en la misma transacción que el RSVP, y el
+reintento saltea las que ya figuran ahí. Las entradas de invitaciones
+borradas o despublicadas mientras esperaban se descartan, con un warning en
+el log y el contador `discarded`.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rsvp_queue (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    invitation_id INTEGER NOT NULL,
+    unique_code TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    enqueued_at REAL NOT NULL,
+    claimed_at REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    dead INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+
+class RsvpQueue:
+    """Cola durable + flusher en background (uno por proceso)."""
+
+    def __init__(self):
+        self.enabled = False
+        self.path = None
+        self._app = None
+        self._local = threading.local()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._thread_pid = None
+        self._fork_hook = False
+        self._lock = threading.Lock()
+        self.flushed = 0
+        self.batches = 0
+        self.failed = 0
+        self.discarded = 0
+        self.last_flush_ms = None
+
+    def init_app(self, app):
+        self._app = app
+        self.enabled = app.config.get('RSVP_WRITE_BEHIND', False)
+        self.path = app.config.get('RSVP_QUEUE_PATH') or os.path.join(app.instance_path, 'rsvp_queue.db')
+        self.flush_interval = app.config.get('RSVP_FLUSH_INTERVAL', 1.0)
+        self.batch_size = app.config.get('RSVP_FLUSH_BATCH_SIZE', 200)
+        self.claim_timeout = app.config.get('RSVP_CLAIM_TIMEOUT', 60)
+        self.max_attempts = app.config.get('RSVP_MAX_ATTEMPTS', 5)
+        self.applied_retention = app.config.get('RSVP_APPLIED_RETENTION', 86400)
+        if not self.enabled:
+            return
+        self.resume()
+        if hasattr(os, 'register_at_fork') and not self._fork_hook:
+            # gunicorn --preload: el thread del master no sobrevive al fork
+            os.register_at_fork(after_in_child=self._after_fork)
+            self._fork_hook = True
+
+    def resume(self):
+        """Arranca el flusher si la cola ya tiene entradas (p.ej. de antes de un reinicio)."""
+        if self.enabled and os.path.exists(self.path) and self.pending_count():
+            self._ensure_flusher()
+
+    def _after_fork(self):
+        # La conexión a la cola abierta antes del fork no se usa en el hijo
+        self._local = threading.local()
+        self.resume()
+
+    # -- almacenamiento ---------------------------------------------------
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'path', None) != self.path:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=FULL')
+            conn.execute(SCHEMA)
+            self._local.conn = conn
+            self._local.path = self.path
+        return conn
+
+    def enqueue(self, invitation_id, unique_code, fields):
+        """Persiste un RSVP validado. Devuelve la cantidad pendiente en la cola."""
+        payload = dict(fields, rsvp_date=fields['rsvp_date'].isoformat(), entry_key=uuid.uuid4().hex)
+        conn = self._connection()
+        conn.execute(
+            'INSERT INTO rsvp_queue (invitation_id, unique_code, payload, enqueued_at) VALUES (?, ?, ?, ?)',
+            (invitation_id, unique_code, json.dumps(payload), time.time()),
+        )
+        pending = self.pending_count()
+        self._ensure_flusher()
+        if pending >= self.batch_size:
+            self._wakeup.set()
+        return pending
+
+    def pending_count(self):
+        return self._connection().execute(
+            'SELECT COUNT(*) FROM rsvp_queue WHERE dead = 0').fetchone()[0]
+
+    def stats(self):
+        conn = self._connection()
+        pending, oldest = conn.execute(
+            'SELECT COUNT(*), MIN(enqueued_at) FROM rsvp_queue WHERE dead = 0').fetchone()
+        dead = conn.execute('SELECT COUNT(*) FROM rsvp_queue WHERE dead = 1').fetchone()[0]
+        return {
+            'enabled': self.enabled,
+            'pending': pending,
+            'oldest_pending_age_s': round(time.time() - oldest, 3) if oldest else None,
+            'dead': dead,
+            'flushed': self.flushed,
+            'batches': self.batches,
+            'failed': self.failed,
+            'discarded': self.discarded,
+            'last_flush_ms': self.last_flush_ms,
+        }
+
+    def _claim(self):
+        """Reclama un lote (entradas libres o con lease vencido)."""
+        conn = self._connection()
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            rows = conn.execute(
+                'SELECT id, invitation_id, unique_code, payload, attempts FROM rsvp_queue '
+                'WHERE dead = 0 AND (claimed_at IS NULL OR claimed_at < ?) ORDER BY id LIMIT ?',
+                (now - self.claim_timeout, self.batch_size),
+            ).fetchall()
+            if rows:
+                conn.executemany('UPDATE rsvp_queue SET claimed_at = ? WHERE id = ?',
+                                 [(now, row[0]) for row in rows])
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return rows
+
+    def _ack(self, ids):
+        self._connection().executemany('DELETE FROM rsvp_queue WHERE id = ?', [(i,) for i in ids])
+
+    def _fail(self, row, error):
+        entry_id, attempts = row[0], row[4] + 1
+        self._connection().execute(
+            'UPDATE rsvp_queue SET claimed_at = NULL, attempts = ?, last_error = ?, dead = ? WHERE id = ?',
+            (attempts, str(error)[:500], int(attempts >= self.max_attempts), entry_id),
+        )
+
+    # -- aplicación a la base principal -----------------------------------
+
+    def _apply(self, rows):
+        """Aplica las entradas en la sesión actual (sin commit).
+
+        Saltea las que ya figuran en rsvp_queue_applied y anota las nuevas en
+        la misma transacción. Devuelve los códigos tocados y los ids de las
+        entradas descartadas.
+        """
+        from app import db
+        from app.models.applied_rsvp import AppliedRsvp
+        from app.models.guest import Guest
+        from app.models.invitation import Invitation
+
+        entries = []
+        for entry_id, invitation_id, unique_code, payload, _ in rows:
+            fields = json.loads(payload)
+            # Las encoladas antes de que existiera la clave no tienen cómo deduplicarse
+            entries.append((entry_id, invitation_id, unique_code, fields.pop('entry_key', None), fields))
+        keys = [key for _, _, _, key, _ in entries if key]
+        applied = set(db.session.scalars(
+            db.select(AppliedRsvp.entry_key).where(AppliedRsvp.entry_key.in_(keys))
+        )) if keys else set()
+
+        invitations = {}
+        codes = set()
+        discarded = []
+        new_keys = []
+        for entry_id, invitation_id, unique_code, key, fields in entries:
+            if key in applied:
+                continue  # commiteada en un intento anterior que no llegó al ack
+            if key:
+                new_keys.append(key)
+            if invitation_id not in invitations:
+                invitations[invitation_id] = Invitation.query.get(invitation_id)
+            invitation = invitations[invitation_id]
+            if not invitation or not invitation.is_published:
+                discarded.append(entry_id)  # borrada o despublicada mientras esperaba
+                continue
+            fields['rsvp_date'] = datetime.fromisoformat(fields['rsvp_date'])
+            Guest.upsert_rsvp(invitation, fields)
+            codes.add(unique_code)
+        if new_keys:
+            now = datetime.utcnow()
+            db.session.execute(db.insert(AppliedRsvp), [{'entry_key': key, 'applied_at': now} for key in new_keys])
+        return codes, discarded
+
+    def _prune_applied(self):
+        """Borra las claves aplicadas hace más de RSVP_APPLIED_RETENTION (sin commit)."""
+        from app import db
+        from app.models.applied_rsvp import AppliedRsvp
+
+        cutoff = datetime.utcnow() - timedelta(seconds=self.applied_retention)
+        db.session.execute(db.delete(AppliedRsvp).where(AppliedRsvp.applied_at < cutoff))
+
+    def flush(self):
+        """Aplica un lote pendiente. Devuelve cuántas entradas se procesaron."""
+        from app import db
+        from app.cache import public_invitation_cache
+        from app.microcache import microcache
+        from app.snapshots import public_snapshots
+        from app.sqlite_profile import write_transaction
+
+        rows = self._claim()
+        if not rows:
+            return 0
+
+        start = time.perf_counter()
+        with write_transaction():
+            try:
+                codes, discarded = self._apply(rows)
+                self._prune_applied()
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                # Una entrada rota no debe trabar el lote: se reintenta de a una
+                codes = set()
+                discarded = []
+                applied = []
+                for row in rows:
+                    try:
+                        row_codes, row_discarded = self._apply([row])
+                        db.session.commit()
+                        codes |= row_codes
+                        discarded += row_discarded
+                        applied.append(row)
+                    except Exception as e:
+                        db.session.rollback()
+                        self._fail(row, e)
+                        self.failed += 1
+                rows = applied
+            finally:
+                db.session.remove()
+
+        self._ack([row[0] for row in rows])
+        if discarded:
+            self._app.logger.warning(
+                'RSVPs descartados (invitación borrada o despublicada): entradas %s', discarded)
+        for code in codes:
+            public_invitation_cache.invalidate(code)
+        public_snapshots.schedule(*codes)
+        microcache.schedule(*codes)
+        with self._lock:
+            self.flushed += len(rows)
+            self.batches += 1
+            self.discarded += len(discarded)
+            self.last_flush_ms = round((time.perf_counter() - start) * 1000, 2)
+        return len(rows)
+
+    def flush_all(self):
+        total = 0
+        while True:
+            flushed = self.flush()
+            total += flushed
+            if flushed < self.batch_size:
+                return total
+
+    # -- flusher en background --------------------------------------------
+
+    def _ensure_flusher(self):
+        pid = os.getpid()
+        if self._thread is not None and self._thread_pid == pid and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread_pid == pid and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='rsvp-flusher', daemon=True)
+            self._thread_pid = pid
+            self._thread.start()
+
+    def _run(self):
+        # Si la app se reconfigura sin write-behind el flusher termina
+        while self.enabled:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                with self._app.app_context():
+                    self.flush_all()
+            except Exception:
+                self._app.logger.exception('Error aplicando la cola de RSVPs')
+
+
+rsvp_queue = RsvpQueue()
+
+
+def init_app(app):
+    rsvp_queue.init_app(app)
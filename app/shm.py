@@ -0,0 +1,102 @@
+"""Archivos mapeados en memoria para compartir estado entre workers de gunicorn."""
+import hashlib
+import mmap
+import os
+import struct
+import threading
+
+try:
+    import fcntl
+except ImportError:  # sin flock (Windows) el estado queda por proceso
+    fcntl = None
+
+HEADER = struct.Struct('<8sQ')  # magic, tamaño total
+DATA_OFFSET = HEADER.size       # comienzo de la región de datos dentro del mmap
+
+
+def default_path(app, name, *scope):
+    """Path del archivo de estado `name` para esta app.
+
+    /dev/shm (tmpfs) si existe: no toca disco y se limpia al reiniciar la máquina.
+    El nombre depende del instance_path (y de `scope`) para que cada deploy tenga
+    el suyo.
+    """
+    if os.path.isdir('/dev/shm'):
+        key = '\0'.join((app.instance_path,) + tuple(str(s) for s in scope))
+        digest = hashlib.blake2b(key.encode(), digest_size=6).hexdigest()
+        return os.path.join('/dev/shm', f'invitations-{name}-{digest}.bin')
+    return os.path.join(app.instance_path, f'{name}.bin')
+
+
+class SharedMemoryFile:
+    """Región de `size` bytes (desde DATA_OFFSET) compartida entre procesos.
+
+    Se abre en forma perezosa una vez por pid (después de un fork se reabre para
+    no compartir el flock con el padre). Todo acceso va dentro de `locked()`,
+    que serializa threads (lock) y procesos (flock). Si el archivo existente no
+    tiene el magic/tamaño esperado se reinicia en cero.
+    """
+
+    def __init__(self, magic):
+        self.magic = magic
+        self.path = None
+        self.size = 0
+        self._thread_lock = threading.Lock()
+        self._pid = None
+        self._fd = None
+        self.map = None
+
+    def configure(self, path, size):
+        self.path = path
+        self.size = size
+        self._pid = None
+        self.map = None
+
+    def _open(self):
+        total = HEADER.size + self.size
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        self._flock(fd, True)
+        try:
+            expected = HEADER.pack(self.magic, total)
+            if os.fstat(fd).st_size != total or os.pread(fd, HEADER.size, 0) != expected:
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, total)
+                os.pwrite(fd, expected, 0)
+            self.map = mmap.mmap(fd, total)
+        finally:
+            self._flock(fd, False)
+        self._fd = fd
+        self._pid = os.getpid()
+
+    @staticmethod
+    def _flock(fd, exclusive):
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_UN)
+
+    def opened_in_this_process(self):
+        return self.map is not None and self._pid == os.getpid()
+
+    def locked(self):
+        return _Locked(self)
+
+
+class _Locked:
+    def __init__(self, shared):
+        self.shared = shared
+
+    def __enter__(self):
+        shared = self.shared
+        shared._thread_lock.acquire()
+        try:
+            if not shared.opened_in_this_process():
+                shared._open()
+            shared._flock(shared._fd, True)
+        except BaseException:
+            shared._thread_lock.release()
+            raise
+        return shared.map
+
+    def __exit__(self, *exc):
+        self.shared._flock(self.shared._fd, False)
+        self.shared._thread_lock.release()
@@ -0,0 +1,198 @@
+"""Snapshots estáticos de las invitaciones publicadas (STATIC_SNAPSHOTS_DIR).
+
+Por cada unique_code publicado se escriben dos archivos que nginx sirve
+directo con try_files, sin pasar por Python:
+  - invitations/<code>.json: el mismo body que GET /api/public/invitations/<code>
+  - invitations/<code>.html: la landing (GET /api/public/invitations/<code>/page),
+    con template_key, las URLs de media y el JSON embebido para el frontend
+
+Los snapshots no se generan en el request: publish, update, quick-create,
+bulk, RSVPs (también los del flusher write-behind) y delete anotan el código
+con schedule() después del commit, y un thread en segundo plano por worker
+los regenera cada STATIC_SNAPSHOTS_DELAY segundos. Así una ráfaga de RSVPs a
+la misma invitación se convierte en un solo render. Si la invitación ya no
+existe o no está publicada, se borran sus archivos y nginx cae a la app (404).
+
+Entre workers, el render (lectura de la base + escritura) se serializa con un
+flock sobre `<dir>/.render.lock`: el que lee después escribe después, así un
+render viejo no pisa uno nuevo. Los archivos se escriben a un temporal y se
+renombran, nginx nunca ve uno a medio escribir.
+
+`flask render-snapshots` regenera todos (deploy inicial, cambio de la landing).
+"""
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import current_app, render_template
+
+from app.background import CoalescingWorker
+
+try:
+    import fcntl
+except ImportError:  # sin flock (Windows) solo se serializa dentro del proceso
+    fcntl = None
+
+SNAPSHOT_SUBDIR = 'invitations'
+RENDER_CHUNK_SIZE = 500
+
+# unique_code es token_urlsafe: cualquier otra cosa no se usa como nombre de archivo
+SAFE_CODE = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+
+def public_invitation_body(invitation):
+    """Body JSON de GET /api/public/invitations/<code> (también el snapshot .json)."""
+    return current_app.json.dumps({
+        'invitation': invitation.to_dict(),
+        'rsvp_stats': invitation.rsvp_stats(),
+    }) + '\n'
+
+
+def render_public_page(invitation):
+    """Landing HTML de una invitación publicada (también el snapshot .html)."""
+    return render_template(
+        'public_invitation.html',
+        invitation=invitation.to_dict(),
+        assets_url=(current_app.config.get('STATIC_SNAPSHOTS_ASSETS_URL') or '').rstrip('/'),
+    )
+
+
+class PublicSnapshots(CoalescingWorker):
+    """Cola de códigos a regenerar + thread de render (uno por proceso)."""
+
+    thread_name = 'snapshot-renderer'
+
+    def __init__(self):
+        super().__init__()
+        self.directory = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self._lock:
+            self.rendered = 0
+            self.removed = 0
+            self.failed = 0
+            self.batches = 0
+            self.last_render_ms = None
+
+    def init_app(self, app):
+        self._app = app
+        self.directory = app.config.get('STATIC_SNAPSHOTS_DIR') or None
+        self.enabled = self.directory is not None
+        self.delay = app.config.get('STATIC_SNAPSHOTS_DELAY', 1.0)
+        if self.enabled:
+            os.makedirs(os.path.join(self.directory, SNAPSHOT_SUBDIR), exist_ok=True)
+
+    def schedule_if_missing(self, code):
+        if self.enabled and not os.path.exists(self.path(code, 'html')):
+            self.schedule(code)
+
+    def process(self, codes):
+        self.render(codes)
+
+    # -- render ---------------------------------------------------------------
+
+    def render(self, codes):
+        """Escribe (publicadas) o borra (el resto) los snapshots de `codes`."""
+        from app.models.invitation import Invitation
+
+        codes = [code for code in codes if SAFE_CODE.match(code)]
+        start = time.perf_counter()
+        rendered = removed = failed = 0
+        with self._file_lock():
+            for offset in range(0, len(codes), RENDER_CHUNK_SIZE):
+                chunk = codes[offset:offset + RENDER_CHUNK_SIZE]
+                found = {invitation.unique_code: invitation
+                         for invitation in Invitation.query.filter(Invitation.unique_code.in_(chunk))}
+                for code in chunk:
+                    invitation = found.get(code)
+                    try:
+                        if invitation is not None and invitation.is_published:
+                            self._write(code, 'json', public_invitation_body(invitation))
+                            self._write(code, 'html', render_public_page(invitation))
+                            rendered += 1
+                        elif self._remove(code):
+                            removed += 1
+                    except Exception:
+                        current_app.logger.exception('No se pudo generar el snapshot de %s', code)
+                        failed += 1
+        with self._lock:
+            self.rendered += rendered
+            self.removed += removed
+            self.failed += failed
+            self.batches += 1
+            self.last_render_ms = round((time.perf_counter() - start) * 1000, 2)
+        return rendered
+
+    def render_all(self, prune=False):
+        """Regenera los snapshots de todas las publicadas; con prune borra los huérfanos."""
+        from app import db
+        from app.models.invitation import Invitation
+
+        published = set(db.session.scalars(
+            db.select(Invitation.unique_code).where(Invitation.is_published.is_(True))))
+        rendered = self.render(sorted(published))
+        pruned = 0
+        if prune:
+            orphans = {name.rsplit('.', 1)[0] for name in os.listdir(self._subdir())
+                       if name.endswith(('.json', '.html'))} - published
+            with self._file_lock():
+                pruned = sum(self._remove(code) for code in orphans if SAFE_CODE.match(code))
+        return rendered, pruned
+
+    def path(self, code, extension):
+        return os.path.join(self._subdir(), f'{code}.{extension}')
+
+    def _subdir(self):
+        return os.path.join(self.directory, SNAPSHOT_SUBDIR)
+
+    def _write(self, code, extension, content):
+        target = self.path(code, extension)
+        tmp = f'{target}.tmp-{os.getpid()}-{threading.get_ident()}'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp, target)
+
+    def _remove(self, code):
+        removed = False
+        for extension in ('json', 'html'):
+            try:
+                os.remove(self.path(code, extension))
+                removed = True
+            except FileNotFoundError:
+                pass
+        return removed
+
+    @contextmanager
+    def _file_lock(self):
+        if fcntl is None:
+            yield
+            return
+        fd = os.open(os.path.join(self.directory, '.render.lock'), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)  # cerrar el fd suelta el flock
+
+    def stats(self):
+        with self._lock:
+            return {
+                'enabled': True,
+                'directory': self.directory,
+                'pending': len(self._pending),
+                'rendered': self.rendered,
+                'removed': self.removed,
+                'failed': self.failed,
+                'batches': self.batches,
+                'last_render_ms': self.last_render_ms,
+            }
+
+
+public_snapshots = PublicSnapshots()
+
+
+def init_app(app):
+    public_snapshots.init_app(app)
@@ -0,0 +1,243 @@
+"""Perfil de SQLite para producción (DATABASE_URL sqlite en archivo).
+
+Pensado para varios workers de gunicorn sobre el mismo archivo. En cada
+conexión nueva se aplican:
+  - journal_mode=WAL: los lectores no bloquean al escritor ni al revés
+  - busy_timeout: esperar el lock en vez de fallar con "database is locked"
+  - synchronous (NORMAL por defecto): en WAL no hay fsync en cada commit y la
+    base sigue consistente; un corte de luz puede perder los últimos commits
+  - mmap_size: lecturas desde el page cache del SO, sin copiar páginas
+
+Escrituras: SQLite admite un solo escritor a la vez. Con transacciones
+diferidas una que empezó leyendo y después escribe falla al instante con
+SQLITE_BUSY si otro proceso escribió en el medio, y busy_timeout no la salva.
+Por eso las transacciones de requests que escriben (POST/PUT/PATCH/DELETE)
+arrancan con BEGIN IMMEDIATE, que toma el lock de escritura al principio. Los
+GET siguen con BEGIN diferido y leen en paralelo. Las vistas de métodos no
+seguros que solo leen se marcan con @read_only_transaction (p.ej. login, que
+hashea la contraseña con la transacción abierta), o con
+@read_only_transaction_when(condición) si depende de la configuración (el RSVP
+con write-behind solo lee la invitación y encola).
+
+Fuera de un request (threads en segundo plano, comandos CLI) no hay método
+HTTP que mire: las transacciones son diferidas, así el Bloom filter de
+códigos, el render de snapshots o un comando que solo lee no compiten por el
+lock de escritura. Lo que sí escribe se marca con `with write_transaction():`
+(o como decorador): el flusher de RSVPs, init-db, el bootstrap del admin y los
+comandos que recalculan contadores.
+
+Cómo esperan los escritores (SQLITE_WRITE_LOCK):
+  - 'flock' (default): antes del BEGIN IMMEDIATE toman un flock exclusivo sobre
+    `<base>-writer.lock` y lo sueltan cuando la conexión vuelve al pool. El
+    kernel despierta al siguiente apenas se libera, así que con varios
+    workers la latencia de cola queda acotada.
+  - 'immediate': solo BEGIN IMMEDIATE; espera el busy handler de SQLite, que
+    reintenta durmiendo cada vez más. Algo más de throughput, pero un escritor
+    con mala suerte puede pasar busy_timeout y fallar igual.
+  - 'deferred': BEGIN diferido para todo (sin serializar).
+
+No aplica a SQLite en memoria ni a otras bases.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import current_app, has_request_context, request
+from sqlalchemy import event
+
+from app.db_routing import REPLICA_BIND
+
+try:
+    import fcntl
+except ImportError:  # sin flock (Windows) 'flock' se comporta como 'immediate'
+    fcntl = None
+
+READ_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS'])
+WRITE_LOCK_MODES = ('flock', 'immediate', 'deferred')
+
+# Un BEGIN de escritura que tarda más que esto cuenta como espera por el lock
+WAIT_THRESHOLD_MS = 1.0
+
+_write_transaction = ContextVar('sqlite_write_transaction', default=False)
+
+
+def read_only_transaction(view):
+    """Marca una vista POST/PUT/... que no escribe: su transacción arranca diferida."""
+    view.read_only_transaction = True
+    return view
+
+
+def read_only_transaction_when(condition):
+    """Como @read_only_transaction, pero solo mientras `condition()` sea verdadera."""
+    def decorator(view):
+        view.read_only_transaction = condition
+        return view
+    return decorator
+
+
+@contextmanager
+def write_transaction():
+    """Fuera de un request: las transacciones del bloque arrancan con BEGIN IMMEDIATE."""
+    token = _write_transaction.set(True)
+    try:
+        yield
+    finally:
+        _write_transaction.reset(token)
+
+
+def is_file_sqlite(url):
+    """True si la URL es un SQLite en archivo (no :memory:)."""
+    database = url.database or ''
+    return (url.get_backend_name() == 'sqlite' and database not in ('', ':memory:')
+            and 'mode=memory' not in database)
+
+
+def _writes_expected():
+    if _write_transaction.get():
+        return True
+    if not has_request_context():
+        return False
+    if request.method in READ_METHODS:
+        return False
+    view = current_app.view_functions.get(request.endpoint)
+    read_only = getattr(view, 'read_only_transaction', False)
+    return not (read_only() if callable(read_only) else read_only)
+
+
+class SQLiteProfile:
+    """PRAGMAs por conexión y serialización de escritores entre procesos."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.enabled = False
+        self.pragmas = []
+        self.read_pragmas = []
+        self.write_lock = 'flock'
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self._lock:
+            self.write_transactions = 0
+            self.read_transactions = 0
+            self.waits = 0
+            self.wait_ms_total = 0.0
+            self.wait_ms_max = 0.0
+
+    def init_app(self, app):
+        from app import db
+
+        config = app.config
+        if not config.get('SQLITE_PROFILE_ENABLED', True):
+            return
+        self.read_pragmas = [
+            f"PRAGMA busy_timeout = {int(config.get('SQLITE_BUSY_TIMEOUT_MS', 5000))}",
+            f"PRAGMA mmap_size = {int(config.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))}",
+        ]
+        # busy_timeout primero: cambiar a WAL también puede tener que esperar
+        self.pragmas = self.read_pragmas[:1] + [
+            'PRAGMA journal_mode = WAL',
+            f"PRAGMA synchronous = {config.get('SQLITE_SYNCHRONOUS', 'NORMAL').upper()}",
+        ] + self.read_pragmas[1:]
+        self.write_lock = config.get('SQLITE_WRITE_LOCK', 'flock').lower()
+        if self.write_lock not in WRITE_LOCK_MODES:
+            raise ValueError(f'SQLITE_WRITE_LOCK inválido: {self.write_lock!r} ({", ".join(WRITE_LOCK_MODES)})')
+
+        with app.app_context():
+            engines = dict(db.engines)
+        for bind_key, engine in engines.items():
+            if is_file_sqlite(engine.url):
+                # La réplica solo se lee: ni cambiar su journal ni serializar escritores
+                self.configure_engine(engine, transactions=bind_key != REPLICA_BIND)
+                self.enabled = True
+
+    def configure_engine(self, engine, transactions=True):
+        """Registra los eventos en `engine`. Con transactions=False es un engine de
+        solo lectura (réplica, el async de app.asgi): solo busy_timeout y mmap."""
+        if not transactions:
+            event.listen(engine, 'connect', self.on_connect_read_only)
+            return
+        event.listen(engine, 'connect', self.on_connect)
+        event.listen(engine, 'connect', self.on_connect_manual_begin)
+        event.listen(engine, 'begin', self.on_begin)
+        if self.write_lock == 'flock' and fcntl is not None:
+            lock_path = f'{os.path.abspath(engine.url.database)}-writer.lock'
+            event.listen(engine, 'connect', lambda dbapi_connection, record: self.open_writer_lock(record, lock_path))
+            event.listen(engine, 'checkin', self.release_writer_lock)
+            event.listen(engine, 'close', self.close_writer_lock)
+
+    # -- eventos de conexión --------------------------------------------------
+
+    def on_connect(self, dbapi_connection, connection_record, pragmas=None):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas or self.pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+    def on_connect_read_only(self, dbapi_connection, connection_record):
+        self.on_connect(dbapi_connection, connection_record, self.read_pragmas)
+
+    def on_connect_manual_begin(self, dbapi_connection, connection_record):
+        # Sin el BEGIN implícito de pysqlite: lo emite on_begin (receta de SQLAlchemy)
+        dbapi_connection.isolation_level = None
+
+    def on_begin(self, conn):
+        if self.write_lock == 'deferred' or not _writes_expected():
+            conn.exec_driver_sql('BEGIN')
+            with self._lock:
+                self.read_transactions += 1
+            return
+
+        start = time.perf_counter()
+        record = conn.connection._connection_record
+        fd = record.info.get('writer_lock_fd')
+        if fd is not None and not record.info.get('writer_lock_held'):
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            record.info['writer_lock_held'] = True
+        conn.exec_driver_sql('BEGIN IMMEDIATE')
+        self._record_write((time.perf_counter() - start) * 1000)
+
+    # Un fd por conexión: flock excluye entre descriptores abiertos por separado,
+    # así que serializa tanto entre procesos como entre threads del mismo worker.
+
+    def open_writer_lock(self, connection_record, lock_path):
+        connection_record.info['writer_lock_fd'] = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+
+    def release_writer_lock(self, dbapi_connection, connection_record):
+        if connection_record.info.pop('writer_lock_held', False):
+            fcntl.flock(connection_record.info['writer_lock_fd'], fcntl.LOCK_UN)
+
+    def close_writer_lock(self, dbapi_connection, connection_record):
+        fd = connection_record.info.pop('writer_lock_fd', None)
+        connection_record.info.pop('writer_lock_held', None)
+        if fd is not None:
+            os.close(fd)  # cerrar el fd también suelta el flock
+
+    def _record_write(self, waited_ms):
+        with self._lock:
+            self.write_transactions += 1
+            if waited_ms >= WAIT_THRESHOLD_MS:
+                self.waits += 1
+                self.wait_ms_total += waited_ms
+                self.wait_ms_max = max(self.wait_ms_max, waited_ms)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'enabled': True,
+                'pragmas': self.pragmas,
+                'write_lock': self.write_lock,
+                'write_transactions': self.write_transactions,
+                'read_transactions': self.read_transactions,
+                'write_lock_waits': self.waits,
+                'write_lock_wait_ms_avg': round(self.wait_ms_total / self.waits, 3) if self.waits else 0.0,
+                'write_lock_wait_ms_max': round(self.wait_ms_max, 3),
+            }
+
+
+sqlite_profile = SQLiteProfile()
+
+
+def init_app(app):
+    sqlite_profile.init_app(app)
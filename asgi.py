@@ -0,0 +1,5 @@
+import os
+from app.asgi import create_asgi_app
+
+# App ASGI (GET públicos en async + resto vía Flask): uvicorn asgi:app
+app = create_asgi_app(config_name=os.environ.get('FLASK_ENV', 'development'))
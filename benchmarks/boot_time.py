@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Tiempo de arranque de un worker: import del paquete `app` y create_app()
+
+Cada muestra es un proceso Python nuevo (como un worker de gunicorn sin
+--preload) que mide por separado:
+  - boot.import_app: `import app` (Flask, SQLAlchemy, extensiones)
+  - boot.create_app: create_app('production') (config, blueprints, modelos)
+  - boot.worker: la suma de los dos (lo que paga cada worker al arrancar)
+  - boot.process: el proceso completo, intérprete incluido
+
+y además lista los imports más pesados (`python -X importtime`). Guarda el
+JSON con el mismo formato que benchmarks/hot_paths.py, así se compara con
+benchmarks/compare.py.
+
+Uso:
+    python benchmarks/boot_time.py                           # -> benchmarks/results/boot.json
+    python benchmarks/boot_time.py --repeat 30 --output antes.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = '''
+import json, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.create_app('production')
+created = time.perf_counter()
+print(json.dumps({'boot.import_app': imported - start, 'boot.create_app': created - imported,
+                  'boot.worker': created - start}))
+'''
+
+
+def child_env(tmpdir):
+    env = dict(os.environ)
+    env.update({
+        'PYTHONPATH': ROOT,
+        'DATABASE_URL': f'sqlite:///{os.path.join(tmpdir, "boot.db")}',
+        'RATE_LIMIT_STATE_PATH': os.path.join(tmpdir, 'ratelimit'),
+        'METRICS_STATE_PATH': os.path.join(tmpdir, 'metrics'),
+    })
+    return env
+
+
+def sample(env):
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, '-c', CHILD], cwd=ROOT, env=env, check=True,
+                         capture_output=True, text=True).stdout
+    timings = json.loads(out.strip().splitlines()[-1])
+    timings['boot.process'] = time.perf_counter() - start
+    return timings
+
+
+def heaviest_imports(env, top):
+    """Módulos importados por `app` o por create_app() con mayor tiempo acumulado (us)."""
+    err = subprocess.run([sys.executable, '-X', 'importtime', '-c', CHILD], cwd=ROOT, env=env, check=True,
+                         capture_output=True, text=True).stderr
+    totals = {}
+    for line in err.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth <= 1 and name.strip() not in ('app', 'json', 'time'):
+            totals[name.strip()] = int(cumulative)
+    return sorted(totals.items(), key=lambda item: -item[1])[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tiempo de arranque de un worker')
+    parser.add_argument('--output', default=os.path.join(ROOT, 'benchmarks', 'results', 'boot.json'))
+    parser.add_argument('--repeat', type=int, default=15, help='Procesos a medir')
+    parser.add_argument('--top', type=int, default=10, help='Imports más pesados a listar')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='bench-boot-') as tmpdir:
+        env = child_env(tmpdir)
+        sample(env)  # calienta el cache de bytecode y del sistema de archivos
+        samples = [sample(env) for _ in range(args.repeat)]
+        imports = heaviest_imports(env, args.top)
+
+    results = {}
+    for key in samples[0]:
+        values = [s[key] for s in samples]
+        results[key] = {
+            'median_us': statistics.median(values) * 1e6,
+            'min_us': min(values) * 1e6,
+            'stdev_us': statistics.stdev(values) * 1e6 if len(values) > 1 else 0.0,
+            'loops': 1,
+            'repeat': args.repeat,
+        }
+        print(f'{key:<20} {results[key]["median_us"] / 1000:>8.1f} ms  (min {results[key]["min_us"] / 1000:.1f})')
+
+    print('\nImports más pesados (acumulado):')
+    for name, cumulative in imports:
+        print(f'  {name:<40} {cumulative / 1000:>8.1f} ms')
+
+    report = {
+        'meta': {
+            'created_at': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'args': {k: v for k, v in vars(args).items() if k != 'output'},
+            'heaviest_imports_us': dict(imports),
+        },
+        'results': results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f'\nResultados en {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Compara dos corridas de benchmarks/hot_paths.py y marca regresiones
+
+Para cada caso presente en ambas compara la mediana por operación. Es
+regresión si la nueva es más lenta que la base por más de `--threshold`
+(relativo) tanto en la mediana como en el mínimo: una corrida con ruido (otro
+proceso robando CPU) sube la mediana pero rara vez el mínimo. Sale con código 1
+si hay alguna, así sirve como paso de CI. Conviene comparar corridas hechas en
+la misma máquina y con los mismos argumentos; el umbral por defecto (25%) es
+para VMs compartidas, en una máquina dedicada y quieta alcanza con 5-10%.
+
+Uso:
+    python benchmarks/compare.py antes.json despues.json
+    python benchmarks/compare.py antes.json despues.json --threshold 0.10
+"""
+
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(base, new, threshold):
+    """Filas (caso, base_us, nuevo_us, ratio, estado) para los casos en común."""
+    rows = []
+    for name in sorted(set(base['results']) & set(new['results'])):
+        old, cur = base['results'][name], new['results'][name]
+        ratio = cur['median_us'] / old['median_us'] if old['median_us'] else float('inf')
+        min_ratio = cur['min_us'] / old['min_us'] if old['min_us'] else float('inf')
+        if ratio > 1 + threshold and min_ratio > 1 + threshold:
+            status = 'REGRESIÓN'
+        elif ratio < 1 - threshold and min_ratio < 1 - threshold:
+            status = 'mejora'
+        else:
+            status = ''
+        rows.append((name, old['median_us'], cur['median_us'], ratio, status))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compara dos corridas de hot_paths.py')
+    parser.add_argument('base', help='JSON de referencia (p.ej. main)')
+    parser.add_argument('new', help='JSON a evaluar')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Variación relativa tolerada (default 0.25 = 25%%)')
+    args = parser.parse_args()
+
+    base, new = load(args.base), load(args.new)
+    print(f'base:  {args.base} (rev {base["meta"].get("git_revision")}, {base["meta"].get("created_at")})')
+    print(f'nuevo: {args.new} (rev {new["meta"].get("git_revision")}, {new["meta"].get("created_at")})\n')
+
+    rows = compare(base, new, args.threshold)
+    print(f'{"caso":<48} {"base us":>12} {"nuevo us":>12} {"ratio":>7}')
+    for name, old, cur, ratio, status in rows:
+        print(f'{name:<48} {old:>12.2f} {cur:>12.2f} {ratio:>7.2f}  {status}')
+
+    only_base = sorted(set(base['results']) - set(new['results']))
+    only_new = sorted(set(new['results']) - set(base['results']))
+    if only_base:
+        print(f'\nSolo en base: {", ".join(only_base)}')
+    if only_new:
+        print(f'\nSolo en nuevo: {", ".join(only_new)}')
+
+    regressions = [row for row in rows if row[4] == 'REGRESIÓN']
+    if regressions:
+        print(f'\n{len(regressions)} regresión(es) de más de {args.threshold:.0%}')
+        sys.exit(1)
+    print(f'\nSin regresiones de más de {args.threshold:.0%}')
+
+
+if __name__ == '__main__':
+    main()
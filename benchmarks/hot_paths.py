@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks de los caminos calientes de modelos y serialización
+
+Con datos sintéticos (deterministas) sobre SQLite en memoria y en archivo mide:
+  - Invitation.to_dict, Invitation.rsvp_stats, Guest.to_dict (por fila)
+  - upsert de RSVP (Guest.upsert_rsvp + commit), invitado nuevo y existente
+  - GET /api/invitations con per_page 10, 50 y 100
+  - GET /api/admin/stats con 10, 1k y 100k invitados (agregado y rollup)
+
+Cada caso se repite `--repeat` veces (cada muestra dura al menos
+`--min-time` s) y se guarda la mediana/mínimo por operación en un JSON. Para
+detectar regresiones entre dos corridas: benchmarks/compare.py.
+
+Uso:
+    python benchmarks/hot_paths.py                                     # -> benchmarks/results/latest.json
+    python benchmarks/hot_paths.py --backends memory --output antes.json
+    python benchmarks/hot_paths.py --quick                             # menos datos y repeticiones
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SERIALIZATION_ROWS = 1000
+GUESTS_PER_INVITATION = 20
+
+
+def measure(fn, repeat, min_time):
+    """Segundos por llamada: mediana, mínimo y desvío de `repeat` muestras.
+
+    Cada muestra repite `fn` las veces necesarias para durar `min_time` (como
+    timeit.autorange), así las operaciones muy cortas no quedan en el ruido.
+    Igual que timeit, el GC queda apagado mientras se mide.
+    """
+    gc.collect()
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        loops = 1
+        while True:
+            start = time.perf_counter()
+            for _ in range(loops):
+                fn()
+            if time.perf_counter() - start >= min_time:
+                break
+            loops *= 2
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(loops):
+                fn()
+            samples.append((time.perf_counter() - start) / loops)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return {
+        'median_us': statistics.median(samples) * 1e6,
+        'min_us': min(samples) * 1e6,
+        'stdev_us': statistics.stdev(samples) * 1e6 if len(samples) > 1 else 0.0,
+        'loops': loops,
+        'repeat': repeat,
+    }
+
+
+@contextmanager
+def bench_app(backend, tmpdir, **overrides):
+    """App de testing (con app context) sobre SQLite en memoria o en un archivo nuevo."""
+    from app import create_app, db
+    from config import TestingConfig, config
+
+    attrs = dict(overrides)
+    if backend == 'file':
+        path = os.path.join(tmpdir, f'bench-{len(os.listdir(tmpdir))}.db')
+        attrs['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    config['bench'] = type('BenchConfig', (TestingConfig,), attrs)
+    app = create_app('bench')
+    with app.app_context():
+        yield app, db
+        db.session.remove()
+
+
+def seed(db, invitations, guests_per_invitation):
+    """Un usuario con `invitations` invitaciones publicadas y sus RSVPs (contadores al día)."""
+    from app.models import Guest, Invitation, Template, User
+
+    now = datetime(2024, 1, 1)
+    statuses = ('accepted', 'accepted', 'declined', 'tentative', 'pending')
+    db.session.execute(db.insert(User), [{'id': 1, 'email': 'bench@bench.local', 'password_hash': 'x',
+                                          'company_name': 'Bench', 'created_at': now}])
+    db.session.execute(db.insert(Template), [{'user_id': 1, 'name': 'Clásico', 'created_at': now}])
+
+    counters = {status: guests_per_invitation // len(statuses) for status in statuses}
+    for status in statuses[:guests_per_invitation % len(statuses)]:
+        counters[status] += 1
+    db.session.execute(db.insert(Invitation), [{
+        'id': i, 'user_id': 1, 'birthday_name': f'Cumpleañero {i}', 'birthday_date': now, 'birthday_age': 7,
+        'event_title': f'Fiesta {i}', 'event_date': now + timedelta(days=i), 'event_time': '15:00',
+        'event_location': 'Salón La Alegría', 'organizer_name': 'María', 'rsvp_deadline': now,
+        'unique_code': f'code{i:08d}', 'share_url': f'https://x/{i}', 'is_published': True,
+        'created_at': now + timedelta(minutes=i), 'updated_at': now,
+        'rsvp_accepted': counters['accepted'], 'rsvp_declined': counters['declined'],
+        'rsvp_tentative': counters['tentative'], 'rsvp_pending': counters['pending'],
+        'rsvp_headcount': counters['accepted'] * 2,
+    } for i in range(1, invitations + 1)])
+    batch = []
+    for i in range(1, invitations + 1):
+        for n in range(guests_per_invitation):
+            batch.append({
+                'invitation_id': i, 'name': f'Invitado {n}', 'email': f'{i}-{n}@bench.local',
+                'rsvp_status': statuses[n % len(statuses)], 'rsvp_date': now, 'number_of_guests': 2,
+                'created_at': now,
+            })
+            if len(batch) == 10_000:
+                db.session.execute(db.insert(Guest), batch)
+                batch = []
+    if batch:
+        db.session.execute(db.insert(Guest), batch)
+    db.session.commit()
+
+
+def per_item(result, items):
+    """Pasa una medición de `items` filas a tiempo por fila."""
+    return {**result, **{k: result[k] / items for k in ('median_us', 'min_us', 'stdev_us')}}
+
+
+def auth_headers():
+    from flask_jwt_extended import create_access_token
+    return {'Authorization': f'Bearer {create_access_token(identity=1)}'}
+
+
+# -- casos ----------------------------------------------------------------
+
+def bench_serialization(backend, tmpdir, args):
+    from app.models import Guest, Invitation
+
+    rows = args.serialization_rows
+    with bench_app(backend, tmpdir) as (app, db):
+        seed(db, rows, 1)
+        invitations = Invitation.query.all()
+        guests = Guest.query.all()
+        for name, fn in (
+            ('invitation.to_dict', lambda: [i.to_dict() for i in invitations]),
+            ('invitation.rsvp_stats', lambda: [i.rsvp_stats() for i in invitations]),
+            ('guest.to_dict', lambda: [g.to_dict() for g in guests]),
+        ):
+            yield name, per_item(measure(fn, args.repeat, args.min_time), rows)
+
+
+def bench_rsvp_upsert(backend, tmpdir, args):
+    from app.models import Guest, Invitation
+
+    with bench_app(backend, tmpdir) as (app, db):
+        seed(db, 10, GUESTS_PER_INVITATION)
+        invitation = db.session.get(Invitation, 1)
+        counter = iter(range(10**9))
+
+        def upsert(email):
+            Guest.upsert_rsvp(invitation, {
+                'name': 'Bench', 'email': email, 'phone': None, 'rsvp_status': 'accepted',
+                'rsvp_date': datetime.utcnow(), 'number_of_guests': 2, 'dietary_restrictions': None, 'notes': None,
+            })
+            db.session.commit()
+
+        yield 'rsvp_upsert.new', measure(lambda: upsert(f'new-{next(counter)}@bench.local'), args.repeat, args.min_time)
+        yield 'rsvp_upsert.existing', measure(lambda: upsert('1-0@bench.local'), args.repeat, args.min_time)
+
+
+def bench_list_invitations(backend, tmpdir, args):
+    with bench_app(backend, tmpdir) as (app, db):
+        seed(db, 200, 2)
+        client, headers = app.test_client(), auth_headers()
+        for per_page in (10, 50, 100):
+            url = f'/api/invitations?per_page={per_page}&page=2'
+            assert client.get(url, headers=headers).status_code == 200
+            yield f'list_invitations.per_page_{per_page}', measure(
+                lambda: client.get(url, headers=headers), args.repeat, args.min_time)
+
+
+def bench_admin_stats(backend, tmpdir, args):
+    for guests in args.stats_guests:
+        for mode, rollup in (('aggregate', False), ('rollup', True)):
+            with bench_app(backend, tmpdir, USER_STATS_ROLLUP=rollup) as (app, db):
+                seed(db, max(1, guests // GUESTS_PER_INVITATION), min(guests, GUESTS_PER_INVITATION))
+                if rollup:
+                    # seed() inserta con Core: la fila del rollup no se creó con el usuario
+                    from app.models import UserStats
+                    UserStats.rebuild()
+                client, headers = app.test_client(), auth_headers()
+                assert client.get('/api/admin/stats', headers=headers).status_code == 200
+                yield f'admin_stats.{mode}.guests_{guests}', measure(
+                    lambda: client.get('/api/admin/stats', headers=headers), args.repeat, args.min_time)
+
+
+SUITES = {
+    'serialization': bench_serialization,
+    'rsvp_upsert': bench_rsvp_upsert,
+    'list_invitations': bench_list_invitations,
+    'admin_stats': bench_admin_stats,
+}
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Microbenchmarks de modelos y serialización')
+    parser.add_argument('--backends', nargs='+', choices=['memory', 'file'], default=['memory', 'file'])
+    parser.add_argument('--output', default=os.path.join(ROOT, 'benchmarks', 'results', 'latest.json'))
+    parser.add_argument('--repeat', type=int, default=9)
+    parser.add_argument('--min-time', type=float, default=0.05, help='Duración mínima de cada muestra (s)')
+    parser.add_argument('--suites', nargs='+', choices=list(SUITES), default=list(SUITES))
+    parser.add_argument('--quick', action='store_true', help='Menos datos y repeticiones (smoke)')
+    args = parser.parse_args()
+
+    args.serialization_rows = 100 if args.quick else SERIALIZATION_ROWS
+    args.stats_guests = (10, 1_000) if args.quick else (10, 1_000, 100_000)
+    if args.quick:
+        args.repeat, args.min_time = 3, 0.01
+
+    import sqlalchemy
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='bench-hot-') as tmpdir:
+        for backend in args.backends:
+            for suite in args.suites:
+                for name, result in SUITES[suite](backend, tmpdir, args):
+                    key = f'{name}[{backend}]'
+                    results[key] = result
+                    print(f'{key:<48} {result["median_us"]:>12.2f} us  (min {result["min_us"]:.2f}, '
+                          f'±{result["stdev_us"]:.2f})', flush=True)
+
+    report = {
+        'meta': {
+            'created_at': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'sqlalchemy': sqlalchemy.__version__,
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'args': {k: v for k, v in vars(args).items() if k != 'output'},
+        },
+        'results': results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f'\nResultados en {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark de serialización: Invitation.to_dict / Guest.to_dict + proveedor JSON
+
+Para 1, 100 y 10k filas cargadas desde SQLite en memoria mide:
+  - to_dict escrito a mano (la versión previa, como referencia)
+  - to_dict compilado (app/models/serialization.py)
+  - dumps con el proveedor stdlib de Flask vs OrjsonProvider
+
+Uso:
+    python benchmarks/serialization.py [--sizes 1 100 10000]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def manual_invitation_to_dict(self):
+    """Invitation.to_dict tal como estaba escrito a mano (referencia)"""
+    return {
+        'id': self.id,
+        'user_id': self.user_id,
+        'birthday_name': self.birthday_name,
+        'birthday_date': self.birthday_date.isoformat() if self.birthday_date else None,
+        'birthday_age': self.birthday_age,
+        'event_title': self.event_title,
+        'event_date': self.event_date.isoformat() if self.event_date else None,
+        'event_time': self.event_time,
+        'event_location': self.event_location,
+        'event_address': self.event_address,
+        'organizer_name': self.organizer_name,
+        'organizer_phone': self.organizer_phone,
+        'organizer_email': self.organizer_email,
+        'dress_code': self.dress_code,
+        'rsvp_deadline': self.rsvp_deadline.isoformat() if self.rsvp_deadline else None,
+        'special_notes': self.special_notes,
+        'template_key': self.template_key,
+        'hero_image_url': self.hero_image_url,
+        'image_1_url': self.image_1_url,
+        'image_2_url': self.image_2_url,
+        'video_url': self.video_url,
+        'unique_code': self.unique_code,
+        'share_url': self.share_url,
+        'is_active': self.is_active,
+        'is_published': self.is_published,
+        'rsvp_stats': self.rsvp_stats(),
+        'created_at': self.created_at.isoformat() if self.created_at else None,
+    }
+
+
+def manual_guest_to_dict(self):
+    """Guest.to_dict tal como estaba escrito a mano (referencia)"""
+    return {
+        'id': self.id,
+        'invitation_id': self.invitation_id,
+        'name': self.name,
+        'email': self.email,
+        'phone': self.phone,
+        'rsvp_status': self.rsvp_status,
+        'rsvp_date': self.rsvp_date.isoformat() if self.rsvp_date else None,
+        'number_of_guests': self.number_of_guests,
+        'dietary_restrictions': self.dietary_restrictions,
+        'notes': self.notes,
+        'created_at': self.created_at.isoformat() if self.created_at else None,
+    }
+
+
+def best_of(fn, repeat):
+    """Mediana de `repeat` corridas, en milisegundos"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def seed(db, size):
+    from app.models import Guest, Invitation, User
+
+    now = datetime.utcnow()
+    db.session.execute(db.insert(User), [{'id': 1, 'email': 'bench@local', 'password_hash': 'x',
+                                          'company_name': 'Bench', 'created_at': now}])
+    db.session.execute(db.insert(Invitation), [{
+        'user_id': 1, 'birthday_name': f'Cumpleañero {i}', 'birthday_date': now, 'birthday_age': 7,
+        'event_title': 'Fiesta', 'event_date': now, 'event_time': '15:00',
+        'event_location': 'Salón La Alegría', 'organizer_name': 'María', 'rsvp_deadline': now,
+        'unique_code': f'code{i:08d}', 'share_url': f'https://x/{i}', 'created_at': now,
+        'rsvp_accepted': 3, 'rsvp_declined': 1,
+    } for i in range(size)])
+    db.session.execute(db.insert(Guest), [{
+        'invitation_id': 1, 'name': f'Invitado {i}', 'email': f'{i}@bench.local',
+        'rsvp_status': 'accepted', 'rsvp_date': now, 'number_of_guests': 2, 'created_at': now,
+    } for i in range(size)])
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de to_dict + proveedor JSON')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 100, 10000])
+    args = parser.parse_args()
+
+    from flask.json.provider import DefaultJSONProvider
+    from app import create_app, db
+    from app.json_provider import OrjsonProvider, orjson
+    from app.models import Guest, Invitation
+
+    print(f'{"modelo":<11}{"filas":>7}  {"to_dict mano":>13}{"compilado":>11}'
+          f'{"json stdlib":>13}{"orjson":>10}   (ms, mediana)')
+    for size in args.sizes:
+        app = create_app('testing')
+        with app.app_context():
+            seed(db, size)
+            stdlib = DefaultJSONProvider(app)
+            fast = OrjsonProvider(app) if orjson is not None else None
+            repeat = max(5, 20000 // size)
+
+            for model, manual in ((Invitation, manual_invitation_to_dict), (Guest, manual_guest_to_dict)):
+                rows = model.query.all()
+                payload = [row.to_dict() for row in rows]
+                assert payload == [manual(row) for row in rows]
+
+                t_manual = best_of(lambda: [manual(row) for row in rows], repeat)
+                t_compiled = best_of(lambda: [row.to_dict() for row in rows], repeat)
+                t_stdlib = best_of(lambda: stdlib.dumps(payload), repeat)
+                t_orjson = best_of(lambda: fast.dumps(payload), repeat) if fast else float('nan')
+                print(f'{model.__name__:<11}{size:>7}  {t_manual:>13.3f}{t_compiled:>11.3f}'
+                      f'{t_stdlib:>13.3f}{t_orjson:>10.3f}')
+            db.session.remove()
+
+
+if __name__ == '__main__':
+    main()
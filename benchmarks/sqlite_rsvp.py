@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Throughput de RSVPs concurrentes sobre SQLite en archivo, con y sin el perfil
+
+Crea una base SQLite temporal con las migraciones y N invitaciones publicadas y
+levanta `--workers` procesos (como los workers de gunicorn), cada uno con su
+create_app('production') y un test client, que durante `--duration` segundos
+mandan POST /api/public/invitations/<code>/rsvp a invitaciones al azar (la
+mitad invitados nuevos, la mitad cambios de respuesta). En paralelo,
+`--readers` procesos leen GET /api/public/invitations/<code>/guests (sin
+cache). Lo corre en cada modo:
+
+  - sin perfil: defaults de pysqlite (journal rollback, BEGIN implícito)
+  - immediate: app.sqlite_profile (WAL, busy_timeout, synchronous=NORMAL,
+    mmap) con BEGIN IMMEDIATE; los escritores esperan en el busy handler
+  - flock: lo mismo, pero los escritores hacen cola en un flock (default)
+
+y reporta RSVPs/s confirmados, errores (500 "database is locked") y p50/p99
+de las escrituras, más las lecturas/s.
+
+Uso:
+    python benchmarks/sqlite_rsvp.py
+    python benchmarks/sqlite_rsvp.py --workers 8 --duration 20
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import secrets
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+MODES = {
+    'sin perfil': {'SQLITE_PROFILE_ENABLED': 'false'},
+    'immediate': {'SQLITE_PROFILE_ENABLED': 'true', 'SQLITE_WRITE_LOCK': 'immediate'},
+    'flock': {'SQLITE_PROFILE_ENABLED': 'true', 'SQLITE_WRITE_LOCK': 'flock'},
+}
+
+
+def base_env(tmpdir, database_path):
+    return {
+        'DATABASE_URL': f'sqlite:///{database_path}',
+        'PUBLIC_RATE_LIMIT_ENABLED': 'false',
+        'NEGATIVE_CACHE_ENABLED': 'false',
+        'RSVP_WRITE_BEHIND': 'false',
+        'RATE_LIMIT_STATE_PATH': os.path.join(tmpdir, 'ratelimit'),
+        'METRICS_STATE_PATH': os.path.join(tmpdir, 'metrics'),
+        'PUBLIC_CACHE_MAX_ENTRIES': '0',
+    }
+
+
+def setup(env, invitations):
+    """Migra la base y crea `invitations` invitaciones publicadas. Devuelve sus códigos."""
+    os.environ.update(env)
+    from flask_migrate import upgrade
+    from app import create_app, db, init_migrate
+    from app.models import Invitation, User
+
+    app = create_app('production')
+    init_migrate(app)
+    with app.app_context():
+        upgrade()
+        user = User(email='bench@bench.local', company_name='Bench')
+        user.set_password(secrets.token_hex(8))
+        db.session.add(user)
+        db.session.flush()
+        now = datetime.utcnow()
+        codes = [secrets.token_urlsafe(12) for _ in range(invitations)]
+        db.session.execute(db.insert(Invitation), [{
+            'user_id': user.id, 'birthday_name': 'Bench', 'birthday_date': now, 'event_title': 'Fiesta',
+            'event_date': now + timedelta(days=30), 'unique_code': code, 'is_published': True,
+            'created_at': now, 'updated_at': now,
+        } for code in codes])
+        db.session.commit()
+    return codes
+
+
+def worker(env, codes, duration, start_event, results, worker_id, reader=False):
+    os.environ.update(env)
+    from app import create_app
+
+    app = create_app('production')
+    client = app.test_client()
+    rng = random.Random(worker_id)
+    statuses, latencies = Counter(), []
+    seq = 0
+
+    start_event.wait()
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        seq += 1
+        if reader:
+            response = client.get(f'/api/public/invitations/{rng.choice(codes)}/guests')
+            statuses[response.status_code] += 1
+            continue
+        # Mitad invitados nuevos, mitad cambios sobre un pool chico de emails ya usados
+        email = f'w{worker_id}-{seq}@bench.local' if seq % 2 else f'{rng.randrange(10)}@bench.local'
+        body = {'guest_name': 'Bench', 'guest_email': email,
+                'rsvp_status': rng.choice(['accepted', 'declined', 'tentative']),
+                'number_of_guests': rng.randint(1, 4)}
+        started = time.perf_counter()
+        response = client.post(f'/api/public/invitations/{rng.choice(codes)}/rsvp', json=body)
+        latencies.append(time.perf_counter() - started)
+        statuses[response.status_code] += 1
+    results.put((reader, dict(statuses), latencies))
+
+
+def run_mode(name, env, args, tmpdir):
+    database_path = os.path.join(tmpdir, f'{name.replace(" ", "-")}.db')
+    env = {**base_env(tmpdir, database_path), **env}
+    ctx = multiprocessing.get_context('spawn')
+
+    setup_process = ctx.Process(target=_setup_in_child, args=(env, args.invitations, tmpdir))
+    setup_process.start()
+    setup_process.join()
+    with open(os.path.join(tmpdir, 'codes.txt')) as f:
+        codes = f.read().split()
+
+    start_event, results = ctx.Event(), ctx.Queue()
+    processes = [ctx.Process(target=worker, args=(env, codes, args.duration, start_event, results, i, i >= args.workers))
+                 for i in range(args.workers + args.readers)]
+    for p in processes:
+        p.start()
+    time.sleep(args.warmup)  # que todos terminen create_app antes de largar
+    start_event.set()
+    collected = [results.get() for _ in processes]
+    for p in processes:
+        p.join()
+
+    statuses, reads, latencies = Counter(), Counter(), []
+    for reader, worker_statuses, worker_latencies in collected:
+        if reader:
+            reads.update(worker_statuses)
+            continue
+        statuses.update(worker_statuses)
+        latencies.extend(worker_latencies)
+    latencies.sort()
+    ok = statuses[200] + statuses[201]
+    return {
+        'mode': name,
+        'rsvps_per_s': ok / args.duration,
+        'errors': sum(count for status, count in statuses.items() if status >= 500),
+        'reads_per_s': reads[200] / args.duration,
+        'read_errors': sum(count for status, count in reads.items() if status >= 500),
+        'p50': statistics.median(latencies) * 1000,
+        'p99': latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        'statuses': dict(statuses),
+    }
+
+
+def _setup_in_child(env, invitations, tmpdir):
+    codes = setup(env, invitations)
+    with open(os.path.join(tmpdir, 'codes.txt'), 'w') as f:
+        f.write('\n'.join(codes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='RSVPs concurrentes sobre SQLite en archivo')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=10, help='Segundos de carga por modo')
+    parser.add_argument('--readers', type=int, default=2, help='Procesos que solo leen')
+    parser.add_argument('--invitations', type=int, default=20)
+    parser.add_argument('--warmup', type=float, default=3, help='Espera para que arranquen los workers (s)')
+    parser.add_argument('--modes', nargs='+', choices=list(MODES), default=list(MODES))
+    args = parser.parse_args()
+
+    rows = []
+    for name in args.modes:
+        with tempfile.TemporaryDirectory(prefix='bench-sqlite-') as tmpdir:
+            rows.append(run_mode(name, MODES[name], args, tmpdir))
+
+    print(f'\n{args.workers} workers + {args.readers} lectores, {args.duration:.0f}s, {args.invitations} invitaciones')
+    print(f'{"modo":<12} {"RSVPs/s":>9} {"errores":>8} {"p50 ms":>9} {"p99 ms":>9} {"lect./s":>9} {"err. lect.":>10}')
+    for r in rows:
+        print(f'{r["mode"]:<12} {r["rsvps_per_s"]:>9.0f} {r["errors"]:>8} {r["p50"]:>9.1f} {r["p99"]:>9.1f} '
+              f'{r["reads_per_s"]:>9.0f} {r["read_errors"]:>10}')
+
+
+if __name__ == '__main__':
+    main()
@@ -5,25 +5,130 @@ Script para crear múltiples invitaciones desde un CSV
 
 Uso:
     python bulk_create_invitations.py --file invitados.csv --token TU_TOKEN --template-id 1
+    python bulk_create_invitations.py --file invitados.csv --token TU_TOKEN --template-id 1 --concurrency 8
+
+Las filas creadas se guardan en <archivo>.checkpoint: si se corta, volver a
+correr el mismo comando retoma desde donde quedó.
 """
 
 import csv
+import json
+import os
+import random
+import threading
+import time
 import requests
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+
+# Solo respuestas que garantizan que no se creó nada: rate limit (429) y load
+# shedding (503) se deciden antes de tocar la base. Un 500/502/504 puede llegar
+# después del commit y reintentar duplicaría la invitación.
+RETRY_STATUS_CODES = {429, 503}
+
+
+def _row_to_payload(row, template_id):
+    """Convierte una fila del CSV en el payload de POST /api/invitations"""
+    return {
+        "birthday_name": row.get('birthday_name', '').strip(),
+        "birthday_date": row.get('birthday_date', '').strip(),
+        "birthday_age": int(row.get('birthday_age', 0)) if row.get('birthday_age') else None,
+        "event_title": row.get('event_title', '').strip(),
+        "event_date": row.get('event_date', '').strip(),
+        "event_time": row.get('event_time', '').strip(),
+        "event_location": row.get('event_location', '').strip(),
+        "organizer_name": row.get('organizer_name', '').strip(),
+        "organizer_phone": row.get('organizer_phone', '').strip(),
+        "organizer_email": row.get('organizer_email', '').strip(),
+        "template_id": template_id
+    }
+
+
+def _load_checkpoint(checkpoint_path):
+    """Filas ya creadas en corridas anteriores (una línea JSON por fila)"""
+    done = set()
+    if not os.path.exists(checkpoint_path):
+        return done
+    with open(checkpoint_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                done.add(json.loads(line)['row'])
+            except (ValueError, KeyError):
+                continue  # línea cortada por un corte a mitad de escritura
+    return done
+
 
-def create_invitations_from_csv(file_path, token, template_id, base_url="http://localhost:5000/api"):
+def _retry_delay(response, attempt, backoff):
+    """Respeta Retry-After si viene; si no, backoff exponencial con jitter"""
+    if response is not None:
+        retry_after = response.headers.get('Retry-After')
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+    return backoff * (2 ** attempt) * (0.5 + random.random())
+
+
+def _not_sent(error):
+    """True si el error fue al conectar: el request no llegó al servidor."""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    return isinstance(reason, (NewConnectionError, ConnectTimeoutError))
+
+
+def _post_with_retry(session, url, data, headers, max_retries, backoff):
+    """POST con reintentos solo cuando el servidor seguro no creó nada.
+
+    POST /api/invitations no es idempotente: se reintenta ante 429/503 y ante
+    errores al conectar. Un corte a mitad de request, un timeout de lectura o
+    un 500/502/504 no se reintentan (la invitación pudo quedar creada) y la
+    fila se reporta como fallida para revisarla.
+    Devuelve (response, segundos).
+    """
+    start = time.perf_counter()
+    for attempt in range(max_retries + 1):
+        response = None
+        try:
+            response = session.post(url, json=data, headers=headers, timeout=30)
+            if response.status_code not in RETRY_STATUS_CODES:
+                return response, time.perf_counter() - start
+        except requests.ConnectionError as e:
+            if attempt == max_retries or not _not_sent(e):
+                raise
+        if attempt < max_retries:
+            time.sleep(_retry_delay(response, attempt, backoff))
+    return response, time.perf_counter() - start
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def create_invitations_from_csv(file_path, token, template_id, base_url="http://localhost:5000/api",
+                                concurrency=1, checkpoint_path=None, max_retries=5, backoff=0.5):
     """
     Lee un CSV y crea invitaciones en batch
     
     Formato esperado del CSV:
     birthday_name,birthday_date,birthday_age,event_title,event_date,event_time,event_location,organizer_name,organizer_phone,organizer_email
     Sofia,2019-02-14,5,Fiesta de Sofia,2024-02-14,15:00,Salón La Alegría,María García,+34 612345678,maria@example.com
+
+    Con concurrency > 1 los requests salen en paralelo desde un pool de threads
+    que comparte una sesión HTTP (keep-alive). Cada fila creada se anota en el
+    checkpoint, así que volver a correr el comando saltea las ya creadas.
     """
     
     headers = {"Authorization": f"Bearer {token}"}
+    checkpoint_path = checkpoint_path or f"{file_path}.checkpoint"
     created_count = 0
     failed_count = 0
+    latencies = []
+    lock = threading.Lock()
     
     print(f"📂 Leyendo archivo: {file_path}")
     
@@ -37,60 +142,89 @@ def create_invitations_from_csv(file_path, token, template_id, base_url="http://
             
             print(f"📊 Columnas detectadas: {', '.join(reader.fieldnames)}")
             print(f"✅ Usando template ID: {template_id}\n")
-            
+
+            done = _load_checkpoint(checkpoint_path)
+            if done:
+                print(f"⏭️  {len(done)} filas ya creadas según {checkpoint_path}, se saltean\n")
+
+            pending = []
             for row_num, row in enumerate(reader, start=2):
+                if row_num in done:
+                    continue
                 try:
                     # Preparar datos
-                    data = {
-                        "birthday_name": row.get('birthday_name', '').strip(),
-                        "birthday_date": row.get('birthday_date', '').strip(),
-                        "birthday_age": int(row.get('birthday_age', 0)) if row.get('birthday_age') else None,
-                        "event_title": row.get('event_title', '').strip(),
-                        "event_date": row.get('event_date', '').strip(),
-                        "event_time": row.get('event_time', '').strip(),
-                        "event_location": row.get('event_location', '').strip(),
-                        "organizer_name": row.get('organizer_name', '').strip(),
-                        "organizer_phone": row.get('organizer_phone', '').strip(),
-                        "organizer_email": row.get('organizer_email', '').strip(),
-                        "template_id": template_id
-                    }
-                    
-                    # Validar campos requeridos
-                    if not data['birthday_name']:
-                        print(f"⚠️  Fila {row_num}: falta birthday_name")
-                        failed_count += 1
-                        continue
-                    
-                    if not data['event_title']:
-                        print(f"⚠️  Fila {row_num}: falta event_title")
-                        failed_count += 1
-                        continue
-                    
+                    data = _row_to_payload(row, template_id)
+                except Exception as e:
+                    print(f"❌ Fila {row_num}: Error procesando - {str(e)}")
+                    failed_count += 1
+                    continue
+
+                # Validar campos requeridos
+                if not data['birthday_name']:
+                    print(f"⚠️  Fila {row_num}: falta birthday_name")
+                    failed_count += 1
+                    continue
+
+                if not data['event_title']:
+                    print(f"⚠️  Fila {row_num}: falta event_title")
+                    failed_count += 1
+                    continue
+
+                pending.append((row_num, data))
+
+        session = requests.Session()
+        session.mount(base_url, HTTPAdapter(pool_connections=1, pool_maxsize=max(concurrency, 1)))
+
+        with open(checkpoint_path, 'a', encoding='utf-8') as checkpoint:
+
+            def create_one(item):
+                nonlocal created_count, failed_count
+                row_num, data = item
+                try:
                     # Realizar request
-                    response = requests.post(
-                        f"{base_url}/invitations",
-                        json=data,
-                        headers=headers
+                    response, elapsed = _post_with_retry(
+                        session, f"{base_url}/invitations", data, headers, max_retries, backoff
                     )
-                    
+                except Exception as e:
+                    with lock:
+                        print(f"❌ Fila {row_num}: Error procesando - {str(e)}")
+                        failed_count += 1
+                    return
+
+                with lock:
+                    latencies.append(elapsed)
                     if response.status_code == 201:
                         invitation = response.json()['invitation']
+                        checkpoint.write(json.dumps({
+                            'row': row_num, 'id': invitation['id'], 'unique_code': invitation['unique_code']
+                        }) + '\n')
+                        checkpoint.flush()
                         print(f"✅ Fila {row_num}: {data['birthday_name']} - "
                               f"ID: {invitation['id']}, Código: {invitation['unique_code'][:8]}...")
                         created_count += 1
                     else:
-                        error_msg = response.json().get('message', 'Error desconocido')
+                        try:
+                            error_msg = response.json().get('message', 'Error desconocido')
+                        except ValueError:
+                            error_msg = f'HTTP {response.status_code}'
                         print(f"❌ Fila {row_num}: {data['birthday_name']} - Error: {error_msg}")
                         failed_count += 1
-                
-                except Exception as e:
-                    print(f"❌ Fila {row_num}: Error procesando - {str(e)}")
-                    failed_count += 1
-                    continue
-        
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=max(concurrency, 1)) as executor:
+                list(executor.map(create_one, pending))
+            elapsed_total = time.perf_counter() - started
+
+        latencies.sort()
         print(f"\n{'='*50}")
         print(f"✅ Invitaciones creadas exitosamente: {created_count}")
         print(f"❌ Errores: {failed_count}")
+        if latencies:
+            print(f"⚡ Throughput: {len(latencies) / elapsed_total:.1f} filas/seg "
+                  f"({len(latencies)} requests en {elapsed_total:.2f}s, concurrencia {concurrency})")
+            print(f"⏱️  Latencia p50: {_percentile(latencies, 50) * 1000:.0f} ms | "
+                  f"p90: {_percentile(latencies, 90) * 1000:.0f} ms | "
+                  f"p99: {_percentile(latencies, 99) * 1000:.0f} ms")
         print(f"{'='*50}")
         
     except FileNotFoundError:
@@ -120,6 +254,9 @@ def main():
     parser.add_argument('--template-id', type=int, required=False, help='ID del template a usar')
     parser.add_argument('--sample', action='store_true', help='Generar archivo CSV de ejemplo')
     parser.add_argument('--url', default='http://localhost:5000/api', help='URL base de la API')
+    parser.add_argument('--concurrency', type=int, default=1, help='Requests en paralelo (default 1)')
+    parser.add_argument('--checkpoint', help='Archivo de checkpoint (default: <archivo>.checkpoint)')
+    parser.add_argument('--max-retries', type=int, default=5, help='Reintentos ante 429/503 o errores al conectar (default 5)')
     
     args = parser.parse_args()
     
@@ -142,7 +279,10 @@ def main():
         print("❌ Se requiere --template-id")
         return
     
-    create_invitations_from_csv(args.file, args.token, args.template_id, args.url)
+    create_invitations_from_csv(
+        args.file, args.token, args.template_id, args.url,
+        concurrency=args.concurrency, checkpoint_path=args.checkpoint, max_retries=args.max_retries
+    )
 
 if __name__ == "__main__":
     main()
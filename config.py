@@ -9,10 +9,124 @@ class Config:
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-key-change-in-production'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(days=30)
 
+    # El esquema se crea/actualiza con `flask db upgrade` (migrations/)
+    AUTO_CREATE_TABLES = False
+
+    # Crear el admin (ADMIN_USERNAME/ADMIN_PASSWORD) en cada create_app. En
+    # producción no: lo hace `flask init-db` una vez por deploy.
+    BOOTSTRAP_ADMIN_ON_BOOT = os.environ.get('BOOTSTRAP_ADMIN_ON_BOOT', 'false').lower() in ['1', 'true', 'yes']
+
+    # Serialización JSON: 'orjson' (si está instalado) o 'default' (stdlib de Flask)
+    JSON_PROVIDER = os.environ.get('JSON_PROVIDER', 'orjson')
+
+    # Cache (por worker) del payload público de cada invitación; 0 la desactiva
+    PUBLIC_CACHE_MAX_ENTRIES = int(os.environ.get('PUBLIC_CACHE_MAX_ENTRIES', 1024))
+    PUBLIC_CACHE_TTL = float(os.environ.get('PUBLIC_CACHE_TTL', 15))
+
+    # Tope de per_page en los listados paginados
+    MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE', 100))
+
+    # POST /api/invitations/bulk: filas máximas por request y tamaño de cada executemany
+    BULK_MAX_ROWS = int(os.environ.get('BULK_MAX_ROWS', 5000))
+    BULK_CHUNK_SIZE = int(os.environ.get('BULK_CHUNK_SIZE', 500))
+
+    # Filas por lote al exportar invitados en streaming
+    EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 500))
+
+    # Cache por worker de la identidad del usuario autenticado (ver app.identity)
+    USER_CACHE_MAX_ENTRIES = int(os.environ.get('USER_CACHE_MAX_ENTRIES', 4096))
+    USER_CACHE_TTL = float(os.environ.get('USER_CACHE_TTL', 30))  # 0 = desactivada
+
+    # Rate limiting / load shedding de /api/public (estado compartido entre workers)
+    PUBLIC_RATE_LIMIT_ENABLED = os.environ.get('PUBLIC_RATE_LIMIT_ENABLED', 'true').lower() in ['1', 'true', 'yes']
+    PUBLIC_RATE_PER_IP = float(os.environ.get('PUBLIC_RATE_PER_IP', 5))        # tokens/s
+    PUBLIC_BURST_PER_IP = int(os.environ.get('PUBLIC_BURST_PER_IP', 20))
+    PUBLIC_RATE_PER_CODE = float(os.environ.get('PUBLIC_RATE_PER_CODE', 20))
+    PUBLIC_BURST_PER_CODE = int(os.environ.get('PUBLIC_BURST_PER_CODE', 100))
+    PUBLIC_MAX_INFLIGHT = int(os.environ.get('PUBLIC_MAX_INFLIGHT', 32))      # entre todos los workers
+    RATE_LIMIT_TRUSTED_PROXIES = int(os.environ.get('RATE_LIMIT_TRUSTED_PROXIES', 0))  # 1 detrás de nginx
+    RATE_LIMIT_STATE_PATH = os.environ.get('RATE_LIMIT_STATE_PATH')  # default: /dev/shm
+    RATE_LIMIT_SLOTS = int(os.environ.get('RATE_LIMIT_SLOTS', 16384))  # buckets (IPs + códigos) en memoria compartida
+
+    # Filtro negativo de códigos públicos (Bloom filter + set con TTL, compartido)
+    NEGATIVE_CACHE_ENABLED = os.environ.get('NEGATIVE_CACHE_ENABLED', 'true').lower() in ['1', 'true', 'yes']
+    NEGATIVE_CACHE_BLOOM_CAPACITY = int(os.environ.get('NEGATIVE_CACHE_BLOOM_CAPACITY', 1_000_000))
+    NEGATIVE_CACHE_BLOOM_ERROR_RATE = float(os.environ.get('NEGATIVE_CACHE_BLOOM_ERROR_RATE', 0.001))
+    NEGATIVE_CACHE_SLOTS = int(os.environ.get('NEGATIVE_CACHE_SLOTS', 16384))  # entradas del set negativo
+    NEGATIVE_CACHE_TTL = float(os.environ.get('NEGATIVE_CACHE_TTL', 60))
+    NEGATIVE_CACHE_REFRESH_INTERVAL = float(os.environ.get('NEGATIVE_CACHE_REFRESH_INTERVAL', 2))
+
+    # RSVPs write-behind: se encolan en un SQLite local y se aplican en lotes
+    RSVP_WRITE_BEHIND = os.environ.get('RSVP_WRITE_BEHIND', 'false').lower() in ['1', 'true', 'yes']
+    RSVP_QUEUE_PATH = os.environ.get('RSVP_QUEUE_PATH')  # default: instance/rsvp_queue.db
+    RSVP_FLUSH_INTERVAL = float(os.environ.get('RSVP_FLUSH_INTERVAL', 1.0))
+    RSVP_FLUSH_BATCH_SIZE = int(os.environ.get('RSVP_FLUSH_BATCH_SIZE', 200))
+    RSVP_CLAIM_TIMEOUT = float(os.environ.get('RSVP_CLAIM_TIMEOUT', 60))  # lease de un lote reclamado
+    RSVP_MAX_ATTEMPTS = int(os.environ.get('RSVP_MAX_ATTEMPTS', 5))  # después queda como dead
+    RSVP_APPLIED_RETENTION = float(os.environ.get('RSVP_APPLIED_RETENTION', 86400))  # segundos en rsvp_queue_applied
+
+    # Pool de conexiones (bases con servidor; ver app.db_pool). Por defecto se
+    # dimensiona con los workers/threads de gunicorn y DB_MAX_CONNECTIONS.
+    WEB_CONCURRENCY = int(os.environ.get('WEB_CONCURRENCY', 4))
+    WEB_THREADS = int(os.environ.get('WEB_THREADS', 1))
+    DB_MAX_CONNECTIONS = int(os.environ.get('DB_MAX_CONNECTIONS', 0))  # tope entre todos los workers; 0 = sin tope
+    DB_POOL_SIZE = int(os.environ['DB_POOL_SIZE']) if os.environ.get('DB_POOL_SIZE') else None
+    DB_MAX_OVERFLOW = int(os.environ['DB_MAX_OVERFLOW']) if os.environ.get('DB_MAX_OVERFLOW') else None
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 10))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() in ['1', 'true', 'yes']
+
+    # Réplica de lectura opcional (bind 'replica', ver app.db_routing): los GET
+    # marcados con @replica_reads leen de ahí si no está atrasada
+    REPLICA_DATABASE_URL = os.environ.get('REPLICA_DATABASE_URL')
+    SQLALCHEMY_BINDS = {'replica': REPLICA_DATABASE_URL} if REPLICA_DATABASE_URL else {}
+    REPLICA_MAX_LAG_SECONDS = float(os.environ.get('REPLICA_MAX_LAG_SECONDS', 5))
+    REPLICA_LAG_CHECK_INTERVAL = float(os.environ.get('REPLICA_LAG_CHECK_INTERVAL', 2))
+    REPLICA_READ_YOUR_WRITES_SECONDS = float(os.environ.get('REPLICA_READ_YOUR_WRITES_SECONDS', 5))  # 0 = desactivado
+    REPLICA_LAST_WRITE_SLOTS = int(os.environ.get('REPLICA_LAST_WRITE_SLOTS', 4096))  # usuarios con escritura reciente
+    REPLICA_LAST_WRITE_STATE_PATH = os.environ.get('REPLICA_LAST_WRITE_STATE_PATH')  # default: /dev/shm
+
+    # Snapshots estáticos de las invitaciones publicadas para servir con nginx
+    # try_files (ver app.snapshots); vacío = desactivado
+    STATIC_SNAPSHOTS_DIR = os.environ.get('STATIC_SNAPSHOTS_DIR', '')
+    STATIC_SNAPSHOTS_DELAY = float(os.environ.get('STATIC_SNAPSHOTS_DELAY', 1.0))  # ventana para juntar cambios
+    STATIC_SNAPSHOTS_ASSETS_URL = os.environ.get('STATIC_SNAPSHOTS_ASSETS_URL', '')  # CSS por template_key
+
+    # Micro-cache de nginx para los GET públicos (ver app.microcache y nginx.conf)
+    MICROCACHE_TTL = int(os.environ.get('MICROCACHE_TTL', 5))  # X-Accel-Expires; 0 = sin headers de cache
+    MICROCACHE_BROWSER_TTL = int(os.environ.get('MICROCACHE_BROWSER_TTL', 0))
+    MICROCACHE_PURGE_URL = os.environ.get('MICROCACHE_PURGE_URL')  # p.ej. http://nginx; sin esto no se refresca
+    MICROCACHE_PURGE_TOKEN = os.environ.get('MICROCACHE_PURGE_TOKEN')  # el mismo que en nginx.conf
+    MICROCACHE_PURGE_DELAY = float(os.environ.get('MICROCACHE_PURGE_DELAY', 0.5))
+    MICROCACHE_PURGE_TIMEOUT = float(os.environ.get('MICROCACHE_PURGE_TIMEOUT', 2.0))  # por refresco contra nginx
+
+    # Perfil de SQLite en archivo (ver app.sqlite_profile): WAL, busy_timeout,
+    # synchronous y mmap por conexión, y escritores serializados entre workers
+    SQLITE_PROFILE_ENABLED = os.environ.get('SQLITE_PROFILE_ENABLED', 'true').lower() in ['1', 'true', 'yes']
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')  # FULL: durable ante cortes de luz
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    SQLITE_WRITE_LOCK = os.environ.get('SQLITE_WRITE_LOCK', 'flock')  # flock | immediate | deferred
+
+    # Métricas Prometheus por endpoint en GET /metrics (ver app.metrics)
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'false').lower() in ['1', 'true', 'yes']
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')  # si se define, el scrape manda Authorization: Bearer <token>
+    METRICS_STATE_PATH = os.environ.get('METRICS_STATE_PATH')  # default: /dev/shm
+
+    # Modo ASGI (asgi:app): GET públicos con engine async, el resto vía WSGI
+    ASYNC_DATABASE_URL = os.environ.get('ASYNC_DATABASE_URL')  # default: DATABASE_URL con driver async
+    ASYNC_ENGINE_OPTIONS = {}
+    ASGI_WSGI_FALLBACK = os.environ.get('ASGI_WSGI_FALLBACK', 'true').lower() in ['1', 'true', 'yes']
+    ASGI_WSGI_THREADS = int(os.environ.get('ASGI_WSGI_THREADS', 10))
+
+    # Servir /api/admin/stats desde la tabla user_stats (rollup incremental)
+    USER_STATS_ROLLUP = os.environ.get('USER_STATS_ROLLUP', 'false').lower() in ['1', 'true', 'yes']
+
 class DevelopmentConfig(Config):
     """Configuración para desarrollo"""
     DEBUG = True
     TESTING = False
+    BOOTSTRAP_ADMIN_ON_BOOT = os.environ.get('BOOTSTRAP_ADMIN_ON_BOOT', 'true').lower() in ['1', 'true', 'yes']
 
 class ProductionConfig(Config):
     """Configuración para producción"""
@@ -23,6 +137,9 @@ class TestingConfig(Config):
     """Configuración para testing"""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    AUTO_CREATE_TABLES = True
+    PUBLIC_RATE_LIMIT_ENABLED = False
+    NEGATIVE_CACHE_ENABLED = False
 
 config = {
     'development': DevelopmentConfig,
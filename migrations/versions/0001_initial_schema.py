@@ -0,0 +1,119 @@
+"""initial schema (lo que creaba db.create_all() antes de las migraciones)
+
+Revision ID: 0001_initial_schema
+Revises:
+Create Date: 2026-10-18 10:00:00
+
+Bases existentes creadas con db.create_all(): marcarlas con
+`flask db stamp 0001_initial_schema` y después `flask db upgrade`.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001_initial_schema'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('email', sa.String(length=120), nullable=False),
+        sa.Column('password_hash', sa.String(length=255), nullable=False),
+        sa.Column('company_name', sa.String(length=255), nullable=False),
+        sa.Column('first_name', sa.String(length=120), nullable=True),
+        sa.Column('last_name', sa.String(length=120), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+
+    op.create_table(
+        'templates',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('title', sa.String(length=255), nullable=True),
+        sa.Column('subtitle', sa.String(length=255), nullable=True),
+        sa.Column('header_text', sa.Text(), nullable=True),
+        sa.Column('footer_text', sa.Text(), nullable=True),
+        sa.Column('primary_color', sa.String(length=7), nullable=True),
+        sa.Column('secondary_color', sa.String(length=7), nullable=True),
+        sa.Column('text_color', sa.String(length=7), nullable=True),
+        sa.Column('background_color', sa.String(length=7), nullable=True),
+        sa.Column('logo_url', sa.String(length=500), nullable=True),
+        sa.Column('background_image_url', sa.String(length=500), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('is_default', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+    op.create_table(
+        'invitations',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('birthday_name', sa.String(length=255), nullable=False),
+        sa.Column('birthday_date', sa.DateTime(), nullable=False),
+        sa.Column('birthday_age', sa.Integer(), nullable=True),
+        sa.Column('event_title', sa.String(length=255), nullable=False),
+        sa.Column('event_date', sa.DateTime(), nullable=False),
+        sa.Column('event_time', sa.String(length=10), nullable=True),
+        sa.Column('event_location', sa.Text(), nullable=True),
+        sa.Column('event_address', sa.String(length=500), nullable=True),
+        sa.Column('organizer_name', sa.String(length=255), nullable=True),
+        sa.Column('organizer_phone', sa.String(length=20), nullable=True),
+        sa.Column('organizer_email', sa.String(length=120), nullable=True),
+        sa.Column('dress_code', sa.String(length=255), nullable=True),
+        sa.Column('rsvp_deadline', sa.DateTime(), nullable=True),
+        sa.Column('special_notes', sa.Text(), nullable=True),
+        sa.Column('template_key', sa.String(length=64), nullable=True),
+        sa.Column('hero_image_url', sa.String(length=1000), nullable=True),
+        sa.Column('image_1_url', sa.String(length=1000), nullable=True),
+        sa.Column('image_2_url', sa.String(length=1000), nullable=True),
+        sa.Column('video_url', sa.String(length=1000), nullable=True),
+        sa.Column('unique_code', sa.String(length=32), nullable=True),
+        sa.Column('share_url', sa.String(length=500), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('is_published', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('unique_code'),
+    )
+
+    op.create_table(
+        'guests',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('invitation_id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.Column('email', sa.String(length=120), nullable=True),
+        sa.Column('phone', sa.String(length=20), nullable=True),
+        sa.Column('rsvp_status', sa.String(length=20), nullable=True),
+        sa.Column('rsvp_date', sa.DateTime(), nullable=True),
+        sa.Column('number_of_guests', sa.Integer(), nullable=True),
+        sa.Column('dietary_restrictions', sa.Text(), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['invitation_id'], ['invitations.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def downgrade():
+    op.drop_table('guests')
+    op.drop_table('invitations')
+    op.drop_table('templates')
+    op.drop_index('ix_users_email', table_name='users')
+    op.drop_table('users')
@@ -0,0 +1,48 @@
+"""contadores de RSVP denormalizados + invitations.template_id
+
+Revision ID: 0002_rsvp_counters
+Revises: 0001_initial_schema
+Create Date: 2026-10-18 10:05:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_rsvp_counters'
+down_revision = '0001_initial_schema'
+branch_labels = None
+depends_on = None
+
+COUNTERS = ('rsvp_accepted', 'rsvp_declined', 'rsvp_tentative', 'rsvp_pending', 'rsvp_headcount')
+
+
+def upgrade():
+    with op.batch_alter_table('invitations') as batch_op:
+        batch_op.add_column(sa.Column('template_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key(
+            'fk_invitations_template_id_templates', 'templates', ['template_id'], ['id'])
+        for column in COUNTERS:
+            batch_op.add_column(sa.Column(column, sa.Integer(), nullable=False, server_default='0'))
+
+    # Backfill desde guests (mismo cálculo que `flask recompute-rsvp-stats`)
+    for status in ('accepted', 'declined', 'tentative', 'pending'):
+        op.execute(
+            f"UPDATE invitations SET rsvp_{status} = ("
+            f"SELECT COUNT(*) FROM guests WHERE guests.invitation_id = invitations.id "
+            f"AND COALESCE(guests.rsvp_status, 'pending') = '{status}')"
+        )
+    op.execute(
+        "UPDATE invitations SET rsvp_headcount = ("
+        "SELECT COALESCE(SUM(COALESCE(guests.number_of_guests, 1)), 0) FROM guests "
+        "WHERE guests.invitation_id = invitations.id AND guests.rsvp_status = 'accepted')"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('invitations') as batch_op:
+        for column in reversed(COUNTERS):
+            batch_op.drop_column(column)
+        batch_op.drop_constraint('fk_invitations_template_id_templates', type_='foreignkey')
+        batch_op.drop_column('template_id')
@@ -0,0 +1,31 @@
+"""índices para los lookups calientes (upsert de RSVP y listados por dueño)
+
+Revision ID: 0003_hot_lookup_indexes
+Revises: 0002_rsvp_counters
+Create Date: 2026-10-18 10:10:00
+
+ix_guests_invitation_email también cubre los filtros por guests.invitation_id
+solo (prefijo izquierdo), así que no hace falta un índice aparte.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_hot_lookup_indexes'
+down_revision = '0002_rsvp_counters'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_guests_invitation_email', 'guests', ['invitation_id', 'email'])
+    op.create_index('ix_guests_invitation_phone', 'guests', ['invitation_id', 'phone'])
+    op.create_index('ix_invitations_user_id', 'invitations', ['user_id'])
+    op.create_index('ix_templates_user_id', 'templates', ['user_id'])
+
+
+def downgrade():
+    op.drop_index('ix_templates_user_id', table_name='templates')
+    op.drop_index('ix_invitations_user_id', table_name='invitations')
+    op.drop_index('ix_guests_invitation_phone', table_name='guests')
+    op.drop_index('ix_guests_invitation_email', table_name='guests')
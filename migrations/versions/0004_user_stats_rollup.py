@@ -0,0 +1,36 @@
+"""rollup de estadísticas por usuario (user_stats)
+
+Revision ID: 0004_user_stats_rollup
+Revises: 0003_hot_lookup_indexes
+Create Date: 2026-10-18 10:20:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004_user_stats_rollup'
+down_revision = '0003_hot_lookup_indexes'
+branch_labels = None
+depends_on = None
+
+COUNTERS = (
+    'total_invitations', 'published_invitations', 'total_templates', 'total_guests',
+    'rsvp_accepted', 'rsvp_declined', 'rsvp_tentative', 'rsvp_pending',
+)
+
+
+def upgrade():
+    op.create_table(
+        'user_stats',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        *[sa.Column(column, sa.Integer(), nullable=False, server_default='0') for column in COUNTERS],
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id'),
+    )
+
+
+def downgrade():
+    op.drop_table('user_stats')
@@ -0,0 +1,26 @@
+"""índice (user_id, created_at, id) para paginación keyset de invitaciones
+
+Revision ID: 0005_invitations_keyset_index
+Revises: 0004_user_stats_rollup
+Create Date: 2026-10-18 10:30:00
+
+Reemplaza a ix_invitations_user_id: el nuevo índice la cubre por prefijo.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0005_invitations_keyset_index'
+down_revision = '0004_user_stats_rollup'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_invitations_user_created', 'invitations', ['user_id', 'created_at', 'id'])
+    op.drop_index('ix_invitations_user_id', table_name='invitations')
+
+
+def downgrade():
+    op.create_index('ix_invitations_user_id', 'invitations', ['user_id'])
+    op.drop_index('ix_invitations_user_created', table_name='invitations')
@@ -0,0 +1,76 @@
+"""unicidad de (invitación, email) y (invitación, teléfono) en guests + columnas previous_*
+
+Revision ID: 0006_guests_unique_contact
+Revises: 0005_invitations_keyset_index
+Create Date: 2026-10-18 10:40:00
+
+Los índices únicos reemplazan a los de 0003 y son el target del
+INSERT ... ON CONFLICT DO UPDATE de Guest.upsert_rsvp. previous_rsvp_status y
+previous_number_of_guests guardan el valor anterior al upsert para que el
+RETURNING alcance para calcular los deltas de los contadores.
+
+Antes de crear los índices se normalizan los contactos vacíos a NULL y se
+eliminan los duplicados (se conserva la fila más reciente); después se
+recalculan los contadores de invitations y user_stats.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006_guests_unique_contact'
+down_revision = '0005_invitations_keyset_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for column in ('email', 'phone'):
+        op.execute(f"UPDATE guests SET {column} = NULL WHERE TRIM({column}) = ''")
+        op.execute(
+            f"DELETE FROM guests WHERE {column} IS NOT NULL AND id NOT IN ("
+            f"SELECT MAX(id) FROM guests WHERE {column} IS NOT NULL "
+            f"GROUP BY invitation_id, {column})"
+        )
+
+    with op.batch_alter_table('guests') as batch_op:
+        batch_op.add_column(sa.Column('previous_rsvp_status', sa.String(length=20), nullable=True))
+        batch_op.add_column(sa.Column('previous_number_of_guests', sa.Integer(), nullable=True))
+        batch_op.drop_index('ix_guests_invitation_email')
+        batch_op.drop_index('ix_guests_invitation_phone')
+        batch_op.create_index('uq_guests_invitation_email', ['invitation_id', 'email'], unique=True)
+        batch_op.create_index('uq_guests_invitation_phone', ['invitation_id', 'phone'], unique=True)
+
+    # Mismo cálculo que `flask recompute-rsvp-stats` / `flask rebuild-user-stats`
+    for status in ('accepted', 'declined', 'tentative', 'pending'):
+        op.execute(
+            f"UPDATE invitations SET rsvp_{status} = ("
+            f"SELECT COUNT(*) FROM guests WHERE guests.invitation_id = invitations.id "
+            f"AND COALESCE(guests.rsvp_status, 'pending') = '{status}')"
+        )
+    op.execute(
+        "UPDATE invitations SET rsvp_headcount = ("
+        "SELECT COALESCE(SUM(COALESCE(guests.number_of_guests, 1)), 0) FROM guests "
+        "WHERE guests.invitation_id = invitations.id AND guests.rsvp_status = 'accepted')"
+    )
+    op.execute(
+        "UPDATE user_stats SET total_guests = ("
+        "SELECT COUNT(*) FROM guests JOIN invitations ON invitations.id = guests.invitation_id "
+        "WHERE invitations.user_id = user_stats.user_id)"
+    )
+    for status in ('accepted', 'declined', 'tentative', 'pending'):
+        op.execute(
+            f"UPDATE user_stats SET rsvp_{status} = ("
+            f"SELECT COALESCE(SUM(invitations.rsvp_{status}), 0) FROM invitations "
+            f"WHERE invitations.user_id = user_stats.user_id)"
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('guests') as batch_op:
+        batch_op.drop_index('uq_guests_invitation_phone')
+        batch_op.drop_index('uq_guests_invitation_email')
+        batch_op.create_index('ix_guests_invitation_phone', ['invitation_id', 'phone'])
+        batch_op.create_index('ix_guests_invitation_email', ['invitation_id', 'email'])
+        batch_op.drop_column('previous_number_of_guests')
+        batch_op.drop_column('previous_rsvp_status')
@@ -0,0 +1,30 @@
+"""elimina guests.previous_rsvp_status / previous_number_of_guests
+
+Revision ID: 0007_drop_guests_previous_rsvp
+Revises: 0006_guests_unique_contact
+Create Date: 2026-10-18 16:00:00
+
+Guest.upsert_rsvp lee los valores previos con un SELECT ... FOR UPDATE en la
+misma transacción que el upsert: las columnas ya no se usan.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007_drop_guests_previous_rsvp'
+down_revision = '0006_guests_unique_contact'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('guests') as batch_op:
+        batch_op.drop_column('previous_number_of_guests')
+        batch_op.drop_column('previous_rsvp_status')
+
+
+def downgrade():
+    with op.batch_alter_table('guests') as batch_op:
+        batch_op.add_column(sa.Column('previous_rsvp_status', sa.String(length=20), nullable=True))
+        batch_op.add_column(sa.Column('previous_number_of_guests', sa.Integer(), nullable=True))
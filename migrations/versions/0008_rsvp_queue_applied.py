@@ -0,0 +1,33 @@
+"""tabla rsvp_queue_applied: entradas de la cola write-behind ya aplicadas
+
+Revision ID: 0008_rsvp_queue_applied
+Revises: 0007_drop_guests_previous_rsvp
+Create Date: 2026-10-18 16:30:00
+
+El flusher de app.rsvp_queue anota la clave de cada entrada en la misma
+transacción que el RSVP y saltea las que ya están al reintentar un lote.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008_rsvp_queue_applied'
+down_revision = '0007_drop_guests_previous_rsvp'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'rsvp_queue_applied',
+        sa.Column('entry_key', sa.String(length=32), nullable=False),
+        sa.Column('applied_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('entry_key'),
+    )
+    op.create_index('ix_rsvp_queue_applied_applied_at', 'rsvp_queue_applied', ['applied_at'])
+
+
+def downgrade():
+    op.drop_index('ix_rsvp_queue_applied_applied_at', table_name='rsvp_queue_applied')
+    op.drop_table('rsvp_queue_applied')
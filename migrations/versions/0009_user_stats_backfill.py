@@ -0,0 +1,48 @@
+"""crea la fila de user_stats de cada usuario que todavía no la tiene
+
+Revision ID: 0009_user_stats_backfill
+Revises: 0008_rsvp_queue_applied
+Create Date: 2026-10-18 17:00:00
+
+El rollup ya no se siembra en el GET de /api/admin/stats: los usuarios nuevos
+traen su fila desde el alta y los existentes la reciben acá, con los valores
+recalculados (mismo cálculo que `flask rebuild-user-stats`).
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0009_user_stats_backfill'
+down_revision = '0008_rsvp_queue_applied'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        "INSERT INTO user_stats (user_id) "
+        "SELECT id FROM users WHERE id NOT IN (SELECT user_id FROM user_stats)"
+    )
+    op.execute(
+        "UPDATE user_stats SET "
+        "total_invitations = (SELECT COUNT(*) FROM invitations WHERE invitations.user_id = user_stats.user_id), "
+        "published_invitations = (SELECT COUNT(*) FROM invitations "
+        "WHERE invitations.user_id = user_stats.user_id AND invitations.is_published), "
+        "total_templates = (SELECT COUNT(*) FROM templates WHERE templates.user_id = user_stats.user_id)"
+    )
+    op.execute(
+        "UPDATE user_stats SET total_guests = ("
+        "SELECT COUNT(*) FROM guests JOIN invitations ON invitations.id = guests.invitation_id "
+        "WHERE invitations.user_id = user_stats.user_id)"
+    )
+    for status in ('accepted', 'declined', 'tentative', 'pending'):
+        op.execute(
+            f"UPDATE user_stats SET rsvp_{status} = ("
+            f"SELECT COALESCE(SUM(invitations.rsvp_{status}), 0) FROM invitations "
+            f"WHERE invitations.user_id = user_stats.user_id)"
+        )
+
+
+def downgrade():
+    # Las filas agregadas no se distinguen de las sembradas antes: quedan
+    pass
@@ -66,7 +66,13 @@ if [ ! -d "uploads" ]; then
 fi
 echo ""
 
-# Paso 6: Ejecutar la aplicación
+# Paso 6: Aplicar migraciones de base de datos
+echo -e "${BLUE}📌 Aplicando migraciones...${NC}"
+FLASK_APP=run.py flask db upgrade
+echo -e "${GREEN}✅ Base de datos al día${NC}"
+echo ""
+
+# Paso 7: Ejecutar la aplicación
 echo -e "${BLUE}📌 Paso 5: Iniciando aplicación...${NC}"
 echo -e "${GREEN}✅ La aplicación está iniciando...${NC}"
 echo ""
@@ -0,0 +1,169 @@
+"""Fixtures compartidas: app de testing con datos sembrados y contador de SQL."""
+import itertools
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event, insert
+
+from app import create_app, db
+from app.models import Guest, Invitation, Template, User
+from config import TestingConfig, config
+
+INVITATIONS_PER_OWNER = 30
+GUESTS_PER_INVITATION = 12
+RSVP_STATUSES = ('accepted', 'accepted', 'declined', 'tentative')
+
+
+class SQLCounter:
+    """Sentencias ejecutadas y filas ORM cargadas mientras está activo."""
+
+    def __init__(self):
+        self.statements = []
+        self.rows = 0
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(' '.join(statement.split()))
+
+    def on_load(self, target, context):
+        self.rows += 1
+
+    def assert_within(self, statements, rows):
+        """Falla si se pasó del presupuesto, listando las sentencias ejecutadas."""
+        problems = []
+        if len(self.statements) > statements:
+            problems.append(f'{len(self.statements)} sentencias SQL (máximo {statements})')
+        if self.rows > rows:
+            problems.append(f'{self.rows} filas cargadas (máximo {rows})')
+        if problems:
+            listing = '\n'.join(f'  {i}. {s[:300]}' for i, s in enumerate(self.statements, 1))
+            pytest.fail(f"{', '.join(problems)}:\n{listing}", pytrace=False)
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def make_file_app(tmp_path, monkeypatch):
+    """Fábrica de apps de testing sobre un SQLite en archivo (no :memory:).
+
+    `make_file_app(**settings)` crea una app con la config de testing más
+    `settings`; cada thread usa su propia conexión. Todas las apps del test
+    comparten la base (`tmp_path/app.db` salvo otra SQLALCHEMY_DATABASE_URI),
+    así que crear una segunda simula un reinicio. Se cierran al final.
+    """
+    apps = []
+
+    def make(**settings):
+        settings.setdefault('SQLALCHEMY_DATABASE_URI', f'sqlite:///{tmp_path / "app.db"}')
+        monkeypatch.setitem(config, 'file_sqlite', type('FileSQLiteConfig', (TestingConfig,), settings))
+        app = create_app('file_sqlite')
+        apps.append(app)
+        return app
+
+    yield make
+    for app in apps:
+        with app.app_context():
+            db.session.remove()
+            for engine in db.engines.values():
+                engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def count_sql(app):
+    """`with count_sql() as counter:` cuenta el SQL del bloque (p.ej. un request)."""
+
+    @contextmanager
+    def counting():
+        counter = SQLCounter()
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', counter.before_cursor_execute)
+        event.listen(db.Model, 'load', counter.on_load, propagate=True)
+        try:
+            yield counter
+        finally:
+            event.remove(engine, 'before_cursor_execute', counter.before_cursor_execute)
+            event.remove(db.Model, 'load', counter.on_load)
+
+    return counting
+
+
+@pytest.fixture
+def seeded(app):
+    """Dos clientes con invitaciones publicadas, RSVPs variados y un template.
+
+    Devuelve un dict con ids, códigos y el header de autorización del dueño.
+    """
+    with app.app_context():
+        owner = _user('owner@example.com')
+        other = _user('other@example.com')
+        template = Template(user_id=owner.id, name='Clásico')
+        db.session.add(template)
+        db.session.flush()
+
+        invitations = [_invitation(owner, i) for i in range(INVITATIONS_PER_OWNER)]
+        for i in range(5):
+            _invitation(other, i)
+        draft = Invitation(
+            user_id=owner.id, birthday_name='Borrador', birthday_date=datetime(2019, 1, 1),
+            event_title='Sin publicar', event_date=datetime(2030, 1, 1), is_published=False,
+        )
+        db.session.add(draft)
+        db.session.commit()
+
+        statuses = itertools.cycle(RSVP_STATUSES)
+        guests = []
+        for invitation in invitations:
+            for n in range(GUESTS_PER_INVITATION):
+                status, number_of_guests = next(statuses), 1 + n % 3
+                guests.append({
+                    'invitation_id': invitation.id, 'name': f'Invitado {n}', 'email': f'guest{n}@example.com',
+                    'rsvp_status': status, 'rsvp_date': datetime.utcnow(), 'number_of_guests': number_of_guests,
+                })
+                deltas = Invitation.rsvp_counter_deltas(None, None, status, number_of_guests)
+                for column, amount in deltas.items():
+                    setattr(invitation, column, (getattr(invitation, column) or 0) + amount)
+        db.session.execute(insert(Guest), guests)
+        db.session.commit()
+
+        return {
+            'owner_id': owner.id,
+            'template_id': template.id,
+            'invitation_id': invitations[0].id,
+            'code': invitations[0].unique_code,
+            'draft_id': draft.id,
+            'headers': {'Authorization': f'Bearer {create_access_token(identity=owner.id)}'},
+        }
+
+
+def _user(email):
+    user = User(email=email, company_name='Eventos SA')
+    user.set_password('secret123')
+    db.session.add(user)
+    db.session.flush()
+    return user
+
+
+def _invitation(user, i):
+    invitation = Invitation(
+        user_id=user.id, birthday_name=f'Cumpleañero {i}', birthday_date=datetime(2015, 1, 1),
+        event_title=f'Fiesta {i}', event_date=datetime(2030, 1, 1) + timedelta(days=i),
+        event_location='Salón', is_published=True,
+        created_at=datetime(2024, 1, 1) + timedelta(hours=i),
+    )
+    db.session.add(invitation)
+    db.session.flush()
+    return invitation
@@ -0,0 +1,78 @@
+"""POST /api/invitations/bulk: lote atómico, errores por fila, tope de filas y booleanos."""
+import json
+
+from app import db
+from app.models import Invitation
+
+ROW = {'birthday_name': 'Sofía', 'birthday_date': '2019-02-14',
+       'event_title': 'Fiesta de Sofía', 'event_date': '2030-02-14'}
+
+
+def _count(app, **filters):
+    with app.app_context():
+        return db.session.query(Invitation).filter_by(**filters).count()
+
+
+def _ndjson(rows):
+    return '\n'.join(json.dumps(row) for row in rows) + '\n'
+
+
+def test_bulk_creates_all_rows(app, client, seeded):
+    before = _count(app)
+    response = client.post('/api/invitations/bulk', headers=seeded['headers'],
+                           json=[ROW, dict(ROW, is_published=True), dict(ROW, is_published='false')])
+    assert response.status_code == 201
+    body = response.get_json()
+    assert body['total_created'] == 3 and body['errors'] == []
+    assert [item['row'] for item in body['created']] == [0, 1, 2]
+    assert _count(app) == before + 3
+    with app.app_context():
+        published = {row.unique_code: row.is_published for row in Invitation.query.filter(
+            Invitation.unique_code.in_([item['unique_code'] for item in body['created']]))}
+    assert [published[item['unique_code']] for item in body['created']] == [False, True, False]
+
+
+def test_partial_failure_reports_rows_and_keeps_valid_ones(app, client, seeded):
+    before = _count(app)
+    rows = [ROW, {'birthday_name': 'Sin fechas'}, dict(ROW, event_date='mañana'), dict(ROW, event_date=20300214)]
+
+    response = client.post('/api/invitations/bulk', headers=seeded['headers'], json=rows)
+    assert response.status_code == 400
+    assert [error['row'] for error in response.get_json()['errors']] == [1, 2, 3]
+    assert _count(app) == before  # atomic=true: no se creó ninguna
+
+    response = client.post('/api/invitations/bulk?atomic=false', headers=seeded['headers'], json=rows)
+    assert response.status_code == 201
+    body = response.get_json()
+    assert body['total_created'] == 1 and body['total_errors'] == 3
+    errors = {error['row']: error['message'] for error in body['errors']}
+    assert 'Campos requeridos' in errors[1]
+    assert 'Formato de fecha inválido' in errors[2]
+    assert 'ISO 8601' in errors[3]  # un número no es un error de formato de fecha
+    assert _count(app) == before + 1
+
+
+def test_too_many_rows_is_rejected_before_reading_the_rest(app, client, seeded):
+    app.config['BULK_MAX_ROWS'] = 3
+    before = _count(app)
+    response = client.post('/api/invitations/bulk', headers=seeded['headers'], json=[ROW] * 4)
+    assert response.status_code == 413
+
+    # NDJSON: la cuarta línea corta la lectura (la quinta ni siquiera es JSON)
+    response = client.post('/api/invitations/bulk', headers=seeded['headers'],
+                           data=_ndjson([ROW] * 4) + 'no es json\n', content_type='application/x-ndjson')
+    assert response.status_code == 413
+    assert _count(app) == before
+
+
+def test_is_published_must_be_a_strict_boolean(app, client, seeded):
+    before_published = _count(app, is_published=True)
+    rows = [dict(ROW, is_published=value) for value in ('false', 'no', '0', 0, 'quizás', 2)]
+    response = client.post('/api/invitations/bulk?atomic=false', headers=seeded['headers'],
+                           data=_ndjson(rows), content_type='application/x-ndjson')
+    assert response.status_code == 201
+    body = response.get_json()
+    assert body['total_created'] == 4
+    assert [error['row'] for error in body['errors']] == [4, 5]
+    assert all('is_published' in error['message'] for error in body['errors'])
+    assert _count(app, is_published=True) == before_published
@@ -0,0 +1,68 @@
+"""Filtro negativo de códigos: sin falsos negativos al crear, publicar o borrar."""
+from datetime import datetime
+
+import pytest
+
+from app import db
+from app.code_filter import invitation_codes
+from app.models import Invitation
+
+
+@pytest.fixture
+def codes(app, seeded, tmp_path):
+    app.config.update(
+        NEGATIVE_CACHE_ENABLED=True,
+        NEGATIVE_CACHE_STATE_PATH=str(tmp_path / 'codes'),
+        NEGATIVE_CACHE_REFRESH_INTERVAL=0,
+    )
+    invitation_codes.init_app(app)
+    with app.app_context():
+        invitation_codes._build()  # el thread de la primera request, acá sincrónico
+    yield invitation_codes
+    app.config['NEGATIVE_CACHE_ENABLED'] = False
+    invitation_codes.init_app(app)
+
+
+def test_unknown_codes_are_rejected_without_the_database(codes, client, count_sql, monkeypatch):
+    monkeypatch.setattr(codes, 'refresh_interval', 60)  # recién construido: no relee la base
+    with count_sql() as counter:
+        assert client.get('/api/public/invitations/no-existe').status_code == 404
+    assert counter.statements == []
+    assert codes.stats()['bloom_rejected'] == 1
+
+
+def test_code_created_outside_the_api_is_found_after_refresh(codes, app, client, seeded):
+    with app.app_context():
+        # Alta por otro host o un script: nadie llamó a add()
+        invitation = Invitation(user_id=seeded['owner_id'], birthday_name='Tomás', birthday_date=datetime(2018, 3, 1),
+                                event_title='Nueva', event_date=datetime(2030, 2, 1), is_published=True)
+        db.session.add(invitation)
+        db.session.commit()
+        code = invitation.unique_code
+
+    assert client.get(f'/api/public/invitations/{code}').status_code == 200
+    assert codes.stats()['bloom_rejected'] == 0
+
+
+def test_publish_forgets_the_negative_entry(codes, app, client, seeded):
+    headers, draft_id = seeded['headers'], seeded['draft_id']
+    with app.app_context():
+        code = db.session.get(Invitation, draft_id).unique_code
+
+    assert client.get(f'/api/public/invitations/{code}').status_code == 404
+    assert codes.stats()['negative_stored'] == 1
+    assert client.get(f'/api/public/invitations/{code}').status_code == 404
+    assert codes.stats()['negative_hits'] == 1
+
+    assert client.post(f'/api/invitations/{draft_id}/publish', headers=headers).status_code == 200
+    assert client.get(f'/api/public/invitations/{code}').status_code == 200
+
+
+def test_deleted_code_is_answered_from_the_negative_set(codes, client, seeded, count_sql):
+    code = seeded['code']
+    assert client.delete(f'/api/invitations/{seeded["invitation_id"]}', headers=seeded['headers']).status_code == 200
+
+    with count_sql() as counter:
+        assert client.get(f'/api/public/invitations/{code}').status_code == 404
+    assert counter.statements == []
+    assert codes.stats()['negative_hits'] == 1
@@ -0,0 +1,152 @@
+"""Lecturas a la réplica: dos archivos SQLite, el primario y una copia."""
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app import db
+from app.code_filter import invitation_codes
+from app.db_routing import LAST_WRITE_COOKIE, read_replica, replica_router
+from app.models import Invitation, User
+
+
+@pytest.fixture
+def routed(make_file_app, tmp_path, monkeypatch):
+    primary, replica = tmp_path / 'primary.db', tmp_path / 'replica.db'
+    # init_app registra un MetaData por bind; que no les quede a las apps de los demás tests
+    monkeypatch.setattr(db, 'metadatas', dict(db.metadatas))
+    app = make_file_app(
+        SQLALCHEMY_DATABASE_URI=f'sqlite:///{primary}',
+        SQLALCHEMY_BINDS={'replica': f'sqlite:///{replica}'},
+        REPLICA_MAX_LAG_SECONDS=5,
+        REPLICA_LAG_CHECK_INTERVAL=0,
+        PUBLIC_CACHE_MAX_ENTRIES=0,
+        REPLICA_LAST_WRITE_STATE_PATH=str(tmp_path / 'last-writes'),
+    )
+    with app.app_context():
+        user = User(email='owner@example.com', company_name='Eventos SA')
+        user.set_password('secret123')
+        db.session.add(user)
+        db.session.flush()
+        invitation = Invitation(user_id=user.id, birthday_name='Lucía', birthday_date=datetime(2016, 5, 1),
+                                event_title='Primario', event_date=datetime(2030, 1, 1), is_published=True)
+        db.session.add(invitation)
+        db.session.commit()
+        code, headers = invitation.unique_code, {'Authorization': f'Bearer {create_access_token(identity=user.id)}'}
+        db.engine.dispose()
+
+    # "Replicación": copia del primario, con un título distinto para saber de dónde se leyó
+    with sqlite3.connect(primary) as source, sqlite3.connect(replica) as target:
+        source.backup(target)
+        target.execute("UPDATE invitations SET event_title = 'Réplica'")
+    return app, code, headers, primary, replica
+
+
+def _title(client, code):
+    response = client.get(f'/api/public/invitations/{code}')
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return response.get_json()['invitation']['event_title']
+
+
+def test_marked_routes_read_from_replica_and_others_from_primary(routed):
+    app, code, headers, _, _ = routed
+    client = app.test_client()
+
+    assert _title(client, code) == 'Réplica'
+    listed = client.get('/api/invitations', headers=headers).get_json()
+    assert listed['invitations'][0]['event_title'] == 'Réplica'
+    # El detalle del dueño no está marcado: siempre primario
+    invitation_id = listed['invitations'][0]['id']
+    assert client.get(f'/api/invitations/{invitation_id}', headers=headers).get_json()['event_title'] == 'Primario'
+    with app.app_context():
+        assert db.session.scalar(db.select(Invitation.event_title)) == 'Primario'
+        with read_replica():
+            assert db.session.scalar(db.select(Invitation.event_title)) == 'Réplica'
+
+
+def test_writes_go_to_primary_and_client_reads_its_writes(routed):
+    app, code, _, _, replica = routed
+    writer, other = app.test_client(), app.test_client()
+
+    response = writer.post(f'/api/public/invitations/{code}/rsvp',
+                           json={'guest_name': 'Ana', 'guest_email': 'ana@example.com', 'rsvp_status': 'accepted'})
+    assert response.status_code == 201
+    assert LAST_WRITE_COOKIE in response.headers.get('Set-Cookie', '')
+    assert sqlite3.connect(replica).execute('SELECT count(*) FROM guests').fetchone() == (0,)
+
+    assert _title(writer, code) == 'Primario'   # read-your-writes por cookie
+    assert _title(other, code) == 'Réplica'
+    assert replica_router.stats()['fallbacks']['read_your_writes'] == 1
+
+
+def test_jwt_client_without_cookies_reads_its_writes(routed):
+    app, _, headers, _, _ = routed
+    client = app.test_client(use_cookies=False)
+    listed = client.get('/api/invitations', headers=headers).get_json()['invitations']
+    assert listed[0]['event_title'] == 'Réplica'
+
+    response = client.put(f'/api/invitations/{listed[0]["id"]}', headers=headers, json={'event_title': 'Editada'})
+    assert response.status_code == 200
+    # Sin cookie: la marca es por usuario del JWT
+    listed = client.get('/api/invitations', headers=headers).get_json()['invitations']
+    assert listed[0]['event_title'] == 'Editada'
+    assert replica_router.stats()['fallbacks']['read_your_writes'] == 1
+
+
+def test_falls_back_to_primary_when_replica_lags_or_fails(routed):
+    app, code, _, primary, replica = routed
+    client = app.test_client()
+    assert _title(client, code) == 'Réplica'
+
+    stale = time.time() - 60
+    for path in (replica, f'{replica}-wal'):
+        if os.path.exists(path):
+            os.utime(path, (stale, stale))
+    os.utime(primary)
+    assert _title(client, code) == 'Primario'
+    assert replica_router.stats()['lag_seconds'] > 5
+    assert replica_router.stats()['fallbacks']['lag'] == 1
+
+    os.remove(replica)
+    assert _title(client, code) == 'Primario'
+    assert replica_router.stats()['fallbacks']['error'] == 1
+
+
+def test_replica_miss_is_confirmed_on_primary_before_negative_cache(routed, tmp_path):
+    app, code, _, _, replica = routed
+    app.config.update(NEGATIVE_CACHE_ENABLED=True, NEGATIVE_CACHE_STATE_PATH=str(tmp_path / 'codes'))
+    invitation_codes.init_app(app)
+    # La réplica todavía no vio la publicación
+    with sqlite3.connect(replica) as conn:
+        conn.execute('UPDATE invitations SET is_published = 0')
+
+    client = app.test_client()
+    assert _title(client, code) == 'Primario'
+    with app.app_context():
+        assert invitation_codes.might_exist(code)
+    app.config['NEGATIVE_CACHE_ENABLED'] = False
+    invitation_codes.init_app(app)
+
+
+def test_code_filter_reads_new_codes_from_primary(routed, tmp_path):
+    app, _, _, _, _ = routed
+    app.config.update(NEGATIVE_CACHE_ENABLED=True, NEGATIVE_CACHE_STATE_PATH=str(tmp_path / 'codes'),
+                      NEGATIVE_CACHE_REFRESH_INTERVAL=0)
+    invitation_codes.init_app(app)
+    with app.app_context():
+        invitation_codes._build()
+        # Alta que la réplica todavía no tiene (y que no pasó por add())
+        invitation = Invitation(user_id=User.query.one().id, birthday_name='Tomás',
+                                birthday_date=datetime(2018, 3, 1), event_title='Nueva',
+                                event_date=datetime(2030, 2, 1), is_published=True)
+        db.session.add(invitation)
+        db.session.commit()
+        code = invitation.unique_code
+
+    # El refresco del Bloom sale del primario: el código no se da por inexistente
+    assert _title(app.test_client(), code) == 'Nueva'
+    app.config['NEGATIVE_CACHE_ENABLED'] = False
+    invitation_codes.init_app(app)
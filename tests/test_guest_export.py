@@ -0,0 +1,61 @@
+"""Export de invitados en streaming: contenido, headers y lotes."""
+import csv
+import io
+import json
+
+from flask_jwt_extended import create_access_token
+
+from app.models import User
+from app.routes.invitations import EXPORT_FIELDS
+from conftest import GUESTS_PER_INVITATION
+
+
+def _url(invitation_id):
+    return f'/api/invitations/{invitation_id}/guests/export'
+
+
+def test_csv_export(client, seeded):
+    response = client.get(_url(seeded['invitation_id']), headers=seeded['headers'])
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == 'text/csv'
+    assert response.headers['Content-Disposition'] == (
+        f'attachment; filename="invitation-{seeded["invitation_id"]}-guests.csv"')
+
+    rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+    assert rows[0] == list(EXPORT_FIELDS)
+    assert len(rows) == 1 + GUESTS_PER_INVITATION
+    records = [dict(zip(rows[0], row)) for row in rows[1:]]
+    assert {record['email'] for record in records} == {f'guest{n}@example.com' for n in range(GUESTS_PER_INVITATION)}
+
+
+def test_ndjson_export_is_written_batch_by_batch(app, client, seeded):
+    app.config['EXPORT_BATCH_SIZE'] = 5
+    response = client.get(_url(seeded['invitation_id']), query_string={'format': 'ndjson'},
+                          headers=seeded['headers'])
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    assert response.headers['Content-Disposition'].endswith('-guests.ndjson"')
+
+    chunks = [chunk for chunk in response.response if chunk]
+    assert len(chunks) == -(-GUESTS_PER_INVITATION // 5)  # un chunk por lote
+    records = [json.loads(line) for line in b''.join(
+        chunk if isinstance(chunk, bytes) else chunk.encode() for chunk in chunks).splitlines()]
+    assert len(records) == GUESTS_PER_INVITATION
+    assert set(records[0]) == set(EXPORT_FIELDS)
+    assert [record['id'] for record in records] == sorted(record['id'] for record in records)
+
+
+def test_empty_invitation_exports_only_the_header(client, seeded):
+    response = client.get(_url(seeded['draft_id']), headers=seeded['headers'])
+    assert response.status_code == 200
+    assert list(csv.reader(io.StringIO(response.get_data(as_text=True)))) == [list(EXPORT_FIELDS)]
+
+
+def test_export_rejects_other_owners_and_unknown_formats(app, client, seeded):
+    assert client.get(_url(seeded['invitation_id']), query_string={'format': 'xml'},
+                      headers=seeded['headers']).status_code == 400
+    with app.app_context():
+        other_id = User.query.filter_by(email='other@example.com').one().id
+        other = {'Authorization': f'Bearer {create_access_token(identity=other_id)}'}
+    assert client.get(_url(seeded['invitation_id']), headers=other).status_code == 404
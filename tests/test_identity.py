@@ -0,0 +1,51 @@
+"""Cache de identidad del usuario del JWT: se sirve sin SQL y se invalida al cambiar el usuario."""
+from app import db
+from app.cache import user_identity_cache
+from app.models import User
+
+
+def _me(client, seeded):
+    response = client.get('/api/auth/me', headers=seeded['headers'])
+    return response.status_code, response.get_json()
+
+
+def test_second_request_is_served_from_the_cache(client, seeded, count_sql):
+    assert _me(client, seeded)[0] == 200
+    with count_sql() as counter:
+        status, identity = _me(client, seeded)
+    assert status == 200 and identity['email'] == 'owner@example.com'
+    assert counter.statements == []
+
+
+def test_update_profile_invalidates_the_identity(client, seeded):
+    _me(client, seeded)
+    response = client.put('/api/auth/update-profile', headers=seeded['headers'], json={'first_name': 'Ana'})
+    assert response.status_code == 200
+    assert _me(client, seeded)[1]['first_name'] == 'Ana'
+
+
+def test_committed_changes_outside_the_routes_invalidate_the_identity(app, client, seeded):
+    _me(client, seeded)
+    with app.app_context():
+        db.session.get(User, seeded['owner_id']).company_name = 'Otra SA'
+        db.session.commit()
+    assert _me(client, seeded)[1]['company_name'] == 'Otra SA'
+
+
+def test_rolled_back_changes_keep_the_cached_identity(app, client, seeded):
+    _me(client, seeded)
+    with app.app_context():
+        user = db.session.get(User, seeded['owner_id'])
+        user.company_name = 'Nunca'
+        db.session.flush()
+        db.session.rollback()
+    assert user_identity_cache.contains(seeded['owner_id'])
+    assert _me(client, seeded)[1]['company_name'] == 'Eventos SA'
+
+
+def test_deleted_user_is_not_served_from_the_cache(app, client, seeded):
+    _me(client, seeded)
+    with app.app_context():
+        db.session.delete(db.session.get(User, seeded['owner_id']))
+        db.session.commit()
+    assert _me(client, seeded)[0] == 404
@@ -0,0 +1,36 @@
+"""`flask init-db`: migraciones + admin, una vez antes de los workers."""
+import pytest
+from sqlalchemy import inspect
+
+from app import db
+from app.models import User
+
+
+@pytest.fixture
+def app(make_file_app, monkeypatch):
+    monkeypatch.setenv('ADMIN_USERNAME', 'admin@example.com')
+    monkeypatch.setenv('ADMIN_PASSWORD', 'secret123')
+    return make_file_app(AUTO_CREATE_TABLES=False)
+
+
+def test_create_app_does_not_touch_the_database(app):
+    with app.app_context():
+        assert inspect(db.engine).get_table_names() == []
+    assert 'migrate' not in app.extensions
+
+
+def test_init_db_migrates_and_bootstraps_admin_once(app):
+    runner = app.test_cli_runner()
+
+    first = runner.invoke(args=['init-db'])
+    assert first.exit_code == 0, first.output
+    assert 'Usuario admin creado' in first.output
+
+    second = runner.invoke(args=['init-db'])
+    assert second.exit_code == 0, second.output
+    assert 'Usuario admin creado' not in second.output
+
+    with app.app_context():
+        assert 'alembic_version' in inspect(db.engine).get_table_names()
+        assert User.query.filter_by(email='admin@example.com').count() == 1
+        db.session.remove()
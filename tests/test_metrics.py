@@ -0,0 +1,28 @@
+"""/metrics: el token se compara sin romper con headers raros."""
+import pytest
+
+from app import create_app, db
+from config import TestingConfig
+
+
+@pytest.fixture
+def metrics_app(tmp_path, monkeypatch):
+    monkeypatch.setattr(TestingConfig, 'METRICS_ENABLED', True)
+    monkeypatch.setattr(TestingConfig, 'METRICS_TOKEN', 'secreto')
+    monkeypatch.setattr(TestingConfig, 'METRICS_STATE_PATH', str(tmp_path / 'metrics'))
+    app = create_app('testing')
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.mark.parametrize('authorization, status', [
+    ('Bearer secreto', 200),
+    ('Bearer otro', 403),
+    ('Bearer señor', 403),  # no ASCII
+    (None, 403),
+])
+def test_metrics_token(metrics_app, authorization, status):
+    headers = {'Authorization': authorization} if authorization else {}
+    assert metrics_app.test_client().get('/metrics', headers=headers).status_code == status
@@ -0,0 +1,92 @@
+"""Micro-cache de nginx: headers de los GET públicos y refresco al cambiar una invitación."""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app import db
+from app.cache import public_invitation_cache
+from app.microcache import microcache
+from app.models import Invitation
+
+
+def test_public_gets_carry_cache_headers(client, seeded):
+    code = seeded['code']
+    for path in (f'/api/public/invitations/{code}', f'/api/public/invitations/{code}/guests',
+                 f'/api/public/invitations/{code}/page', '/api/public/invitations/no-existe'):
+        response = client.get(path)
+        assert response.status_code in (200, 404)
+        assert response.headers['Cache-Control'] == 'public, max-age=0, s-maxage=5'
+        assert response.headers['X-Accel-Expires'] == '5'
+
+    response = client.post(f'/api/public/invitations/{code}/rsvp',
+                           json={'guest_name': 'Ana', 'guest_email': 'ana@example.com', 'rsvp_status': 'accepted'})
+    assert response.status_code == 201
+    assert 'X-Accel-Expires' not in response.headers
+
+
+def test_refresh_request_skips_worker_cache(app, client, seeded, monkeypatch):
+    monkeypatch.setattr(microcache, 'purge_token', 'secreto')
+    code = seeded['code']
+    assert client.get(f'/api/public/invitations/{code}').status_code == 200
+    with app.app_context():
+        # Cambio hecho por otro worker: la cache de este no se enteró
+        db.session.get(Invitation, seeded['invitation_id']).event_title = 'Cambiada'
+        db.session.commit()
+
+    assert client.get(f'/api/public/invitations/{code}').get_json()['invitation']['event_title'] == 'Fiesta 0'
+    # Sin el token el header no cuenta: cualquier cliente podría saltear la cache
+    for value in ('1', 'otro'):
+        response = client.get(f'/api/public/invitations/{code}', headers={'X-Cache-Refresh': value})
+        assert response.get_json()['invitation']['event_title'] == 'Fiesta 0'
+    response = client.get(f'/api/public/invitations/{code}', headers={'X-Cache-Refresh': 'secreto'})
+    assert response.get_json()['invitation']['event_title'] == 'Cambiada'
+    assert public_invitation_cache.get(code) == response.get_data(as_text=True)
+
+
+class _FakeNginx(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        self.requests.append((self.path, self.headers.get('X-Cache-Refresh')))
+        self.send_response(404 if self.path.endswith('/guests') else 200)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def nginx(app):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _FakeNginx)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    _FakeNginx.requests = []
+    app.config.update(
+        MICROCACHE_PURGE_URL=f'http://127.0.0.1:{server.server_port}/',
+        MICROCACHE_PURGE_TOKEN='secreto',
+        MICROCACHE_PURGE_DELAY=60,  # el refresco se corre con flush()
+    )
+    microcache.init_app(app)
+    microcache.reset_stats()
+    yield _FakeNginx.requests
+    server.shutdown()
+    server.server_close()
+    app.config.update(MICROCACHE_PURGE_URL=None, MICROCACHE_PURGE_TOKEN=None)
+    microcache.init_app(app)
+
+
+def test_changes_refresh_public_urls_in_nginx(nginx, client, seeded):
+    code, headers, invitation_id = seeded['code'], seeded['headers'], seeded['invitation_id']
+
+    assert client.put(f'/api/invitations/{invitation_id}', headers=headers, json={'event_title': 'Otra'}).status_code == 200
+    assert client.post(f'/api/public/invitations/{code}/rsvp',
+                       json={'guest_name': 'Ana', 'rsvp_status': 'declined'}).status_code == 201
+    assert microcache.flush() == 1  # edición + RSVP: un solo refresco
+
+    assert sorted(nginx) == sorted([
+        (f'/api/public/invitations/{code}', 'secreto'),
+        (f'/api/public/invitations/{code}/guests', 'secreto'),
+        (f'/api/public/invitations/{code}/page', 'secreto'),
+    ])
+    stats = microcache.stats()
+    assert stats['refreshed'] == 3 and stats['failed'] == 0  # el 404 también reemplaza la entrada
@@ -0,0 +1,44 @@
+"""Listado de invitaciones: include_total=false sin COUNT y cursor estable con timestamps iguales."""
+from datetime import datetime
+
+from app import db
+from app.models import Invitation
+
+
+def test_include_total_false_skips_the_count(client, seeded, count_sql):
+    for url in ('/api/invitations?include_total=false', '/api/invitations?pagination=cursor&include_total=false'):
+        with count_sql() as counter:
+            response = client.get(url, headers=seeded['headers'])
+        assert response.status_code == 200
+        assert response.get_json()['total'] is None
+        assert not any('count(' in statement.lower() for statement in counter.statements), url
+
+    body = client.get('/api/invitations', headers=seeded['headers']).get_json()
+    assert body['total'] == 31 and body['pages'] == 4
+
+
+def test_cursor_pages_through_equal_timestamps_without_gaps_or_repeats(app, client, seeded):
+    with app.app_context():
+        # Un alta masiva: varias invitaciones con el mismo created_at
+        same_time = datetime(2024, 1, 1, 5)
+        for i in range(7):
+            db.session.add(Invitation(user_id=seeded['owner_id'], birthday_name=f'Lote {i}',
+                                      birthday_date=datetime(2018, 1, 1), event_title='Lote',
+                                      event_date=datetime(2030, 6, 1), created_at=same_time))
+        db.session.commit()
+        expected = [row.id for row in Invitation.query.filter_by(user_id=seeded['owner_id'])
+                    .order_by(Invitation.created_at.desc(), Invitation.id.desc())]
+
+    seen, url = [], '/api/invitations?pagination=cursor&include_total=false&per_page=3'
+    while url:
+        body = client.get(url, headers=seeded['headers']).get_json()
+        seen += [invitation['id'] for invitation in body['invitations']]
+        cursor = body['next_cursor']
+        url = f'/api/invitations?cursor={cursor}&include_total=false&per_page=3' if cursor else None
+
+    assert seen == expected
+
+
+def test_invalid_cursor_is_rejected(client, seeded):
+    response = client.get('/api/invitations?cursor=no-es-un-cursor', headers=seeded['headers'])
+    assert response.status_code == 400
@@ -0,0 +1,53 @@
+"""Cache por worker del GET público: cada escritura del dueño o RSVP la invalida."""
+from app import db
+from app.cache import public_invitation_cache
+from app.models import Invitation
+
+
+def _public(client, code):
+    response = client.get(f'/api/public/invitations/{code}')
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_update_invalidates_the_cached_payload(client, seeded):
+    code = seeded['code']
+    _public(client, code)
+    assert public_invitation_cache.contains(code)
+
+    response = client.put(f'/api/invitations/{seeded["invitation_id"]}', headers=seeded['headers'],
+                          json={'event_title': 'Fiesta movida'})
+    assert response.status_code == 200
+    assert _public(client, code)['invitation']['event_title'] == 'Fiesta movida'
+
+
+def test_publish_invalidates_the_cached_payload(app, client, seeded):
+    code = seeded['code']
+    title = _public(client, code)['invitation']['event_title']
+    with app.app_context():
+        # Cambio por fuera de la API: la cache sigue sirviendo lo anterior
+        db.session.get(Invitation, seeded['invitation_id']).event_title = 'Otro título'
+        db.session.commit()
+    assert _public(client, code)['invitation']['event_title'] == title
+
+    response = client.post(f'/api/invitations/{seeded["invitation_id"]}/publish', headers=seeded['headers'])
+    assert response.status_code == 200
+    assert _public(client, code)['invitation']['event_title'] == 'Otro título'
+
+
+def test_rsvp_invalidates_the_cached_stats(client, seeded):
+    code = seeded['code']
+    accepted = _public(client, code)['rsvp_stats']['accepted']
+
+    response = client.post(f'/api/public/invitations/{code}/rsvp',
+                           json={'guest_name': 'Nuevo', 'guest_email': 'nuevo@example.com', 'rsvp_status': 'accepted'})
+    assert response.status_code == 201
+    assert _public(client, code)['rsvp_stats']['accepted'] == accepted + 1
+
+
+def test_delete_invalidates_the_cached_payload(client, seeded):
+    code = seeded['code']
+    _public(client, code)
+    assert client.delete(f'/api/invitations/{seeded["invitation_id"]}', headers=seeded['headers']).status_code == 200
+    assert client.get(f'/api/public/invitations/{code}').status_code == 404
+    assert not public_invitation_cache.contains(code)
@@ -0,0 +1,71 @@
+"""Presupuesto de SQL por endpoint: sentencias ejecutadas y filas ORM cargadas.
+
+Cada caso corre un request contra la base sembrada en conftest (30
+invitaciones con 12 RSVPs cada una) y falla, listando el SQL, si pasa su
+presupuesto. Un N+1 nuevo en to_dict()/rsvp_stats() o un listado que deja de
+paginar se nota acá antes que en producción. Si un cambio sube un número a
+propósito, actualizar el presupuesto en el mismo commit.
+"""
+import pytest
+
+from conftest import GUESTS_PER_INVITATION
+
+NEW_INVITATION = {
+    'birthday_name': 'Lucía', 'birthday_date': '2016-05-01T00:00:00',
+    'event_title': 'Cumple de Lucía', 'event_date': '2031-05-02T17:00:00',
+}
+
+# (id, método, path, body, status esperado, máx. sentencias, máx. filas cargadas)
+BUDGETS = [
+    # auth
+    ('login', 'POST', '/api/auth/login', {'email': 'owner@example.com', 'password': 'secret123'}, 200, 1, 1),
+    ('me', 'GET', '/api/auth/me', None, 200, 1, 1),
+    ('update-profile', 'PUT', '/api/auth/update-profile', {'first_name': 'Ana'}, 200, 3, 1),
+    ('change-password', 'POST', '/api/auth/change-password',
+     {'old_password': 'secret123', 'new_password': 'otra-clave'}, 200, 2, 1),
+    # invitaciones del dueño
+    ('list', 'GET', '/api/invitations', None, 200, 2, 10),
+    ('list-cursor', 'GET', '/api/invitations?pagination=cursor&include_total=false', None, 200, 1, 11),
+    ('detail', 'GET', '/api/invitations/{invitation_id}', None, 200, 1, 1),
+    ('create', 'POST', '/api/invitations', NEW_INVITATION, 201, 3, 1),
+    ('quick-create', 'POST', '/api/invitations/quick-create', NEW_INVITATION, 201, 4, 1),
+    ('bulk', 'POST', '/api/invitations/bulk', [NEW_INVITATION] * 50, 201, 2, 1),
+    ('update', 'PUT', '/api/invitations/{invitation_id}', {'event_title': 'Fiesta movida'}, 200, 3, 1),
+    ('publish', 'POST', '/api/invitations/{draft_id}/publish', None, 200, 3, 1),
+    ('delete', 'DELETE', '/api/invitations/{invitation_id}', None, 200, 4, 1),
+    ('guests', 'GET', '/api/invitations/{invitation_id}/guests', None, 200, 2, 1 + GUESTS_PER_INVITATION),
+    ('guests-export', 'GET', '/api/invitations/{invitation_id}/guests/export', None, 200, 2, 0),
+    # admin
+    ('stats', 'GET', '/api/admin/stats', None, 200, 1, 0),
+    ('runtime-stats', 'GET', '/api/admin/runtime-stats', None, 403, 1, 1),
+    ('template-create', 'POST', '/api/admin/templates', {'name': 'Moderno'}, 201, 3, 1),
+    ('template-list', 'GET', '/api/admin/templates', None, 200, 1, 1),
+    ('template-detail', 'GET', '/api/admin/templates/{template_id}', None, 200, 1, 1),
+    ('template-update', 'PUT', '/api/admin/templates/{template_id}', {'name': 'Clásico 2'}, 200, 3, 1),
+    ('template-delete', 'DELETE', '/api/admin/templates/{template_id}', None, 200, 3, 1),
+    # públicos
+    ('public', 'GET', '/api/public/invitations/{code}', None, 200, 1, 1),
+    ('public-missing', 'GET', '/api/public/invitations/no-existe', None, 404, 1, 0),
+    ('public-guests', 'GET', '/api/public/invitations/{code}/guests', None, 200, 2, 1 + GUESTS_PER_INVITATION // 2),
+    ('rsvp-new', 'POST', '/api/public/invitations/{code}/rsvp',
+     {'guest_name': 'Nuevo', 'guest_email': 'nuevo@example.com', 'rsvp_status': 'accepted'}, 201, 5, 2),
+    ('rsvp-update', 'POST', '/api/public/invitations/{code}/rsvp',
+     {'guest_name': 'Invitado 0', 'guest_email': 'guest0@example.com', 'rsvp_status': 'declined'}, 200, 5, 2),
+]
+
+
+@pytest.mark.parametrize(
+    'method, path, body, status, max_statements, max_rows',
+    [case[1:] for case in BUDGETS],
+    ids=[case[0] for case in BUDGETS],
+)
+def test_query_budget(client, seeded, count_sql, method, path, body, status, max_statements, max_rows):
+    url = path.format(**seeded)
+    headers = seeded['headers'] if url.startswith(('/api/auth', '/api/invitations', '/api/admin')) else {}
+
+    with count_sql() as counter:
+        response = client.open(url, method=method, json=body, headers=headers)
+        response.get_data()  # consume el streaming (export) dentro del conteo
+
+    assert response.status_code == status, response.get_data(as_text=True)
+    counter.assert_within(statements=max_statements, rows=max_rows)
@@ -0,0 +1,59 @@
+"""Rate limit público: límite por código solo con la base y fail-open."""
+import pytest
+
+from app.microcache import microcache
+from app.ratelimit import public_limiter
+
+
+@pytest.fixture
+def limited(app, tmp_path):
+    app.config.update(
+        PUBLIC_RATE_LIMIT_ENABLED=True,
+        RATE_LIMIT_STATE_PATH=str(tmp_path / 'ratelimit'),
+        PUBLIC_BURST_PER_IP=1000,
+        PUBLIC_RATE_PER_CODE=0.001,
+        PUBLIC_BURST_PER_CODE=2,
+    )
+    public_limiter.init_app(app)
+    yield public_limiter
+    app.config['PUBLIC_RATE_LIMIT_ENABLED'] = False
+    public_limiter.init_app(app)
+
+
+def test_cache_hits_do_not_spend_the_code_bucket(limited, client, seeded):
+    url = f'/api/public/invitations/{seeded["code"]}'
+    # El primero llena la cache del worker; los siguientes no llegan a la base
+    assert [client.get(url).status_code for _ in range(10)] == [200] * 10
+    assert limited.stats()['shed_code'] == 0
+
+    # Los que sí van a la base (guests) comparten el bucket con el primero
+    statuses = [client.get(f'{url}/guests').status_code for _ in range(2)]
+    assert statuses == [200, 429]
+
+
+def test_limiter_without_worker_slot_fails_open(limited, client, seeded, monkeypatch):
+    def no_slot():
+        raise RuntimeError('Sin slots libres para el worker en el rate limiter')
+
+    monkeypatch.setattr(limited, '_own_worker_slot', no_slot)
+    assert client.get(f'/api/public/invitations/{seeded["code"]}').status_code == 200
+
+
+def test_microcache_refreshes_are_not_limited(limited, client, seeded, monkeypatch):
+    monkeypatch.setattr(microcache, 'purge_token', 'secreto')
+    url = f'/api/public/invitations/{seeded["code"]}/guests'
+    # Todos desde la IP de nginx y al mismo código: más que la ráfaga permitida
+    statuses = [client.get(url, headers={'X-Cache-Refresh': 'secreto'}).status_code for _ in range(5)]
+    assert statuses == [200] * 5
+    assert limited.stats()['allowed'] == 0
+
+
+def test_inflight_rejections_do_not_spend_tokens(limited, client, seeded, monkeypatch):
+    monkeypatch.setattr(limited, 'max_inflight', 1)
+    assert limited.admit('10.0.0.1', None) is None  # otra request en curso ocupa el único lugar
+    url = f'/api/public/invitations/{seeded["code"]}/guests'
+    assert [client.get(url).status_code for _ in range(3)] == [503] * 3
+
+    limited.release()
+    # La ráfaga del código sigue entera
+    assert [client.get(url).status_code for _ in range(3)] == [200, 200, 429]
@@ -0,0 +1,50 @@
+"""Contadores denormalizados de RSVP: coinciden con recompute_rsvp_counters tras cada cambio."""
+from app import db
+from app.models import Invitation
+
+# (payload, status esperado): altas, cambios de estado y de cantidad, declinaciones
+SEQUENCE = [
+    ({'guest_name': 'Ana', 'guest_email': 'ana@example.com', 'rsvp_status': 'accepted', 'number_of_guests': 3}, 201),
+    ({'guest_name': 'Ana', 'guest_email': 'ana@example.com', 'rsvp_status': 'accepted', 'number_of_guests': 1}, 200),
+    ({'guest_name': 'Ana', 'guest_email': 'ana@example.com', 'rsvp_status': 'declined'}, 200),
+    ({'guest_name': 'Beto', 'guest_phone': '555', 'rsvp_status': 'tentative', 'number_of_guests': 2}, 201),
+    ({'guest_name': 'Beto', 'guest_phone': '555', 'rsvp_status': 'accepted', 'number_of_guests': 4}, 200),
+    ({'guest_name': 'Sin contacto', 'rsvp_status': 'accepted', 'number_of_guests': 2}, 201),
+    ({'guest_name': 'Ana', 'guest_email': 'ana@example.com', 'guest_phone': '777', 'rsvp_status': 'accepted'}, 200),
+    ({'guest_name': 'Beto', 'guest_phone': '555', 'rsvp_status': 'declined'}, 200),
+]
+
+
+def _counters(invitation):
+    return (invitation.rsvp_accepted, invitation.rsvp_declined, invitation.rsvp_tentative,
+            invitation.rsvp_pending, invitation.rsvp_headcount)
+
+
+def test_counters_match_recompute_after_each_rsvp(app, client, seeded):
+    url = f'/api/public/invitations/{seeded["code"]}/rsvp'
+    for payload, status in SEQUENCE:
+        assert client.post(url, json=payload).status_code == status
+
+        with app.app_context():
+            invitation = db.session.get(Invitation, seeded['invitation_id'])
+            incremental = _counters(invitation)
+            # Nada para reparar: lo incremental es lo mismo que recalcular desde guests
+            assert Invitation.recompute_rsvp_counters([invitation.id]) == 0, payload
+            db.session.refresh(invitation)
+            assert _counters(invitation) == incremental
+
+
+def test_counters_after_the_full_sequence(app, client, seeded):
+    with app.app_context():
+        before = db.session.get(Invitation, seeded['invitation_id']).rsvp_stats()
+    url = f'/api/public/invitations/{seeded["code"]}/rsvp'
+    for payload, _ in SEQUENCE:
+        client.post(url, json=payload)
+
+    with app.app_context():
+        after = db.session.get(Invitation, seeded['invitation_id']).rsvp_stats()
+    # Ana declinó... y volvió a aceptar (1); Beto terminó declinando; sin contacto aceptó con 2
+    assert after['accepted'] - before['accepted'] == 2
+    assert after['declined'] - before['declined'] == 1
+    assert after['tentative'] == before['tentative']
+    assert after['total_headcount'] - before['total_headcount'] == 1 + 2
@@ -0,0 +1,102 @@
+"""Cola write-behind de RSVPs: reinicios, reintentos sin duplicar y descartes."""
+import logging
+import time
+from datetime import datetime
+
+import pytest
+
+from app import db
+from app.models import Guest, Invitation, User
+from app.rsvp_queue import rsvp_queue
+
+
+@pytest.fixture
+def write_behind(make_file_app, tmp_path):
+    """`write_behind()` crea (o reinicia) la app con la cola en tmp_path."""
+    yield lambda: make_file_app(RSVP_WRITE_BEHIND=True, RSVP_QUEUE_PATH=str(tmp_path / 'rsvp_queue.db'),
+                                RSVP_FLUSH_INTERVAL=0.05)
+    rsvp_queue.enabled = False  # el flusher termina en la próxima vuelta
+    if rsvp_queue._thread is not None:
+        rsvp_queue._wakeup.set()
+        rsvp_queue._thread.join(5)
+
+
+def _invitation(app, code):
+    with app.app_context():
+        user = User(email='owner@example.com', company_name='Test')
+        user.set_password('secret')
+        db.session.add(user)
+        db.session.flush()
+        invitation = Invitation(user_id=user.id, unique_code=code, birthday_name='Ana',
+                                birthday_date=datetime(2019, 1, 1), event_title='Cumple',
+                                event_date=datetime(2030, 1, 1), is_published=True)
+        db.session.add(invitation)
+        db.session.commit()
+        return invitation.id
+
+
+def test_pending_rsvps_are_flushed_after_restart_without_new_enqueue(write_behind, monkeypatch):
+    app = write_behind()
+    invitation_id = _invitation(app, 'reinicio')
+
+    # El worker cae antes de que su flusher llegue a aplicar la cola
+    with monkeypatch.context() as m:
+        m.setattr(rsvp_queue, '_ensure_flusher', lambda: None)
+        response = app.test_client().post('/api/public/invitations/reinicio/rsvp',
+                                          json={'guest_name': 'Juan', 'rsvp_status': 'accepted'})
+    assert response.status_code == 202
+    assert rsvp_queue.pending_count() == 1
+
+    # Al reiniciar nadie encola nada nuevo: el flusher arranca con la app
+    restarted = write_behind()
+    deadline = time.monotonic() + 5
+    while rsvp_queue.pending_count() and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+    assert rsvp_queue.pending_count() == 0
+    with restarted.app_context():
+        assert Guest.query.filter_by(invitation_id=invitation_id).one().name == 'Juan'
+
+
+def test_batch_replayed_after_commit_is_not_applied_twice(write_behind, monkeypatch):
+    app = write_behind()
+    invitation_id = _invitation(app, 'replay')
+    monkeypatch.setattr(rsvp_queue, '_ensure_flusher', lambda: None)
+    client = app.test_client()
+    for payload in ({'guest_name': 'Sin contacto', 'rsvp_status': 'accepted', 'number_of_guests': 3},
+                    {'guest_name': 'Eva', 'guest_email': 'eva@example.com', 'rsvp_status': 'declined'}):
+        assert client.post('/api/public/invitations/replay/rsvp', json=payload).status_code == 202
+
+    # El worker cae después del commit y antes del ack: el lote sigue en la cola
+    with app.app_context(), monkeypatch.context() as m:
+        m.setattr(rsvp_queue, '_ack', lambda ids: None)
+        assert rsvp_queue.flush() == 2
+    assert rsvp_queue.pending_count() == 2
+
+    # Otro flusher lo retoma cuando vence el lease
+    monkeypatch.setattr(rsvp_queue, 'claim_timeout', -1)
+    with app.app_context():
+        assert rsvp_queue.flush() == 2
+        assert rsvp_queue.pending_count() == 0
+        assert Guest.query.filter_by(invitation_id=invitation_id).count() == 2
+        stats = db.session.get(Invitation, invitation_id).rsvp_stats()
+        assert (stats['accepted'], stats['declined'], stats['total_headcount']) == (1, 1, 3)
+
+
+def test_entries_of_unpublished_invitations_are_counted_and_logged(write_behind, monkeypatch, caplog):
+    app = write_behind()
+    invitation_id = _invitation(app, 'despublicada')
+    monkeypatch.setattr(rsvp_queue, '_ensure_flusher', lambda: None)
+    response = app.test_client().post('/api/public/invitations/despublicada/rsvp',
+                                      json={'guest_name': 'Juan', 'rsvp_status': 'accepted'})
+    assert response.status_code == 202
+
+    with app.app_context():
+        db.session.get(Invitation, invitation_id).is_published = False
+        db.session.commit()
+        discarded_before = rsvp_queue.stats()['discarded']
+        with caplog.at_level(logging.WARNING):
+            assert rsvp_queue.flush() == 1
+        assert Guest.query.filter_by(invitation_id=invitation_id).count() == 0
+    assert rsvp_queue.stats()['discarded'] == discarded_before + 1
+    assert 'RSVPs descartados' in caplog.text
@@ -0,0 +1,70 @@
+"""Snapshots estáticos: se generan al publicar/editar/RSVP y se borran al eliminar."""
+import json
+import os
+
+import pytest
+
+from app import db
+from app.models import Invitation
+from app.snapshots import public_snapshots
+
+
+@pytest.fixture
+def app(make_file_app, tmp_path):
+    # El thread no llega a correr durante el test: se renderiza con flush()
+    app = make_file_app(STATIC_SNAPSHOTS_DIR=str(tmp_path / 'snapshots'), STATIC_SNAPSHOTS_DELAY=60)
+    public_snapshots.reset_stats()
+    return app
+
+
+def _exists(code, extension):
+    return os.path.exists(public_snapshots.path(code, extension))
+
+
+def _read(code, extension):
+    with open(public_snapshots.path(code, extension), encoding='utf-8') as f:
+        return f.read()
+
+
+def test_publish_update_rsvp_and_delete_refresh_snapshots(client, seeded):
+    code, headers, invitation_id = seeded['code'], seeded['headers'], seeded['invitation_id']
+
+    assert client.post(f'/api/invitations/{invitation_id}/publish', headers=headers).status_code == 200
+    assert public_snapshots.flush() == 1
+    assert _read(code, 'json') == client.get(f'/api/public/invitations/{code}').get_data(as_text=True)
+    page = _read(code, 'html')
+    assert page == client.get(f'/api/public/invitations/{code}/page').get_data(as_text=True)
+    assert 'Fiesta 0' in page and 'template-classic_01' in page
+
+    response = client.put(f'/api/invitations/{invitation_id}', headers=headers,
+                          json={'event_title': 'Fiesta <renovada>', 'template_key': 'party_02',
+                                'hero_image_url': 'https://cdn.example.com/hero.jpg'})
+    assert response.status_code == 200
+    response = client.post(f'/api/public/invitations/{code}/rsvp',
+                           json={'guest_name': 'Ana', 'guest_email': 'ana@example.com', 'rsvp_status': 'accepted'})
+    assert response.status_code == 201
+    # Edición + RSVP se juntan en un solo render
+    assert public_snapshots.flush() == 1
+    snapshot = json.loads(_read(code, 'json'))
+    assert snapshot['invitation']['event_title'] == 'Fiesta <renovada>'
+    assert snapshot['rsvp_stats'] == response.get_json()['rsvp_stats']
+    page = _read(code, 'html')
+    assert 'Fiesta &lt;renovada&gt;' in page
+    assert 'template-party_02' in page and 'https://cdn.example.com/hero.jpg' in page
+
+    assert client.delete(f'/api/invitations/{invitation_id}', headers=headers).status_code == 200
+    public_snapshots.flush()
+    assert not _exists(code, 'json') and not _exists(code, 'html')
+    assert public_snapshots.stats()['removed'] == 1
+
+
+def test_render_all_skips_drafts_and_prunes_orphans(app, seeded):
+    with open(public_snapshots.path('huerfana', 'json'), 'w') as f:
+        f.write('{}')
+    with app.app_context():
+        rendered, pruned = public_snapshots.render_all(prune=True)
+        draft_code = db.session.get(Invitation, seeded['draft_id']).unique_code
+
+    assert rendered == 35  # todas las publicadas de los dos clientes
+    assert pruned == 1 and not _exists('huerfana', 'json')
+    assert _exists(seeded['code'], 'html') and not _exists(draft_code, 'json')
@@ -0,0 +1,109 @@
+"""Perfil de SQLite en archivo: PRAGMAs por conexión y escritores serializados."""
+import fcntl
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app import db
+from app.models import Invitation, User
+from app.rsvp_queue import rsvp_queue
+from app.sqlite_profile import sqlite_profile, write_transaction
+
+
+@pytest.fixture(params=['flock', 'immediate'])
+def file_app(request, make_file_app):
+    app = make_file_app(SQLITE_WRITE_LOCK=request.param, SQLITE_BUSY_TIMEOUT_MS=5000)
+    sqlite_profile.reset_stats()
+    return app
+
+
+@pytest.fixture
+def seeded_file_app(file_app):
+    with file_app.app_context():
+        user = User(email='owner@example.com', company_name='Eventos SA')
+        user.set_password('secret123')
+        db.session.add(user)
+        db.session.flush()
+        invitation = Invitation(user_id=user.id, birthday_name='Lucía', birthday_date=datetime(2016, 5, 1),
+                                event_title='Cumple', event_date=datetime(2030, 1, 1), is_published=True)
+        db.session.add(invitation)
+        db.session.commit()
+        return invitation.unique_code, {'Authorization': f'Bearer {create_access_token(identity=user.id)}'}
+
+
+def test_pragmas_applied_on_connect(file_app):
+    with file_app.app_context():
+        conn = db.session.connection()
+        assert conn.exec_driver_sql('PRAGMA journal_mode').scalar() == 'wal'
+        assert conn.exec_driver_sql('PRAGMA busy_timeout').scalar() == 5000
+        assert conn.exec_driver_sql('PRAGMA synchronous').scalar() == 1  # NORMAL
+        db.session.rollback()
+
+
+def test_writes_begin_immediate_and_wait_for_other_writer(file_app, seeded_file_app):
+    code, headers = seeded_file_app
+    client = file_app.test_client()
+
+    assert client.get('/api/invitations', headers=headers).status_code == 200
+    assert sqlite_profile.stats()['read_transactions'] >= 1
+
+    # Otro proceso tiene el lock de escritura por 300 ms: el RSVP espera y entra
+    other = sqlite3.connect(file_app.config['SQLALCHEMY_DATABASE_URI'][len('sqlite:///'):],
+                            isolation_level=None, check_same_thread=False)
+    other.execute('BEGIN IMMEDIATE')
+    threading.Timer(0.3, other.commit).start()
+    started = time.perf_counter()
+    response = client.post(f'/api/public/invitations/{code}/rsvp',
+                           json={'guest_name': 'Ana', 'guest_email': 'ana@example.com', 'rsvp_status': 'accepted'})
+    assert response.status_code == 201, response.get_data(as_text=True)
+    assert time.perf_counter() - started >= 0.25
+    stats = sqlite_profile.stats()
+    assert stats['write_transactions'] >= 1
+    assert stats['write_lock_waits'] >= 1
+    other.close()
+
+
+def test_outside_requests_only_marked_writers_begin_immediate(file_app, seeded_file_app):
+    with file_app.app_context():
+        # Thread en segundo plano o comando que solo lee: transacción diferida
+        sqlite_profile.reset_stats()
+        assert Invitation.query.count() == 1
+        db.session.rollback()
+        assert sqlite_profile.stats()['read_transactions'] == 1
+        assert sqlite_profile.stats()['write_transactions'] == 0
+
+        with write_transaction():
+            Invitation.query.first().event_title = 'Otro'
+            db.session.commit()
+        assert sqlite_profile.stats()['write_transactions'] == 1
+
+
+def test_write_behind_rsvp_does_not_take_the_writer_lock(file_app, seeded_file_app, tmp_path):
+    code, _ = seeded_file_app
+    file_app.config.update(RSVP_WRITE_BEHIND=True, RSVP_QUEUE_PATH=str(tmp_path / 'rsvp_queue.db'),
+                           RSVP_FLUSH_INTERVAL=60)
+    rsvp_queue.init_app(file_app)
+    database = file_app.config['SQLALCHEMY_DATABASE_URI'][len('sqlite:///'):]
+    # El flusher está escribiendo un lote: tiene el flock y el lock de SQLite
+    lock_fd = os.open(f'{database}-writer.lock', os.O_RDWR | os.O_CREAT, 0o600)
+    fcntl.flock(lock_fd, fcntl.LOCK_EX)
+    other = sqlite3.connect(database, isolation_level=None)
+    other.execute('BEGIN IMMEDIATE')
+    try:
+        sqlite_profile.reset_stats()
+        started = time.perf_counter()
+        response = file_app.test_client().post(f'/api/public/invitations/{code}/rsvp',
+                                               json={'guest_name': 'Ana', 'rsvp_status': 'accepted'})
+        assert response.status_code == 202
+        assert time.perf_counter() - started < 1
+        assert sqlite_profile.stats()['write_transactions'] == 0
+    finally:
+        other.rollback()
+        other.close()
+        os.close(lock_fd)
+        rsvp_queue.enabled = False
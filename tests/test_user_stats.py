@@ -0,0 +1,46 @@
+"""Rollup user_stats: la fila nace con el usuario y el GET de estadísticas no escribe."""
+from flask_jwt_extended import create_access_token
+
+from app import db
+from app.models import User, UserStats
+
+NEW_INVITATION = {'birthday_name': 'Lucía', 'birthday_date': '2016-05-01',
+                  'event_title': 'Cumple de Lucía', 'event_date': '2031-05-02'}
+
+
+def _headers(app, user_id):
+    with app.app_context():
+        return {'Authorization': f'Bearer {create_access_token(identity=user_id)}'}
+
+
+def test_new_user_gets_a_row_and_stats_are_read_without_writes(app, client, count_sql, monkeypatch):
+    app.config['USER_STATS_ROLLUP'] = True
+    monkeypatch.setenv('ALLOW_REGISTER', 'true')
+    response = client.post('/api/auth/register', json={'email': 'nuevo@example.com', 'password': 'secret123',
+                                                        'company_name': 'Nueva'})
+    assert response.status_code == 201
+    user_id = response.get_json()['user']['id']
+    with app.app_context():
+        assert db.session.get(UserStats, user_id).total_invitations == 0
+
+    headers = _headers(app, user_id)
+    assert client.post('/api/invitations', headers=headers, json=NEW_INVITATION).status_code == 201
+    with count_sql() as counter:
+        response = client.get('/api/admin/stats', headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['total_invitations'] == 1
+    assert [s for s in counter.statements if not s.startswith(('SELECT', 'BEGIN', 'COMMIT', 'ROLLBACK'))] == []
+
+
+def test_user_without_row_is_answered_from_the_aggregate(app, client, seeded):
+    # Usuarios creados con el rollup apagado: sin fila
+    app.config['USER_STATS_ROLLUP'] = True
+    response = client.get('/api/admin/stats', headers=seeded['headers'])
+    assert response.status_code == 200
+    assert response.get_json()['total_invitations'] == 31
+    with app.app_context():
+        assert db.session.get(UserStats, seeded['owner_id']) is None
+
+        # rebuild-user-stats sin argumentos crea las que faltan
+        assert UserStats.rebuild() == User.query.count()
+        assert db.session.get(UserStats, seeded['owner_id']).total_invitations == 31